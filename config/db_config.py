@@ -17,7 +17,7 @@ DB_CONFIG = {
     "user": os.getenv("DB_USER"),
     "password": os.getenv("DB_PASSWORD"),
     "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT")),
+    "port": int(os.getenv("DB_PORT", "3306")),
 }
 
 # 表前缀
@@ -26,3 +26,36 @@ TABLE_PREFIX = os.getenv("TABLE_PREFIX", "boss_")
 # 数据库字符集配置
 CHARSET = os.getenv("DB_CHARSET", "utf8mb4")
 COLLATION = os.getenv("DB_COLLATION", "utf8mb4_unicode_ci")
+
+# 连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # 获取连接的最长等待时间（秒）
+DB_POOL_PING_INTERVAL = float(
+    os.getenv("DB_POOL_PING_INTERVAL", "60")
+)  # 空闲超过该秒数的连接在借出前先做健康检查
+
+# 招聘者、公司维度缓存容量（条目数）
+DIM_CACHE_SIZE = int(os.getenv("DIM_CACHE_SIZE", "10000"))
+
+# 标签、技能、福利、图标URL字典驻留缓存容量（条目数）
+DICT_CACHE_SIZE = int(os.getenv("DICT_CACHE_SIZE", "100000"))
+
+# 存储后端：mysql（默认）或 sqlite（嵌入式文件数据库，无需MySQL服务）
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mysql")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/boss_jobs.sqlite3")
+
+# 请求日志异步批量写入配置
+REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", "1000"))
+REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", "50"))
+REQUEST_LOG_FLUSH_INTERVAL = float(
+    os.getenv("REQUEST_LOG_FLUSH_INTERVAL", "2")
+)  # 队列中的日志最多等待该秒数即写入
+REQUEST_LOG_FULL_POLICY = os.getenv(
+    "REQUEST_LOG_FULL_POLICY", "drop"
+)  # 队列已满时的处理策略：drop（丢弃并计数）或 block（等待队列空出）
+
+# 请求日志按天分区与保留配置
+REQUEST_LOG_RETENTION_DAYS = int(os.getenv("REQUEST_LOG_RETENTION_DAYS", "30"))
+REQUEST_LOG_PARTITION_DAYS_AHEAD = int(
+    os.getenv("REQUEST_LOG_PARTITION_DAYS_AHEAD", "7")
+)  # 每次启动时预先创建的未来分区天数
@@ -30,14 +30,63 @@ DEFAULT_HEADERS = {
 
 # 请求重试配置
 RETRY_TIMES = 3
-RETRY_DELAY = 5  # 秒
+RETRY_DELAY = 5  # 秒，限流或失败后首次退避的时长，连续失败时指数增长
+
+# 自适应限速配置：所有请求共享一个令牌桶，速率在上下限之间随响应情况调整
+RATE_LIMIT_INITIAL_RATE = float(os.getenv("RATE_LIMIT_INITIAL_RATE", "0.15"))  # 请求/秒
+RATE_LIMIT_MIN_RATE = float(os.getenv("RATE_LIMIT_MIN_RATE", "0.02"))  # 请求/秒
+RATE_LIMIT_MAX_RATE = float(os.getenv("RATE_LIMIT_MAX_RATE", "1.0"))  # 请求/秒
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "1"))  # 令牌桶容量
+RATE_LIMIT_INCREASE = float(os.getenv("RATE_LIMIT_INCREASE", "0.01"))  # 每次正常响应增加的速率
+RATE_LIMIT_DECREASE = float(os.getenv("RATE_LIMIT_DECREASE", "0.5"))  # 限流时速率乘以该系数
+RATE_LIMIT_JITTER = float(os.getenv("RATE_LIMIT_JITTER", "0.3"))  # 等待时间附加的随机抖动（请求间隔的比例）
+RATE_LIMIT_MAX_BACKOFF = float(os.getenv("RATE_LIMIT_MAX_BACKOFF", "300"))  # 秒
+RATE_LIMIT_LATENCY_FACTOR = float(os.getenv("RATE_LIMIT_LATENCY_FACTOR", "2.0"))  # 延迟超过基线该倍数时降速
 
 # Cookie更新配置
 COOKIE_FILE = os.getenv("COOKIE_FILE", "cookies.secret.json")
 COOKIE_EXPIRY_MARGIN = 3600  # 提前1小时视为过期
+COOKIE_FLUSH_INTERVAL = int(os.getenv("COOKIE_FLUSH_INTERVAL", "30"))  # Cookie有变化时两次写回文件的最小间隔（秒）
+
+# 多身份配置：每个身份有独立的Cookie、请求头和限速器，文件不存在时只使用默认身份
+IDENTITIES_FILE = os.getenv("IDENTITIES_FILE", "identities.secret.json")
+IDENTITY_MAX_STREAMS = int(os.getenv("IDENTITY_MAX_STREAMS", "1"))  # 每个身份同时承担的工作项数
+IDENTITY_COOLDOWN = float(os.getenv("IDENTITY_COOLDOWN", "600"))  # 秒，触发反爬后身份的冷却时长，连续触发时翻倍
+IDENTITY_MAX_COOLDOWN = float(os.getenv("IDENTITY_MAX_COOLDOWN", "3600"))  # 秒
+# 视为触发反爬的API返回码（HTTP 403/429也视为触发反爬）
+ANTI_CRAWL_CODES = [
+    int(code) for code in os.getenv("ANTI_CRAWL_CODES", "35,36,37").split(",") if code.strip()
+]
+
+# 抓取进度文件：记录每个工作项已完成的页码，中断后从断点继续
+CHECKPOINT_FILE = os.getenv("CHECKPOINT_FILE", "crawl_checkpoint.json")
+
+# 增量抓取配置：连续INCREMENTAL_STOP_PAGES页中已存储岗位占比都不低于INCREMENTAL_KNOWN_RATIO时停止翻页
+INCREMENTAL_KNOWN_RATIO = float(os.getenv("INCREMENTAL_KNOWN_RATIO", "0.8"))
+INCREMENTAL_STOP_PAGES = int(os.getenv("INCREMENTAL_STOP_PAGES", "2"))
 
-# 数据备份配置
-BACKUP_DIR = "data_backup"
+# 数据备份配置：--backup时原始响应归档到该目录
+BACKUP_DIR = os.getenv("BACKUP_DIR", "data_backup")
+ARCHIVE_SEGMENT_BYTES = int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))  # 单个分段文件的最大字节数
+ARCHIVE_COMPRESS_LEVEL = int(os.getenv("ARCHIVE_COMPRESS_LEVEL", "6"))  # gzip压缩级别
 
 # JSON响应文件目录
 JSON_RESPONSES_DIR = os.getenv("JSON_RESPONSES_DIR", "json_responses")
+
+# 写入流水线配置：抓取线程把解析后的页面放入有界队列，由写入线程批量写库
+WRITE_WORKERS = int(os.getenv("WRITE_WORKERS", "2"))  # 为0时在抓取线程中同步写入
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "20"))  # 队列可容纳的页面数
+WRITE_BATCH_PAGES = int(os.getenv("WRITE_BATCH_PAGES", "5"))  # 每个写入线程一次取出并在一个事务中写入的最大页面数
+
+# HTTP会话配置：长连接复用与超时
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # 每个主机保持的最大连接数
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))  # 秒
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))  # 秒
+
+# 异步抓取引擎配置
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))  # 全局同时进行的请求数
+CRAWL_PER_HOST_LIMIT = int(os.getenv("CRAWL_PER_HOST_LIMIT", "2"))  # 每个主机同时进行的请求数
+
+# 指标服务配置：端口为0时不启动HTTP服务，只在退出时输出指标摘要
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
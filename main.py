@@ -5,7 +5,6 @@
 import os
 import sys
 import argparse
-import json
 from datetime import datetime
 from loguru import logger
 from dotenv import load_dotenv
@@ -16,9 +15,17 @@ load_dotenv()
 # 添加项目根目录到路径，以便能够正确导入模块
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.database import create_tables
-from src.scraper import scrape_all_targets
+from src.storage import get_storage
+from src.scraper import scrape_all_targets, scrape_work
+from src.async_crawler import scrape_streams_async, scrape_work_async
+from src.crawl_plan import load_crawl_plan
+from src.checkpoint import get_checkpoint
+from src.archive import open_archive
+from src.replay import replay_archive
+from src.request_log_writer import close_request_log_writer
 from src.import_json import import_all_json_files
+from src.json_codec import loads, load_file
+from src.metrics import start_metrics_server
 from src.utils import (
     setup_logging,
     get_timestamp,
@@ -26,7 +33,38 @@ from src.utils import (
     load_cookies,
     save_cookies,
 )
-from config.settings import DEFAULT_PARAMS, BACKUP_DIR, COOKIE_FILE, JSON_RESPONSES_DIR
+from config.db_config import REQUEST_LOG_RETENTION_DAYS
+from config.settings import (
+    DEFAULT_PARAMS,
+    BACKUP_DIR,
+    COOKIE_FILE,
+    JSON_RESPONSES_DIR,
+    METRICS_PORT,
+    METRICS_HOST,
+)
+
+
+def show_crawl_status():
+    """
+    输出抓取进度文件中未完成的工作项
+    """
+    checkpoint = get_checkpoint()
+    items = checkpoint.items()
+    if not items:
+        logger.info(f"没有抓取进度记录（{checkpoint.path}）")
+        return
+
+    incomplete = checkpoint.incomplete_items()
+    logger.info(
+        f"抓取进度 {checkpoint.path}: 共 {len(items)} 个工作项, "
+        f"已完成 {len(items) - len(incomplete)} 个, 未完成 {len(incomplete)} 个"
+    )
+    for item in incomplete:
+        logger.info(
+            f"[{item['status']}] {item['query']}@{item['city']}: "
+            f"已完成 {item['last_page']} 页, hasMore={item['has_more']}, "
+            f"resCount={item['res_count']}, 更新于 {item.get('updated_at')}"
+        )
 
 
 def main():
@@ -37,12 +75,49 @@ def main():
     parser = argparse.ArgumentParser(description="BOSS直聘网页爬虫和数据存储程序")
     parser.add_argument("--log", help="保存日志到指定文件")
     parser.add_argument(
-        "--backup", action="store_true", help="备份抓取的数据为JSON文件"
+        "--backup",
+        action="store_true",
+        help=f"把原始API响应归档为压缩的JSONL分段文件（{BACKUP_DIR}）",
     )
     parser.add_argument("--setup-db", action="store_true", help="仅设置数据库表结构")
     parser.add_argument("--max-pages", type=int, help="每个URL最大爬取页数")
-    parser.add_argument("--query", help="搜索关键词，默认使用配置文件中的设置")
-    parser.add_argument("--city", help="城市代码，默认使用配置文件中的设置")
+    parser.add_argument(
+        "--query",
+        help="搜索关键词，默认使用配置文件中的设置；异步引擎下可用逗号分隔多个关键词",
+    )
+    parser.add_argument(
+        "--city",
+        help="城市代码，默认使用配置文件中的设置；异步引擎下可用逗号分隔多个城市",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default="sync",
+        help="抓取引擎：sync逐页顺序抓取，async并发抓取多个关键词/城市组合",
+    )
+    parser.add_argument(
+        "--plan",
+        metavar="FILE",
+        help="抓取计划文件（YAML/JSON），按关键词×城市×筛选参数的组合依次爬取",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量模式：连续多页基本都是已存储的岗位时停止翻页",
+    )
+    progress_group = parser.add_mutually_exclusive_group()
+    progress_group.add_argument(
+        "--resume",
+        action="store_true",
+        help="要求从断点继续：抓取进度文件中没有未完成的工作项时报错退出"
+        "（不指定时也会自动从断点继续）",
+    )
+    progress_group.add_argument(
+        "--fresh", action="store_true", help="丢弃之前的抓取进度，从第1页重新开始"
+    )
+    parser.add_argument(
+        "--crawl-status", action="store_true", help="列出未完成的抓取工作项后退出"
+    )
     parser.add_argument(
         "--set-cookie", help="设置Cookie，格式为JSON字符串或JSON文件路径"
     )
@@ -53,6 +128,39 @@ def main():
     parser.add_argument(
         "--json-dir", help=f"JSON文件所在目录，默认为 {JSON_RESPONSES_DIR}"
     )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="配合--import-json使用，通过LOAD DATA LOCAL INFILE批量导入",
+    )
+    parser.add_argument(
+        "--replay",
+        nargs="?",
+        const=BACKUP_DIR,
+        metavar="DIR",
+        help=f"重放归档的原始响应并写入数据库，不访问网络，默认目录 {BACKUP_DIR}",
+    )
+    parser.add_argument(
+        "--since", help="配合--replay使用，只重放该时间之后归档的响应（ISO格式）"
+    )
+    parser.add_argument(
+        "--until", help="配合--replay使用，只重放该时间之前归档的响应（ISO格式）"
+    )
+    parser.add_argument(
+        "--prune-request-logs",
+        type=int,
+        nargs="?",
+        const=REQUEST_LOG_RETENTION_DAYS,
+        metavar="DAYS",
+        help=f"删除超过指定天数的请求日志，默认保留 {REQUEST_LOG_RETENTION_DAYS} 天",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        metavar="PORT",
+        help="在该端口提供Prometheus格式的指标（/metrics），0表示不启动",
+    )
     args = parser.parse_args()
 
     # 设置日志
@@ -67,16 +175,19 @@ def main():
     logger.info("========== 爬虫程序启动 ==========")
     logger.debug(f"Cookie文件路径: {COOKIE_FILE}")
 
+    # 长时间抓取时可以实时查看吞吐和延迟分布
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, METRICS_HOST)
+
     # 如果需要设置Cookie
     if args.set_cookie:
         try:
             if os.path.exists(args.set_cookie):
                 # 如果是文件路径
-                with open(args.set_cookie, "r", encoding="utf-8") as f:
-                    cookies = json.load(f)
+                cookies = load_file(args.set_cookie)
             else:
                 # 如果是JSON字符串
-                cookies = json.loads(args.set_cookie)
+                cookies = loads(args.set_cookie)
 
             if save_cookies(cookies):
                 logger.success("成功设置Cookie")
@@ -87,10 +198,15 @@ def main():
             logger.error(f"解析Cookie时出错: {e}")
             return
 
+    # 查看抓取进度
+    if args.crawl_status:
+        show_crawl_status()
+        return
+
     # 如果只需设置数据库
     if args.setup_db:
         logger.info("正在设置数据库表结构...")
-        if create_tables():
+        if get_storage().create_tables():
             logger.success("数据库表设置成功")
         else:
             logger.error("数据库表设置失败")
@@ -98,10 +214,19 @@ def main():
 
     # 确保数据库表已创建
     logger.info("检查数据库表结构...")
-    if not create_tables():
+    if not get_storage().create_tables():
         logger.error("无法设置数据库表，程序终止")
         return
 
+    # 如果是清理过期的请求日志
+    if args.prune_request_logs is not None:
+        logger.info(f"正在清理超过 {args.prune_request_logs} 天的请求日志...")
+        if get_storage().prune_request_logs(args.prune_request_logs) is not None:
+            logger.success("请求日志清理完成")
+        else:
+            logger.error("请求日志清理失败")
+        return
+
     # 如果是导入本地JSON文件
     if args.import_json:
         logger.info("开始从本地JSON文件导入数据...")
@@ -113,7 +238,7 @@ def main():
             return
 
         start_time = datetime.now()
-        result = import_all_json_files(json_dir)
+        result = import_all_json_files(json_dir, bulk_load=args.bulk_load)
 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -127,6 +252,68 @@ def main():
         logger.info("========== 导入程序结束 ==========")
         return
 
+    # 如果是重放归档的原始响应
+    if args.replay:
+        queries = (
+            [query.strip() for query in args.query.split(",")] if args.query else None
+        )
+        stats = replay_archive(args.replay, args.since, args.until, queries)
+        if stats is not None:
+            logger.success(
+                f"重放任务完成: {stats['pages']} 页, 耗时 "
+                f"{stats['elapsed_seconds']:.2f} 秒"
+            )
+        else:
+            logger.error("重放任务失败")
+        logger.info("========== 重放程序结束 ==========")
+        return
+
+    # 处理之前中断的抓取进度
+    checkpoint = get_checkpoint()
+    if args.fresh:
+        checkpoint.reset()
+        logger.info("已丢弃之前的抓取进度，从头开始")
+    elif args.resume and not checkpoint.incomplete_items():
+        logger.error(f"{checkpoint.path} 中没有可以继续的抓取进度")
+        return
+    elif checkpoint.incomplete_items():
+        logger.info(
+            f"发现 {len(checkpoint.incomplete_items())} 个未完成的工作项，"
+            f"将从断点继续（使用 --fresh 重新开始）"
+        )
+
+    # 根据需要归档原始响应
+    if args.backup:
+        open_archive(BACKUP_DIR)
+
+    # 按计划文件爬取整个组合矩阵
+    if args.plan:
+        items = load_crawl_plan(args.plan)
+        if items is None:
+            return
+        # 命令行的--max-pages作为未设置最大页数的工作项的默认值
+        work = [
+            (item.build_params(), item.max_pages or args.max_pages) for item in items
+        ]
+        for item in items:
+            logger.info(f"工作项: {item}")
+
+        logger.info(f"开始按计划爬取 {len(work)} 个工作项...")
+        start_time = datetime.now()
+        if args.engine == "async":
+            success = scrape_work_async(work, args.incremental)
+        else:
+            success = scrape_work(work, args.incremental)
+        close_request_log_writer()
+
+        duration = (datetime.now() - start_time).total_seconds()
+        if success:
+            logger.success(f"计划爬取完成，耗时 {duration:.2f} 秒")
+        else:
+            logger.warning(f"计划爬取完成，但有一些错误发生，耗时 {duration:.2f} 秒")
+        logger.info("========== 爬虫程序结束 ==========")
+        return
+
     # 准备查询参数
     params = DEFAULT_PARAMS.copy()
     if args.query:
@@ -141,11 +328,21 @@ def main():
     logger.info(f"查询参数: {params}")
     start_time = datetime.now()
 
-    # 根据需要备份数据
-    if args.backup:
-        os.makedirs(BACKUP_DIR, exist_ok=True)
+    if args.engine == "async":
+        # 每个关键词与城市的组合是一个独立的抓取流，并发执行
+        queries = args.query.split(",") if args.query else [params["query"]]
+        cities = args.city.split(",") if args.city else [params["city"]]
+        params_list = [
+            {**params, "query": query.strip(), "city": city.strip()}
+            for query in queries
+            for city in cities
+        ]
+        success = scrape_streams_async(params_list, args.max_pages, args.incremental)
+    else:
+        success = scrape_all_targets(args.max_pages, params, args.incremental)
 
-    success = scrape_all_targets(args.max_pages)
+    # 写完队列中剩余的请求日志
+    close_request_log_writer()
 
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -0,0 +1,247 @@
+"""
+Response archive module: appends raw API responses to rotating gzip JSONL segments with a lookup index.
+"""
+
+import atexit
+import gzip
+import os
+import threading
+from datetime import datetime
+from loguru import logger
+from config.settings import ARCHIVE_SEGMENT_BYTES, ARCHIVE_COMPRESS_LEVEL
+from src.json_codec import JSONDecodeError, dumps, loads
+
+# 索引文件名，每行一条JSON记录
+INDEX_FILE = "index.jsonl"
+SEGMENT_PREFIX = "responses-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class ResponseArchive:
+    """
+    原始响应归档
+
+    每条响应连同元数据（关键词、城市、页码、时间、HTTP状态码、API返回码）写为
+    一行JSON，单独压缩为一个gzip成员追加到当前分段文件末尾。API返回的JSON响应体
+    按原始bytes原样写入response字段，不重新序列化；其他响应体（如错误页面）
+    解码为字符串写入。多个gzip成员首尾相接
+    仍是合法的gzip文件，可以整体解压为JSONL；也可以按索引中的偏移量只解压一条。
+    分段文件超过segment_bytes后切换到新文件。
+
+    索引文件index.jsonl每条响应一行：query、city、page、time、status、code、
+    segment、offset、length。先写分段再写索引，中途崩溃时索引不会指向不完整的记录
+    """
+
+    def __init__(self, directory, segment_bytes, compress_level=6):
+        self.directory = directory
+        self._segment_bytes = max(1, segment_bytes)
+        self._compress_level = compress_level
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_name = None
+        self._sequence = 0
+        self._run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._stats = {
+            "records": 0,
+            "raw_bytes": 0,
+            "compressed_bytes": 0,
+            "segments": 0,
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._index = open(os.path.join(directory, INDEX_FILE), "ab")
+
+    def _rotate(self):
+        """关闭当前分段并打开新分段（调用方持有锁）"""
+        if self._segment is not None:
+            self._segment.close()
+        self._sequence += 1
+        self._segment_name = (
+            f"{SEGMENT_PREFIX}{self._run_id}-{self._sequence:04d}{SEGMENT_SUFFIX}"
+        )
+        self._segment = open(os.path.join(self.directory, self._segment_name), "ab")
+        self._stats["segments"] += 1
+        logger.debug(f"响应归档切换到新分段: {self._segment_name}")
+
+    def append(self, url, params, status_code, body, code=None):
+        """
+        追加一条响应
+
+        Args:
+            url: 请求URL
+            params: 请求参数
+            status_code: HTTP状态码
+            body: 响应体的原始bytes(可为None)
+            code: API返回码，响应体不是API返回的JSON时为None
+        """
+        params = params or {}
+        meta = {
+            "query": params.get("query"),
+            "city": params.get("city"),
+            "page": params.get("page"),
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "status": status_code,
+            "code": code,
+        }
+        if code is not None:
+            # 合法JSON中的换行只能是空白，替换为空格不改变内容，保证一条记录占一行
+            response = body
+            if b"\n" in response or b"\r" in response:
+                response = response.replace(b"\r", b" ").replace(b"\n", b" ")
+        else:
+            response = dumps(body.decode("utf-8", "replace") if body else None)
+        # 元数据序列化后以"}"结尾，在其前面接上response字段
+        header = dumps({**meta, "url": url, "params": params})
+        line = header[:-1] + b',"response":' + response + b"}\n"
+        member = gzip.compress(line, compresslevel=self._compress_level)
+
+        with self._lock:
+            if self._segment is None or self._segment.tell() >= self._segment_bytes:
+                self._rotate()
+            offset = self._segment.tell()
+            self._segment.write(member)
+            self._segment.flush()
+
+            meta["segment"] = self._segment_name
+            meta["offset"] = offset
+            meta["length"] = len(member)
+            self._index.write(dumps(meta) + b"\n")
+            self._index.flush()
+
+            self._stats["records"] += 1
+            self._stats["raw_bytes"] += len(line)
+            self._stats["compressed_bytes"] += len(member)
+
+    def close(self):
+        """关闭当前分段和索引文件"""
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            if not self._index.closed:
+                self._index.close()
+
+    def get_stats(self):
+        """
+        获取归档统计信息
+
+        Returns:
+            dict: 包含记录数records、原始字节数raw_bytes、压缩后字节数compressed_bytes
+                  和本次运行写入的分段数segments
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def iter_index(directory):
+    """
+    逐条读取归档索引
+
+    Args:
+        directory: 归档目录
+
+    Yields:
+        dict: 索引记录，包含query、city、page、time、status、code、segment、offset、length
+    """
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield loads(line)
+            except JSONDecodeError:
+                # 崩溃时可能留下半行
+                logger.warning(f"跳过无法解析的归档索引行: {line[:80]!r}")
+
+
+def read_record_bytes(directory, entry, segment_file=None):
+    """
+    按索引记录读取并解压一条归档的响应，不解析JSON
+
+    Args:
+        directory: 归档目录
+        entry: iter_index返回的索引记录
+        segment_file: 已打开的分段文件(可选)，顺序读取同一分段时可复用
+
+    Returns:
+        bytes: 归档记录的一行JSON
+    """
+    if segment_file is None:
+        with open(os.path.join(directory, entry["segment"]), "rb") as f:
+            return read_record_bytes(directory, entry, f)
+    segment_file.seek(entry["offset"])
+    return gzip.decompress(segment_file.read(entry["length"]))
+
+
+def read_record(directory, entry, segment_file=None):
+    """
+    按索引记录读取一条归档的响应
+
+    Args:
+        directory: 归档目录
+        entry: iter_index返回的索引记录
+        segment_file: 已打开的分段文件(可选)，顺序读取同一分段时可复用
+
+    Returns:
+        dict: 归档记录，包含元数据、url、params和response
+    """
+    return loads(read_record_bytes(directory, entry, segment_file))
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def open_archive(directory):
+    """
+    启用进程级共享的响应归档，之后fetch_data获取的每条响应都会归档
+
+    Args:
+        directory: 归档目录
+
+    Returns:
+        ResponseArchive: 响应归档
+    """
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = ResponseArchive(
+                directory, ARCHIVE_SEGMENT_BYTES, ARCHIVE_COMPRESS_LEVEL
+            )
+            logger.info(f"原始响应将归档到 {directory}")
+    return _archive
+
+
+def get_archive():
+    """
+    获取已启用的响应归档
+
+    Returns:
+        ResponseArchive: 响应归档，未启用时返回None
+    """
+    return _archive
+
+
+def close_archive():
+    """关闭响应归档并输出统计信息"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            return
+        _archive.close()
+        stats = _archive.get_stats()
+        _archive = None
+    if not stats["records"]:
+        return
+    ratio = stats["raw_bytes"] / stats["compressed_bytes"]
+    logger.info(
+        f"响应归档: {stats['records']} 条, 原始 {stats['raw_bytes']} 字节, "
+        f"压缩后 {stats['compressed_bytes']} 字节 (压缩比 {ratio:.1f}), "
+        f"{stats['segments']} 个分段"
+    )
+
+
+atexit.register(close_archive)
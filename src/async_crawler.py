@@ -0,0 +1,291 @@
+"""
+Asyncio crawl engine: runs independent query/city streams concurrently with global and per-host limits.
+"""
+
+import asyncio
+import time
+import traceback
+from functools import partial
+from urllib.parse import urlparse
+from loguru import logger
+from config.settings import (
+    TARGET_URLS,
+    RETRY_TIMES,
+    CRAWL_CONCURRENCY,
+    CRAWL_PER_HOST_LIMIT,
+)
+from src.checkpoint import get_checkpoint
+from src.identity_pool import get_identity_pool
+from src.incremental import create_stop_rule
+from src.scraper import FETCH_RETRIES, fetch_data, process_boss_zhipin_data
+from src.write_pipeline import create_write_pipeline
+
+
+class CrawlLimits:
+    """
+    异步抓取的并发限制：身份的限速器 + 全局信号量 + 每个主机一个信号量
+
+    先在事件循环中等待身份限速器的令牌，再占用信号量名额发出请求，
+    限速等待和退避不占用名额
+    """
+
+    def __init__(self, concurrency, per_host_limit):
+        self._global = asyncio.Semaphore(max(1, concurrency))
+        self._per_host_limit = max(1, per_host_limit)
+        self._hosts = {}
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._per_host_limit)
+            self._hosts[host] = semaphore
+        return semaphore
+
+    async def fetch(self, url, params, identity):
+        """以指定身份在并发限制内调用同步的fetch_data，返回(data, response, cookies)"""
+        await identity.limiter.acquire_async()
+        async with self._global:
+            async with self._host_semaphore(url):
+                # 请求在线程中执行，复用共享HTTP会话的连接池
+                return await asyncio.to_thread(
+                    fetch_data, url, params=dict(params), identity=identity
+                )
+
+
+async def crawl_stream(
+    limits,
+    url,
+    params,
+    max_pages=None,
+    pipeline=None,
+    checkpoint=None,
+    incremental=False,
+):
+    """
+    异步爬取一个查询/城市组合的所有分页，逻辑与fetch_all_pages一致
+
+    Args:
+        limits: 并发限制
+        url: 目标URL
+        params: 请求参数（包含query、city等）
+        max_pages: 最大爬取页数(可选)
+        pipeline: 写入流水线(可选)，默认在线程中同步写入
+        checkpoint: 抓取进度记录(可选)，指定时从上次写完的页继续
+        incremental: 是否启用增量模式
+
+    Returns:
+        bool: 操作是否成功
+    """
+    params = params.copy()
+    search_term = params.get("query")
+    label = f"[{search_term}@{params.get('city')}]"
+    current_page = 1
+    key = None
+    if checkpoint is not None:
+        key, start_page = await asyncio.to_thread(checkpoint.start, url, params)
+        if start_page is None:
+            logger.info(f"{label} 已在之前的运行中完成，跳过")
+            return True
+        if start_page > 1:
+            logger.info(f"{label} 从断点继续：上次已完成 {start_page - 1} 页")
+            if max_pages and start_page > max_pages:
+                await asyncio.to_thread(checkpoint.finish, key, start_page - 1)
+                return True
+        current_page = start_page
+
+    stop_rule = create_stop_rule(incremental)
+
+    # 整个抓取流由同一个身份抓取，身份冷却或Cookie过期时才换
+    pool = get_identity_pool()
+    identity = await pool.assign_async()
+    if len(pool) > 1:
+        logger.info(f"{label} 分配给身份 {identity.name}")
+    try:
+        while True:
+            logger.info(f"{label} 获取第 {current_page} 页数据")
+            params["page"] = current_page
+            params["_"] = int(time.time() * 1000)
+
+            data = None
+            for retry_count in range(1, RETRY_TIMES + 1):
+                data, _, _ = await limits.fetch(url, params, identity)
+                if data and data.get("code") == 0 and "zpData" in data:
+                    break
+                FETCH_RETRIES.inc()
+                logger.warning(
+                    f"{label} 第 {retry_count} 次重试获取第 {current_page} 页数据"
+                )
+                data = None
+                # 身份进入冷却或Cookie已过期时换到其他空闲身份继续
+                expired = identity.cookie_jar.expired_names()
+                if expired or identity.cooldown_remaining():
+                    other = pool.reassign(identity)
+                    if other is not None:
+                        identity = other
+                        continue
+                # Cookie已过期时会话基本已经失效，继续重试只会浪费请求
+                if expired:
+                    logger.error(
+                        f"{label} 身份 {identity.name} 的Cookie已过期"
+                        f"（{', '.join(expired)}），停止重试，"
+                        f"请更新 {identity.cookie_jar.path}"
+                    )
+                    break
+
+            if data is None:
+                logger.error(f"{label} 获取第 {current_page} 页失败，达到最大重试次数")
+                if key is not None:
+                    await asyncio.to_thread(checkpoint.fail, key)
+                return False
+
+            has_more = data["zpData"].get("hasMore", False)
+            # 增量模式下在写入之前判断本页岗位是否已经存储
+            known_page = stop_rule is not None and await asyncio.to_thread(
+                stop_rule.observe, data["zpData"].get("jobList") or []
+            )
+            on_written = None
+            if key is not None:
+                on_written = partial(
+                    checkpoint.page_done,
+                    key,
+                    current_page,
+                    has_more,
+                    data["zpData"].get("resCount"),
+                )
+
+            # 写入（或放入写入队列）可能阻塞，放到线程中执行
+            await asyncio.to_thread(
+                process_boss_zhipin_data,
+                data,
+                search_term,
+                current_page,
+                pipeline,
+                on_written,
+            )
+
+            last_page = (
+                not has_more or known_page or (max_pages and current_page >= max_pages)
+            )
+            if not has_more:
+                logger.info(f"{label} 没有更多数据，爬取完成，共 {current_page} 页")
+            elif known_page:
+                logger.info(
+                    f"{label} 增量模式: 后续分页基本都是已存储的岗位，"
+                    f"在第 {current_page} 页停止翻页"
+                )
+            elif last_page:
+                logger.info(f"{label} 已达到最大页数限制 {max_pages}，爬取停止")
+            if last_page:
+                if key is not None:
+                    await asyncio.to_thread(checkpoint.finish, key, current_page)
+                return True
+
+            current_page += 1
+    finally:
+        pool.release(identity)
+
+
+async def _crawl_all(streams, pipeline, checkpoint, incremental):
+    """
+    在同一个事件循环中并发执行全部抓取流
+
+    Args:
+        streams: (目标URL, 请求参数, 最大爬取页数)元组列表
+        pipeline: 写入流水线(可选)
+        checkpoint: 抓取进度记录(可选)
+        incremental: 是否启用增量模式
+
+    Returns:
+        bool: 是否全部成功，单个抓取流抛出的异常会被记录并视为失败
+    """
+    limits = CrawlLimits(CRAWL_CONCURRENCY, CRAWL_PER_HOST_LIMIT)
+    results = await asyncio.gather(
+        *(
+            crawl_stream(
+                limits, url, params, max_pages, pipeline, checkpoint, incremental
+            )
+            for url, params, max_pages in streams
+        ),
+        return_exceptions=True,
+    )
+    success = True
+    for (url, params, _), result in zip(streams, results):
+        if isinstance(result, Exception):
+            logger.error(
+                f"爬取 {params.get('query')}@{params.get('city')} 时发生未预期的错误: "
+                f"{result}"
+            )
+            logger.error(
+                "".join(
+                    traceback.format_exception(
+                        type(result), result, result.__traceback__
+                    )
+                )
+            )
+            success = False
+        elif not result:
+            success = False
+    return success
+
+
+def scrape_streams_async(params_list, max_pages=None, incremental=False):
+    """
+    使用异步引擎并发爬取多个查询/城市组合
+
+    Args:
+        params_list: 请求参数字典列表
+        max_pages: 每个抓取流的最大爬取页数
+        incremental: 是否启用增量模式
+
+    Returns:
+        bool: 是否全部成功
+    """
+    return scrape_work_async(
+        [(params, max_pages) for params in params_list], incremental
+    )
+
+
+def scrape_work_async(work, incremental=False):
+    """
+    使用异步引擎并发执行一组工作
+
+    每个目标URL与每项工作构成一个独立的抓取流，流内分页按顺序抓取，
+    流之间并发执行，并受CRAWL_CONCURRENCY和CRAWL_PER_HOST_LIMIT限制。
+    每个抓取流分配给身份池中健康度最高且有空余额度的身份，按该身份的限速器发出请求，
+    总吞吐随身份数增加。
+    抓取流按工作的顺序创建，名额不足时排在前面的工作先获得名额。
+    进度记录与同步引擎共用同一个抓取进度文件
+
+    Args:
+        work: (请求参数, 最大爬取页数)元组列表
+        incremental: 是否启用增量模式
+
+    Returns:
+        bool: 是否全部成功
+    """
+    if not TARGET_URLS:
+        logger.warning("没有目标URL配置")
+        return False
+
+    streams = [
+        (url, params, max_pages) for params, max_pages in work for url in TARGET_URLS
+    ]
+    logger.info(
+        f"异步引擎启动: {len(streams)} 个抓取流, 全局并发 {CRAWL_CONCURRENCY}, "
+        f"每主机并发 {CRAWL_PER_HOST_LIMIT}, 身份 {len(get_identity_pool())} 个"
+    )
+
+    checkpoint = get_checkpoint()
+    pipeline = create_write_pipeline()
+    success = False
+    try:
+        success = asyncio.run(
+            _crawl_all(streams, pipeline, checkpoint, incremental)
+        )
+    finally:
+        if pipeline is not None and pipeline.close()["failed_pages"]:
+            success = False
+        # 队列写完后再判断是否全部完成
+        checkpoint.finish_run()
+    return success
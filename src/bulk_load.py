@@ -0,0 +1,336 @@
+"""
+Bulk load module: imports large numbers of saved responses via LOAD DATA LOCAL INFILE.
+
+岗位数据先被展开为每张表一个TSV暂存文件，通过LOAD DATA LOCAL INFILE载入临时暂存表，
+再用基于集合的INSERT ... SELECT ... ON DUPLICATE KEY UPDATE合并到正式表。
+去重语义与insert_jobs_batch一致：已存在且内容指纹未变化的岗位不做任何修改，
+刷新的岗位中值为空的字段不覆盖已有数据，并保留首次抓取时的搜索关键词和页码。
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import mysql.connector
+from mysql.connector import Error
+from loguru import logger
+from config.db_config import DB_CONFIG, TABLE_PREFIX, CHARSET
+from src.database import (
+    CHILD_TABLES,
+    DB_WRITE_SECONDS,
+    build_boss_values,
+    build_company_values,
+    build_job_values,
+    collect_candidate_jobs,
+    compute_job_fingerprint,
+    JOB_COLUMNS,
+    JOB_COLUMN_DEFAULTS,
+    record_job_outcomes,
+    record_rows_written,
+)
+from src.dictionary import get_interner
+from src.upsert_plan import update_assignments
+
+# 记录已存在时保留原值的字段（保留首次抓取时的搜索关键词和页码）
+KEEP_COLUMNS = {"jobs": ("search_term", "page_number")}
+
+# 值为空时保留已有数据的表，与insert_jobs_batch写入岗位表时一致
+PRESERVE_EXISTING_TABLES = {"jobs"}
+
+# 每次查询已存储指纹的岗位ID数量
+EXISTENCE_CHUNK_SIZE = 1000
+
+_TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+
+
+def _tsv_field(value):
+    """将Python值转换为LOAD DATA默认转义规则下的TSV字段"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def _write_tsv(path, rows):
+    """将行数据写入TSV暂存文件"""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for row in rows:
+            f.write("\t".join(_tsv_field(v) for v in row))
+            f.write("\n")
+
+
+def _fetch_stored_hashes(cursor, job_ids):
+    """分块查询已存在岗位的内容指纹"""
+    stored = {}
+    for i in range(0, len(job_ids), EXISTENCE_CHUNK_SIZE):
+        chunk = job_ids[i : i + EXISTENCE_CHUNK_SIZE]
+        cursor.execute(
+            f"SELECT job_id, content_hash FROM {TABLE_PREFIX}jobs "
+            f"WHERE job_id IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk),
+        )
+        stored.update(cursor.fetchall())
+    return stored
+
+
+def _build_staging_rows(cursor, new_jobs):
+    """
+    为每张目标表生成暂存数据，字典编码子表中的字符串会被批量解析为字典ID
+
+    Args:
+        cursor: 数据库游标
+        new_jobs: (岗位数据, 搜索关键词, 页码)列表
+
+    Returns:
+        tuple: (表名 -> (字段列表, 行列表, 唯一键字段或None),
+                [(字典驻留缓存, 字符串到ID的映射)])
+    """
+    bosses = {}
+    companies = {}
+    job_rows = []
+    relation_rows = []
+    # 每张子表都要暂存（即使没有行），以删除刷新的岗位中已被移除的值
+    child_rows = {
+        table: (
+            ["job_id", value_column] + ([extra[0]] if extra else []),
+            kind,
+            [],
+        )
+        for table, value_column, _, extra, kind in CHILD_TABLES
+    }
+
+    for job, search_term, page_number in new_jobs:
+        boss_values = build_boss_values(job)
+        if boss_values:
+            bosses[boss_values["boss_id"]] = boss_values
+        company_values = build_company_values(job)
+        if company_values:
+            companies[company_values["brand_id"]] = company_values
+
+        job_values = build_job_values(job, search_term, page_number)
+        job_rows.append(
+            tuple(job_values.get(c, JOB_COLUMN_DEFAULTS.get(c)) for c in JOB_COLUMNS)
+        )
+
+        job_id = job["encryptJobId"]
+        relation_rows.append(
+            (job_id, job.get("encryptBrandId"), job.get("encryptBossId"))
+        )
+
+        for table, _, source_key, extra, _ in CHILD_TABLES:
+            values = job.get(source_key)
+            if not values:
+                continue
+            extra_values = (extra[1],) if extra else ()
+            rows = child_rows[table][2]
+            rows.extend(
+                (job_id, value) + extra_values for value in dict.fromkeys(values)
+            )
+
+    staging = {}
+    if bosses:
+        boss_list = list(bosses.values())
+        staging["recruiters"] = (
+            list(boss_list[0].keys()),
+            [tuple(b.values()) for b in boss_list],
+            "boss_id",
+        )
+    if companies:
+        company_list = list(companies.values())
+        staging["companies"] = (
+            list(company_list[0].keys()),
+            [tuple(c.values()) for c in company_list],
+            "brand_id",
+        )
+    staging["jobs"] = (JOB_COLUMNS, job_rows, "job_id")
+    staging["job_company_recruiter"] = (
+        ["job_id", "brand_id", "boss_id"],
+        relation_rows,
+        "job_id",
+    )
+    resolved = []
+    for table, (columns, kind, rows) in child_rows.items():
+        if kind:
+            interner = get_interner(kind)
+            mapping = interner.resolve(cursor, [row[1] for row in rows])
+            resolved.append((interner, mapping))
+            rows = [(row[0], mapping[row[1]]) + row[2:] for row in rows]
+        staging[table] = (columns, rows, None)
+    return staging, resolved
+
+
+def _merge_table(cursor, table, columns, key_column):
+    """
+    将暂存表合并到正式表
+
+    有唯一键的表使用INSERT ... SELECT ... ON DUPLICATE KEY UPDATE，
+    UPDATE子句与insert_jobs_batch使用的upsert计划一致；
+    多对多子表按差异同步：本批写入的每个岗位只保留暂存表中的值，
+    删除其余的值（包括新数据中列表为空的岗位的全部值），再插入新增的值，
+    未变化的行不做写入
+    """
+    target = f"{TABLE_PREFIX}{table}"
+    stage = f"{TABLE_PREFIX}stage_{table}"
+    column_list = ", ".join(columns)
+
+    if key_column:
+        update_clause = ", ".join(
+            update_assignments(
+                columns,
+                key_column,
+                KEEP_COLUMNS.get(table, ()),
+                table in PRESERVE_EXISTING_TABLES,
+                target,
+            )
+        )
+        cursor.execute(
+            f"INSERT INTO {target} ({column_list}) "
+            f"SELECT {column_list} FROM {stage} "
+            f"ON DUPLICATE KEY UPDATE {update_clause}"
+        )
+        return
+
+    # 临时表在同一条语句中不能被引用两次，本批写入的岗位单独放入一张临时表；
+    # 岗位表在子表之前暂存，其中包含本批全部岗位
+    keys = f"{stage}_keys"
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {keys}")
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE {keys} "
+        f"SELECT job_id FROM {TABLE_PREFIX}stage_jobs"
+    )
+    value_condition = " AND ".join([f"n.{c} = t.{c}" for c in columns])
+    cursor.execute(
+        f"DELETE t FROM {target} t "
+        f"JOIN {keys} k ON k.job_id = t.job_id "
+        f"LEFT JOIN {stage} n ON {value_condition} "
+        f"WHERE n.job_id IS NULL"
+    )
+    cursor.execute(f"DROP TEMPORARY TABLE {keys}")
+    cursor.execute(
+        f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {stage} "
+        f"ON DUPLICATE KEY UPDATE {target}.job_id = {target}.job_id"
+    )
+
+
+def bulk_load_pages(pages):
+    """
+    通过LOAD DATA LOCAL INFILE批量导入岗位数据
+
+    Args:
+        pages: 可迭代的(job_list, search_term, page_number)元组
+
+    Returns:
+        dict: 导入统计，包含candidates、inserted、refreshed、unchanged以及每张表的行数和速率
+    """
+    candidates = collect_candidate_jobs(pages)
+    stats = {
+        "candidates": len(candidates),
+        "inserted": 0,
+        "refreshed": 0,
+        "unchanged": 0,
+        "tables": {},
+    }
+    if not candidates:
+        return stats
+
+    # LOAD DATA LOCAL需要在客户端显式开启，只为批量导入单独建立连接，池化连接保持关闭
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=True)
+    except Error as e:
+        logger.error(f"连接到MySQL时出错: {e}")
+        return None
+
+    staging_dir = tempfile.mkdtemp(prefix="boss_bulk_")
+    cursor = None
+    staged_tables = []
+    try:
+        cursor = conn.cursor()
+
+        stored_hashes = _fetch_stored_hashes(cursor, list(candidates.keys()))
+        new_jobs = []
+        for job_id, candidate in candidates.items():
+            if job_id not in stored_hashes:
+                new_jobs.append(candidate)
+                stats["inserted"] += 1
+            elif stored_hashes[job_id] != compute_job_fingerprint(candidate[0]):
+                new_jobs.append(candidate)
+                stats["refreshed"] += 1
+        stats["unchanged"] = len(candidates) - len(new_jobs)
+        logger.info(
+            f"待导入岗位 {len(candidates)} 个，新增 {stats['inserted']} 个，"
+            f"内容变化 {stats['refreshed']} 个，未变化跳过 {stats['unchanged']} 个"
+        )
+        if not new_jobs:
+            record_job_outcomes(0, 0, stats["unchanged"])
+            return stats
+
+        staging, resolved = _build_staging_rows(cursor, new_jobs)
+
+        for table, (columns, rows, key_column) in staging.items():
+            stage = f"{TABLE_PREFIX}stage_{table}"
+            path = os.path.join(staging_dir, f"{table}.tsv")
+            _write_tsv(path, rows)
+
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {stage} LIKE {TABLE_PREFIX}{table}"
+            )
+            staged_tables.append(stage)
+
+            load_start = time.perf_counter()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {stage} "
+                f"CHARACTER SET {CHARSET} "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,),
+            )
+            load_time = time.perf_counter() - load_start
+
+            merge_start = time.perf_counter()
+            _merge_table(cursor, table, columns, key_column)
+            merge_time = time.perf_counter() - merge_start
+
+            elapsed = load_time + merge_time
+            DB_WRITE_SECONDS.observe(elapsed, table=table)
+            rate = len(rows) / elapsed if elapsed > 0 else float(len(rows))
+            stats["tables"][table] = {
+                "rows": len(rows),
+                "load_seconds": load_time,
+                "merge_seconds": merge_time,
+                "rows_per_second": rate,
+            }
+            logger.info(
+                f"表 {TABLE_PREFIX}{table}: {len(rows)} 行, 载入 {load_time:.2f} 秒, "
+                f"合并 {merge_time:.2f} 秒, {rate:.0f} 行/秒"
+            )
+
+        conn.commit()
+        record_rows_written(
+            {table: info["rows"] for table, info in stats["tables"].items()}
+        )
+        record_job_outcomes(stats["inserted"], stats["refreshed"], stats["unchanged"])
+        for interner, mapping in resolved:
+            interner.remember(mapping)
+        logger.info(f"批量导入完成，写入岗位 {len(new_jobs)} 个")
+        return stats
+    except Error as e:
+        logger.error(f"批量导入数据时出错: {e}")
+        try:
+            conn.rollback()
+        except Error:
+            pass
+        return None
+    finally:
+        if cursor is not None:
+            for stage in staged_tables:
+                try:
+                    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+                except Error:
+                    pass
+            cursor.close()
+        conn.close()
+        shutil.rmtree(staging_dir, ignore_errors=True)
@@ -0,0 +1,248 @@
+"""
+Crawl checkpoint module: persists per-work-item paging progress atomically so interrupted crawls can resume.
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime
+from loguru import logger
+from config.settings import CHECKPOINT_FILE
+from src.json_codec import dumps, load_file
+
+# 不参与工作项标识的请求参数：页码和防缓存时间戳每次请求都不同
+_VOLATILE_PARAMS = ("page", "_")
+
+
+def checkpoint_key(url, params):
+    """
+    生成工作项的标识：目标URL加上除页码、时间戳外的全部请求参数
+
+    Args:
+        url: 目标URL
+        params: 请求参数
+
+    Returns:
+        str: 工作项标识
+    """
+    stable = sorted(
+        (k, str(v)) for k, v in params.items() if k not in _VOLATILE_PARAMS
+    )
+    return url + "?" + "&".join(f"{k}={v}" for k, v in stable)
+
+
+class CrawlCheckpoint:
+    """
+    抓取进度记录，每个工作项（URL、关键词、城市和筛选参数）一条：
+    last_page（已写入的最后一页）、has_more、res_count、status和更新时间
+
+    一页只有在岗位写入存储后才算完成。使用写入流水线时页面可能乱序写完，
+    last_page只推进到连续写完的最大页码，中断后从它的下一页继续，不会漏页。
+    每次推进都通过临时文件 + os.replace整体替换进度文件，中途崩溃不会留下半个文件
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._items = {}
+        # 已写入但前面还有页未写完的页码：key -> {页码: (has_more, res_count)}
+        self._pending = {}
+        self._load()
+
+    @property
+    def path(self):
+        return self._path
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return
+        try:
+            self._items = load_file(self._path).get("items", {})
+            logger.info(f"已加载抓取进度: {self._path}（{len(self._items)} 个工作项）")
+        except Exception as e:
+            logger.error(f"读取抓取进度文件 {self._path} 时出错，将重新开始: {e}")
+            self._items = {}
+
+    def _save(self):
+        """整体写入进度文件（调用方持有锁）"""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".checkpoint-", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                data = {"version": 1, "items": self._items}
+                f.write(dumps(data, indent=True))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+        except Exception as e:
+            logger.error(f"保存抓取进度时出错: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def start(self, url, params):
+        """
+        开始（或继续）一个工作项
+
+        Args:
+            url: 目标URL
+            params: 请求参数
+
+        Returns:
+            tuple: (工作项标识, 起始页码)，工作项已完成时起始页码为None
+        """
+        key = checkpoint_key(url, params)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = {
+                    "url": url,
+                    "query": params.get("query"),
+                    "city": params.get("city"),
+                    "last_page": 0,
+                    "has_more": True,
+                    "res_count": None,
+                    "final_page": None,
+                    "status": "running",
+                }
+                self._items[key] = item
+            elif item["status"] == "complete" or not item["has_more"]:
+                # 最后写入的一页已经没有更多数据，只是没来得及标记完成
+                item["status"] = "complete"
+                return key, None
+            else:
+                item["status"] = "running"
+            self._pending[key] = {}
+            item["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+            return key, item["last_page"] + 1
+
+    def page_done(self, key, page, has_more, res_count):
+        """
+        记录一页已经写入存储，按连续页码推进last_page并持久化
+
+        Args:
+            key: 工作项标识
+            page: 页码
+            has_more: 该页返回的hasMore
+            res_count: 该页返回的resCount
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or page <= item["last_page"]:
+                return
+            pending = self._pending.setdefault(key, {})
+            pending[page] = (has_more, res_count)
+            advanced = False
+            while item["last_page"] + 1 in pending:
+                item["last_page"] += 1
+                item["has_more"], res = pending.pop(item["last_page"])
+                if res is not None:
+                    item["res_count"] = res
+                advanced = True
+            if not advanced:
+                return
+            self._complete_if_done(item)
+            item["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    def finish(self, key, final_page):
+        """
+        记录工作项的最后一页（没有更多数据或达到最大页数），
+        该页及之前的页都写入后工作项即为完成
+
+        Args:
+            key: 工作项标识
+            final_page: 最后一页的页码
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return
+            item["final_page"] = final_page
+            self._complete_if_done(item)
+            item["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    def fail(self, key):
+        """记录工作项未能完成，下次运行时从last_page的下一页继续"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item["status"] == "complete":
+                return
+            item["status"] = "failed"
+            item["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    @staticmethod
+    def _complete_if_done(item):
+        if item["final_page"] is not None and item["last_page"] >= item["final_page"]:
+            item["status"] = "complete"
+
+    def incomplete_items(self):
+        """
+        获取未完成的工作项
+
+        Returns:
+            list: 进度字典列表
+        """
+        with self._lock:
+            return [
+                dict(item)
+                for item in self._items.values()
+                if item["status"] != "complete"
+            ]
+
+    def items(self):
+        """获取全部工作项的进度字典列表"""
+        with self._lock:
+            return [dict(item) for item in self._items.values()]
+
+    def reset(self):
+        """丢弃全部进度并删除进度文件"""
+        with self._lock:
+            self._items = {}
+            self._pending = {}
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+    def finish_run(self):
+        """
+        一次运行结束时调用：全部工作项都已完成时删除进度文件，
+        下一次运行从头开始；否则保留，供下一次运行继续
+
+        Returns:
+            int: 未完成的工作项数
+        """
+        remaining = len(self.incomplete_items())
+        if remaining == 0:
+            self.reset()
+        else:
+            logger.warning(
+                f"还有 {remaining} 个工作项未完成，进度已保存到 {self._path}，"
+                f"再次运行将从中断处继续"
+            )
+        return remaining
+
+
+_checkpoint = None
+_checkpoint_lock = threading.Lock()
+
+
+def get_checkpoint():
+    """
+    获取进程级共享的抓取进度记录，首次调用时从CHECKPOINT_FILE加载
+
+    Returns:
+        CrawlCheckpoint: 抓取进度记录
+    """
+    global _checkpoint
+    if _checkpoint is None:
+        with _checkpoint_lock:
+            if _checkpoint is None:
+                _checkpoint = CrawlCheckpoint(CHECKPOINT_FILE)
+    return _checkpoint
@@ -0,0 +1,317 @@
+"""
+Cookie jar module: in-memory cookies with Set-Cookie attribute parsing, expiry tracking and atomic write-back.
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+import time
+from http.cookiejar import http2time
+from loguru import logger
+from config.settings import COOKIE_FILE, COOKIE_EXPIRY_MARGIN, COOKIE_FLUSH_INTERVAL
+from src.json_codec import dumps, load_file
+
+
+def parse_set_cookie(header):
+    """
+    解析一个Set-Cookie响应头
+
+    Args:
+        header: Set-Cookie的值，如 "a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT; Path=/"
+
+    Returns:
+        tuple: (name, value, expires)，expires为过期时间戳（Max-Age优先于Expires），
+               会话Cookie为None；无法解析时返回None
+    """
+    parts = header.split(";")
+    name, sep, value = parts[0].partition("=")
+    name = name.strip()
+    if not sep or not name:
+        return None
+
+    expires = None
+    max_age = None
+    for attribute in parts[1:]:
+        key, _, attr_value = attribute.partition("=")
+        key = key.strip().lower()
+        attr_value = attr_value.strip()
+        if key == "max-age":
+            try:
+                max_age = int(attr_value)
+            except ValueError:
+                pass
+        elif key == "expires":
+            expires = http2time(attr_value)
+    if max_age is not None:
+        # Max-Age<=0表示删除该Cookie
+        expires = time.time() + max_age if max_age > 0 else 0
+    return name, value.strip(), expires
+
+
+def _get_set_cookie_headers(response):
+    """获取响应中的全部Set-Cookie头，requests合并后的headers会把多个值用逗号连接"""
+    raw_headers = getattr(getattr(response, "raw", None), "headers", None)
+    if raw_headers is not None and hasattr(raw_headers, "getlist"):
+        return raw_headers.getlist("Set-Cookie")
+    value = response.headers.get("set-cookie")
+    return [value] if value else []
+
+
+class CookieJar:
+    """
+    内存中的Cookie容器
+
+    - Cookie保存在内存中，请求时直接读取，不再每次读写文件
+    - 解析Set-Cookie的Expires/Max-Age并记录过期时间，已过期的Cookie不再发送
+    - 发送请求前检查即将在expiry_margin秒内过期的Cookie，提前告警；
+      已过期的Cookie记录下来，调用方据此判断会话是否已经失效
+    - 只在内容有变化时写回文件，两次写回至少间隔flush_interval秒，退出时补写；
+      写回通过临时文件 + os.replace整体替换
+
+    文件格式为 {名称: {"value": 值, "expires": 时间戳或null}}，
+    也兼容 --set-cookie 写入的 {名称: 值} 格式
+    """
+
+    def __init__(self, path, expiry_margin=3600, flush_interval=30):
+        self.path = path
+        self._expiry_margin = expiry_margin
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._cookies = {}
+        self._expired = set()
+        self._warned = {}
+        self._dirty = False
+        self._last_flush = float("-inf")
+        self._stats = {"updates": 0, "flushes": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            logger.info("没有找到Cookie文件或文件为空")
+            return
+        try:
+            data = load_file(self.path) or {}
+        except Exception as e:
+            logger.error(f"加载Cookie文件 {self.path} 时出错: {e}")
+            return
+        self._cookies = {
+            name: dict(entry) if isinstance(entry, dict) else {"value": str(entry)}
+            for name, entry in data.items()
+        }
+        logger.info(f"已加载 {len(self._cookies)} 个Cookie")
+
+    def _expire(self, now):
+        """移除已过期的Cookie并记录（调用方持有锁）"""
+        expired = [
+            name
+            for name, entry in self._cookies.items()
+            if entry.get("expires") is not None and entry["expires"] <= now
+        ]
+        for name in expired:
+            del self._cookies[name]
+            self._expired.add(name)
+            self._dirty = True
+            logger.warning(f"Cookie {name} 已过期")
+
+    def get_cookies(self):
+        """
+        获取当前有效的Cookie
+
+        Returns:
+            dict: {名称: 值}
+        """
+        with self._lock:
+            self._expire(time.time())
+            return {name: entry["value"] for name, entry in self._cookies.items()}
+
+    def cookies_for_request(self):
+        """
+        发送请求前获取有效的Cookie，并对即将过期的Cookie告警（每个过期时间只告警一次）
+
+        Returns:
+            dict: {名称: 值}
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            for name, entry in self._cookies.items():
+                expires = entry.get("expires")
+                if expires is None or expires - now > self._expiry_margin:
+                    continue
+                if self._warned.get(name) != expires:
+                    self._warned[name] = expires
+                    logger.warning(
+                        f"Cookie {name} 将在 {(expires - now) / 60:.0f} 分钟后过期，"
+                        f"请及时使用 --set-cookie 更新"
+                    )
+            return {name: entry["value"] for name, entry in self._cookies.items()}
+
+    def expired_names(self):
+        """
+        获取已经过期且之后没有被响应刷新的Cookie名称
+
+        Returns:
+            list: Cookie名称列表，非空表示会话很可能已经失效
+        """
+        with self._lock:
+            self._expire(time.time())
+            return sorted(self._expired)
+
+    def update_from_response(self, response):
+        """
+        按响应的Set-Cookie更新Cookie，有变化时按写回间隔写回文件
+
+        Args:
+            response: 请求响应对象
+
+        Returns:
+            bool: Cookie是否有变化
+        """
+        changed = False
+        now = time.time()
+        with self._lock:
+            for header in _get_set_cookie_headers(response):
+                parsed = parse_set_cookie(header)
+                if parsed is None:
+                    continue
+                name, value, expires = parsed
+                if expires is not None and expires <= now:
+                    # 服务端要求删除该Cookie
+                    if self._cookies.pop(name, None) is not None:
+                        changed = True
+                    continue
+                entry = {"value": value, "expires": expires}
+                if self._cookies.get(name) != entry:
+                    self._cookies[name] = entry
+                    self._expired.discard(name)
+                    changed = True
+                    logger.debug(f"已更新Cookie: {name}")
+            if changed:
+                self._dirty = True
+                self._stats["updates"] += 1
+        if changed:
+            self.flush()
+        return changed
+
+    def replace(self, cookies):
+        """
+        用{名称: 值}整体替换Cookie并立即写回文件
+
+        Args:
+            cookies: Cookie字典
+
+        Returns:
+            bool: 写回是否成功
+        """
+        with self._lock:
+            self._cookies = {name: {"value": str(v)} for name, v in cookies.items()}
+            self._expired.clear()
+            self._warned.clear()
+            self._dirty = True
+        return self.flush(force=True)
+
+    def flush(self, force=False):
+        """
+        有变化时把Cookie写回文件，未到写回间隔时安排定时写回
+
+        Args:
+            force: 是否忽略写回间隔立即写回
+
+        Returns:
+            bool: 写回是否成功（没有变化或未到写回间隔时返回True）
+        """
+        # 写文件串行进行，保证较新的内容不会被较旧的内容覆盖
+        with self._write_lock:
+            with self._lock:
+                now = time.monotonic()
+                if not self._dirty:
+                    return True
+                wait = self._last_flush + self._flush_interval - now
+                if not force and wait > 0:
+                    if self._timer is None:
+                        self._timer = threading.Timer(wait, self._flush_on_timer)
+                        self._timer.daemon = True
+                        self._timer.start()
+                    return True
+                data = dict(self._cookies)
+                self._dirty = False
+                self._last_flush = now
+
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=".cookies-", dir=directory)
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(dumps(data, indent=True))
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+            except Exception as e:
+                logger.error(f"保存Cookie文件 {self.path} 时出错: {e}")
+                with self._lock:
+                    self._dirty = True
+                return False
+            with self._lock:
+                self._stats["flushes"] += 1
+            return True
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def get_stats(self):
+        """
+        获取Cookie容器统计信息
+
+        Returns:
+            dict: 包含Cookie数cookies、有变化的响应数updates、写回次数flushes
+                  和已过期的Cookie数expired
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cookies"] = len(self._cookies)
+            stats["expired"] = len(self._expired)
+        return stats
+
+
+_jar = None
+_jar_lock = threading.Lock()
+
+
+def get_cookie_jar():
+    """
+    获取进程级共享的Cookie容器，首次调用时从COOKIE_FILE加载
+
+    Returns:
+        CookieJar: Cookie容器
+    """
+    global _jar
+    if _jar is None:
+        with _jar_lock:
+            if _jar is None:
+                _jar = CookieJar(
+                    COOKIE_FILE, COOKIE_EXPIRY_MARGIN, COOKIE_FLUSH_INTERVAL
+                )
+    return _jar
+
+
+def flush_cookie_jar():
+    """退出时写回尚未写回的Cookie变化"""
+    if _jar is None:
+        return
+    _jar.flush(force=True)
+    stats = _jar.get_stats()
+    if stats["updates"]:
+        logger.info(
+            f"Cookie: {stats['cookies']} 个, 响应更新 {stats['updates']} 次, "
+            f"写回文件 {stats['flushes']} 次, 已过期 {stats['expired']} 个"
+        )
+
+
+atexit.register(flush_cookie_jar)
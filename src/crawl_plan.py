@@ -0,0 +1,175 @@
+"""
+Crawl plan module: expands keyword × city × filter matrices from a plan file into prioritised work items.
+"""
+
+import os
+from loguru import logger
+from config.settings import DEFAULT_PARAMS
+from src.json_codec import load_file
+
+# YAML格式的计划文件需要PyYAML，JSON格式无需额外依赖
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class WorkItem:
+    """
+    一个抓取工作项：一个关键词、一个城市和一组额外筛选参数
+
+    Attributes:
+        query: 搜索关键词
+        city: 城市代码
+        filters: 额外的请求参数（如experience、degree、salary等）
+        max_pages: 最大爬取页数，None表示直到没有更多数据
+        priority: 优先级，数值越大越先执行
+    """
+
+    def __init__(self, query, city, filters=None, max_pages=None, priority=0):
+        self.query = query
+        self.city = city
+        self.filters = dict(filters or {})
+        self.max_pages = max_pages
+        self.priority = priority
+
+    @property
+    def key(self):
+        """工作项的去重键：关键词、城市和筛选参数相同即为同一项"""
+        return (self.query, self.city, tuple(sorted(self.filters.items())))
+
+    def build_params(self, base_params=None):
+        """
+        生成该工作项的请求参数
+
+        Args:
+            base_params: 基础请求参数(可选)，默认使用DEFAULT_PARAMS
+
+        Returns:
+            dict: 请求参数
+        """
+        params = dict(base_params if base_params is not None else DEFAULT_PARAMS)
+        params.update(self.filters)
+        params["query"] = self.query
+        params["city"] = self.city
+        params["page"] = 1
+        return params
+
+    def __repr__(self):
+        filters = f", {self.filters}" if self.filters else ""
+        return (
+            f"WorkItem({self.query}@{self.city}{filters}, "
+            f"max_pages={self.max_pages}, priority={self.priority})"
+        )
+
+
+def _as_list(value):
+    """把单个值或列表统一为列表，None返回空列表"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def expand_crawl_plan(plan):
+    """
+    把计划展开为工作项列表
+
+    计划顶层可以设置max_pages、priority和filters作为默认值；matrix中的每一组
+    声明queries、cities以及filters（一组或多组筛选参数），展开为三者的笛卡尔积。
+    没有matrix时顶层本身就是唯一的一组。重复的组合只保留优先级最高的一项
+
+    Args:
+        plan: 计划字典
+
+    Returns:
+        list: 按优先级从高到低排列的WorkItem列表，同优先级保持声明顺序
+    """
+    defaults = {
+        "max_pages": plan.get("max_pages"),
+        "priority": plan.get("priority", 0),
+        "filters": plan.get("filters") or {},
+        "queries": plan.get("queries"),
+        "cities": plan.get("cities"),
+    }
+    groups = plan.get("matrix") or [{}]
+
+    items = {}
+    for index, group in enumerate(groups, 1):
+        queries = _as_list(group.get("queries", defaults["queries"]))
+        cities = _as_list(group.get("cities", defaults["cities"]))
+        if not queries:
+            queries = [DEFAULT_PARAMS["query"]]
+        if not cities:
+            cities = [DEFAULT_PARAMS["city"]]
+
+        # 组内的每组筛选参数都在顶层筛选参数的基础上覆盖
+        filter_sets = _as_list(group.get("filters")) or [{}]
+        max_pages = group.get("max_pages", defaults["max_pages"])
+        priority = group.get("priority", defaults["priority"])
+
+        for filters in filter_sets:
+            merged = {
+                k: str(v) for k, v in {**defaults["filters"], **filters}.items()
+            }
+            for query in queries:
+                for city in cities:
+                    item = WorkItem(
+                        str(query).strip(),
+                        str(city).strip(),
+                        merged,
+                        int(max_pages) if max_pages else None,
+                        int(priority),
+                    )
+                    existing = items.get(item.key)
+                    if existing is None or item.priority > existing.priority:
+                        items[item.key] = item
+        logger.debug(
+            f"计划第 {index} 组: {len(queries)} 个关键词 × {len(cities)} 个城市 × "
+            f"{len(filter_sets)} 组筛选"
+        )
+
+    # sorted是稳定排序，同优先级的工作项保持声明顺序
+    return sorted(items.values(), key=lambda item: -item.priority)
+
+
+def load_crawl_plan(path):
+    """
+    读取计划文件并展开为工作项
+
+    Args:
+        path: 计划文件路径，.yaml/.yml按YAML解析，其余按JSON解析
+
+    Returns:
+        list: WorkItem列表，读取或解析失败时返回None
+    """
+    if not os.path.exists(path):
+        logger.error(f"计划文件不存在: {path}")
+        return None
+
+    try:
+        if path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                logger.error("解析YAML计划文件需要安装PyYAML，或改用JSON格式")
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                plan = yaml.safe_load(f)
+        else:
+            plan = load_file(path)
+    except Exception as e:
+        logger.error(f"解析计划文件 {path} 时出错: {e}")
+        return None
+
+    if not isinstance(plan, dict):
+        logger.error(f"计划文件格式错误，顶层应为对象: {path}")
+        return None
+
+    try:
+        items = expand_crawl_plan(plan)
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.error(f"展开计划文件 {path} 时出错: {e}")
+        return None
+
+    logger.info(f"计划文件 {path} 展开为 {len(items)} 个工作项")
+    return items
@@ -2,24 +2,79 @@
 Database operation module for handling connections and CRUD operations with MySQL.
 """
 
-import mysql.connector
 from mysql.connector import Error
 from loguru import logger
-from config.db_config import DB_CONFIG, TABLE_PREFIX, CHARSET, COLLATION
+from config.db_config import (
+    TABLE_PREFIX,
+    CHARSET,
+    COLLATION,
+    REQUEST_LOG_PARTITION_DAYS_AHEAD,
+    REQUEST_LOG_RETENTION_DAYS,
+)
+from src.db_pool import get_pool
+from src.dim_cache import recruiter_cache, company_cache
+from src.dictionary import DICTIONARIES, get_interner
+from src.metrics import counter, histogram
+from src.upsert_plan import get_plan
+import hashlib
 import json
+import re
+from datetime import date, datetime, timedelta
+
+DB_WRITE_SECONDS = histogram(
+    "boss_db_write_seconds", "按表统计的数据库写入耗时（秒）", ("table",)
+)
+DB_ROWS_WRITTEN = counter(
+    "boss_db_rows_written_total", "按表统计的写入行数（含删除的行）", ("table",)
+)
+JOBS_PROCESSED = counter(
+    "boss_jobs_total",
+    "处理的岗位数，status为new（新岗位）、changed（已存在且内容有变化）"
+    "或unchanged（已存在且内容未变化）",
+    ("status",),
+)
+
+
+def record_job_outcomes(new, changed, unchanged):
+    """
+    记录一批岗位中新岗位、内容有变化和内容未变化的岗位数（写入成功后调用）
+
+    Args:
+        new: 新岗位数
+        changed: 已存在且内容有变化的岗位数
+        unchanged: 已存在且内容未变化的岗位数
+    """
+    for status, count in (
+        ("new", new),
+        ("changed", changed),
+        ("unchanged", unchanged),
+    ):
+        if count:
+            JOBS_PROCESSED.inc(count, status=status)
+
+
+def record_rows_written(written):
+    """
+    记录各表写入的行数（事务提交成功后调用，回滚后改为逐条重试的行不会重复计数）
+
+    Args:
+        written: 不带前缀的表名 -> 写入行数
+    """
+    for table, count in written.items():
+        DB_ROWS_WRITTEN.inc(count, table=table)
 
 
 def get_connection():
     """
-    创建与MySQL数据库的连接
+    从共享连接池获取MySQL连接
+
+    连接用完后调用close()即归还连接池，而不是断开与服务器的连接
 
     Returns:
-        conn: MySQL连接对象，如果连接失败则返回None
+        conn: 池化的MySQL连接对象，如果获取失败则返回None
     """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        if conn.is_connected():
-            return conn
+        return get_pool().acquire()
     except Error as e:
         logger.error(f"连接到MySQL时出错: {e}")
         return None
@@ -27,469 +82,1343 @@ def get_connection():
 
 def create_tables():
     """
-    创建数据表（如果不存在）
-    根据BOSS直聘的数据结构创建相应的表
+    创建或升级数据表结构
+
+    按版本号依次执行尚未应用的迁移（见src/migrations.py），结构已是最新时迁移
+    只需一次版本查询；随后补齐请求日志表的按天分区，这一步每次启动都会查询一次
+    INFORMATION_SCHEMA.PARTITIONS，已有分区不足今天之后
+    REQUEST_LOG_PARTITION_DAYS_AHEAD天时还会执行REORGANIZE PARTITION
+
+    Returns:
+        bool: 操作是否成功
     """
+    # migrations模块依赖本模块的建表函数，在此处导入以避免循环引用
+    from src.migrations import apply_migrations
+
     conn = get_connection()
     if conn is None:
         return False
 
+    cursor = None
     try:
         cursor = conn.cursor()
+        apply_migrations(cursor)
+        ensure_request_log_partitions(cursor)
+        conn.commit()
+        return True
+    except Error as e:
+        logger.error(f"创建表时出错: {e}")
+        return False
+    finally:
+        if cursor is not None:
+            cursor.close()
+        conn.close()
 
-        # 创建工作岗位表
-        cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}jobs (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID（encryptJobId）',
-            job_name VARCHAR(100) NOT NULL COMMENT '岗位名称',
-            salary_desc VARCHAR(50) COMMENT '薪资描述',
-            job_experience VARCHAR(50) COMMENT '工作经验要求',
-            job_degree VARCHAR(50) COMMENT '学历要求',
-            city_name VARCHAR(50) COMMENT '城市名称',
-            city_code VARCHAR(20) COMMENT '城市代码',
-            area_district VARCHAR(50) COMMENT '区域',
-            business_district VARCHAR(50) COMMENT '商圈',
-            lid VARCHAR(100) COMMENT '岗位标识符',
-            item_id INT COMMENT '列表中的项目ID',
-            security_id VARCHAR(255) COMMENT '安全ID',
-            job_type INT DEFAULT 0 COMMENT '岗位类型',
-            proxy_job TINYINT(1) DEFAULT 0 COMMENT '是否为代理岗位',
-            anonymous TINYINT(3) DEFAULT 0 COMMENT '匿名状态',
-            outland TINYINT(1) DEFAULT 0 COMMENT '是否为外地岗位',
-            longitude DECIMAL(10, 6) COMMENT '经度',
-            latitude DECIMAL(10, 6) COMMENT '纬度',
-            is_shield TINYINT(1) DEFAULT 0 COMMENT '是否被屏蔽',
-            show_top_position TINYINT(1) DEFAULT 0 COMMENT '是否置顶显示', 
-            ats_direct_post TINYINT(1) DEFAULT 0 COMMENT 'ATS直接发布标志',
-            days_per_week_desc VARCHAR(50) COMMENT '每周工作天数描述',
-            least_month_desc VARCHAR(50) COMMENT '最短工作月数描述',
-            optimal TINYINT(1) DEFAULT 0 COMMENT '是否为优质岗位',
-            search_term VARCHAR(100) COMMENT '搜索关键词',
-            page_number INT COMMENT '页码',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
-            UNIQUE KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='BOSS直聘岗位信息表';
+
+def create_base_schema(cursor):
+    """
+    创建基础表结构（如果不存在），并把旧版本创建的表升级到当前结构
+    根据BOSS直聘的数据结构创建相应的表
+
+    Args:
+        cursor: 数据库游标
+    """
+    # 创建工作岗位表
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}jobs (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID（encryptJobId）',
+        job_name VARCHAR(100) NOT NULL COMMENT '岗位名称',
+        salary_desc VARCHAR(50) COMMENT '薪资描述',
+        job_experience VARCHAR(50) COMMENT '工作经验要求',
+        job_degree VARCHAR(50) COMMENT '学历要求',
+        city_name VARCHAR(50) COMMENT '城市名称',
+        city_code VARCHAR(20) COMMENT '城市代码',
+        area_district VARCHAR(50) COMMENT '区域',
+        business_district VARCHAR(50) COMMENT '商圈',
+        lid VARCHAR(100) COMMENT '岗位标识符',
+        item_id INT COMMENT '列表中的项目ID',
+        security_id VARCHAR(255) COMMENT '安全ID',
+        job_type INT DEFAULT 0 COMMENT '岗位类型',
+        proxy_job TINYINT(1) DEFAULT 0 COMMENT '是否为代理岗位',
+        anonymous TINYINT(3) DEFAULT 0 COMMENT '匿名状态',
+        outland TINYINT(1) DEFAULT 0 COMMENT '是否为外地岗位',
+        longitude DECIMAL(10, 6) COMMENT '经度',
+        latitude DECIMAL(10, 6) COMMENT '纬度',
+        is_shield TINYINT(1) DEFAULT 0 COMMENT '是否被屏蔽',
+        show_top_position TINYINT(1) DEFAULT 0 COMMENT '是否置顶显示', 
+        ats_direct_post TINYINT(1) DEFAULT 0 COMMENT 'ATS直接发布标志',
+        days_per_week_desc VARCHAR(50) COMMENT '每周工作天数描述',
+        least_month_desc VARCHAR(50) COMMENT '最短工作月数描述',
+        optimal TINYINT(1) DEFAULT 0 COMMENT '是否为优质岗位',
+        search_term VARCHAR(100) COMMENT '搜索关键词',
+        page_number INT COMMENT '页码',
+        content_hash CHAR(32) COMMENT '岗位内容指纹',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+        UNIQUE KEY (job_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='BOSS直聘岗位信息表';
+    """
+    )
+
+    # 创建岗位图标标志表（多对多关系）
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_icon_flags (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        icon_flag INT NOT NULL COMMENT '图标标志值',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY uk_job_value (job_id, icon_flag)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位图标标志表';
+    """
+    )
+
+    # 创建公司（品牌）表
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}companies (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        brand_id VARCHAR(50) COMMENT '公司ID（encryptBrandId）',
+        brand_name VARCHAR(100) NOT NULL COMMENT '公司名称',
+        brand_logo TEXT COMMENT '公司logo URL',
+        brand_stage_name VARCHAR(50) COMMENT '融资阶段',
+        brand_industry VARCHAR(100) COMMENT '行业',
+        industry_code INT COMMENT '行业代码',
+        brand_scale_name VARCHAR(50) COMMENT '公司规模',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+        UNIQUE KEY (brand_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='公司信息表';
+    """
+    )
+
+    # 创建招聘者（Boss）表
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}recruiters (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        boss_id VARCHAR(50) NOT NULL COMMENT 'Boss ID（encryptBossId）',
+        boss_name VARCHAR(50) COMMENT 'Boss姓名',
+        boss_title VARCHAR(100) COMMENT 'Boss职位',
+        boss_avatar TEXT COMMENT 'Boss头像URL',
+        boss_cert TINYINT DEFAULT 0 COMMENT 'Boss认证状态',
+        gold_hunter TINYINT(1) DEFAULT 0 COMMENT '是否为金牌猎头',
+        boss_online TINYINT(1) DEFAULT 0 COMMENT 'Boss是否在线',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+        UNIQUE KEY (boss_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='招聘者信息表';
+    """
+    )
+
+    # 创建岗位-公司-招聘者关系表
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_company_recruiter (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        brand_id VARCHAR(50) COMMENT '公司ID',
+        boss_id VARCHAR(50) COMMENT 'Boss ID',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (job_id),
+        KEY (brand_id),
+        KEY (boss_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位-公司-招聘者关系表';
+    """
+    )
+
+    # 旧版本的请求记录表（整行JSON存储）先改名，创建新表后再迁移数据
+    _rename_legacy_request_logs(cursor)
+
+    # 创建请求记录表（按天RANGE分区，主键须包含分区字段）
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}request_logs (
+        id BIGINT AUTO_INCREMENT COMMENT '自增主键',
+        url VARCHAR(255) NOT NULL COMMENT '请求URL',
+        query VARCHAR(100) COMMENT '搜索关键词',
+        city VARCHAR(20) COMMENT '城市代码',
+        page INT COMMENT '页码',
+        status_code SMALLINT COMMENT 'HTTP状态码',
+        response_time DECIMAL(10,3) COMMENT '响应时间（秒）',
+        total_results INT COMMENT '总结果数',
+        has_more TINYINT(1) COMMENT '是否有更多结果',
+        cookie_set_id INT COMMENT 'Cookie集合字典ID',
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        PRIMARY KEY (id, created_at),
+        KEY idx_created_response (created_at, response_time)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='API请求日志表'
+    PARTITION BY RANGE (TO_DAYS(created_at)) (
+        PARTITION pmax VALUES LESS THAN MAXVALUE
+    );
+    """
+    )
+
+    # 创建Cookie集合字典表（相同的Cookie只存储一次）
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_cookie_sets (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '字典ID',
+        cookies TEXT NOT NULL COMMENT 'Cookie JSON',
+        value_hash CHAR(32) NOT NULL COMMENT '内容MD5',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (value_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='Cookie集合字典表';
+    """
+    )
+
+    # 改名和建表会隐式提交，迁移数据失败后重跑时旧表已经改过名，
+    # 因此按旧表是否存在决定是否迁移，已迁移过的行会被跳过
+    if _get_table_type(cursor, "request_logs_legacy") == "BASE TABLE":
+        _migrate_request_logs(cursor)
+
+    # 创建标签、技能、福利、图标URL字典表（重复字符串只存储一次）
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_labels (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '字典ID',
+        label VARCHAR(50) NOT NULL COMMENT '标签内容',
+        value_hash CHAR(32) NOT NULL COMMENT '内容MD5',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (value_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位标签字典表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_skills (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '字典ID',
+        skill VARCHAR(50) NOT NULL COMMENT '技能内容',
+        value_hash CHAR(32) NOT NULL COMMENT '内容MD5',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (value_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位技能字典表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_welfare (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '字典ID',
+        welfare VARCHAR(50) NOT NULL COMMENT '福利内容',
+        value_hash CHAR(32) NOT NULL COMMENT '内容MD5',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (value_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='公司福利字典表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_icon_urls (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '字典ID',
+        icon_url TEXT NOT NULL COMMENT '图标URL',
+        value_hash CHAR(32) NOT NULL COMMENT '内容MD5',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY (value_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='名称图标URL字典表';
+    """
+    )
+
+    # 创建岗位与字典值的关联表（多对多关系）
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_label_links (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        label_id INT NOT NULL COMMENT '标签字典ID',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY uk_job_value (job_id, label_id),
+        KEY (label_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位标签关联表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_skill_links (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        skill_id INT NOT NULL COMMENT '技能字典ID',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY uk_job_value (job_id, skill_id),
+        KEY (skill_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位技能关联表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}company_welfare_links (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        welfare_id INT NOT NULL COMMENT '福利字典ID',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY uk_job_value (job_id, welfare_id),
+        KEY (welfare_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='公司福利关联表';
+    """
+    )
+
+    cursor.execute(
+        f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}name_icon_links (
+        id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
+        job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
+        icon_id INT NOT NULL COMMENT '图标URL字典ID',
+        position ENUM('before', 'after') NOT NULL COMMENT '图标位置：名称前/名称后',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+        UNIQUE KEY uk_job_value (job_id, position, icon_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='名称图标关联表';
+    """
+    )
+
+    # 为旧版本创建的表补充字段和唯一键
+    _ensure_column(
+        cursor,
+        "jobs",
+        "content_hash",
+        "CHAR(32) COMMENT '岗位内容指纹' AFTER page_number",
+    )
+    _ensure_child_unique_keys(cursor)
+
+    # 将旧版本的字符串子表迁移为字典编码存储，并创建同名兼容视图
+    _migrate_dictionary_tables(cursor)
+    _create_compat_views(cursor)
+
+
+# 子表上的(job_id, 值)唯一键：(表名, 唯一键字段定义, 判断重复的字段)
+CHILD_UNIQUE_KEYS = [
+    ("job_icon_flags", "job_id, icon_flag", ["job_id", "icon_flag"]),
+]
+
+# 字典编码的子表：(兼容视图名即旧表名, 关联表, 字典ID字段, 字典类型, 附加字段)
+DICTIONARY_CHILD_TABLES = [
+    ("job_labels", "job_label_links", "label_id", "labels", []),
+    ("job_skills", "job_skill_links", "skill_id", "skills", []),
+    ("company_welfare", "company_welfare_links", "welfare_id", "welfare", []),
+    ("name_icons", "name_icon_links", "icon_id", "icon_urls", ["position"]),
+]
+
+
+def _ensure_column(cursor, table, column, definition):
+    """
+    检查表中是否存在指定字段，不存在则添加
+
+    Args:
+        cursor: 数据库游标
+        table: 不带前缀的表名
+        column: 字段名
+        definition: 字段定义（类型、注释、位置）
+    """
+    cursor.execute(
         """
-        )
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        LIMIT 1
+        """,
+        (f"{TABLE_PREFIX}{table}", column),
+    )
+    if cursor.fetchone():
+        return
+
+    logger.info(f"为表 {TABLE_PREFIX}{table} 添加字段 {column}")
+    cursor.execute(
+        f"ALTER TABLE {TABLE_PREFIX}{table} ADD COLUMN {column} {definition}"
+    )
+
+
+def _ensure_index(cursor, table, index_name, columns):
+    """
+    检查表中是否存在指定索引，不存在则添加
 
-        # 创建岗位标签表（多对多关系）
-        cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_labels (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            label VARCHAR(50) NOT NULL COMMENT '标签内容',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位标签表';
+    Args:
+        cursor: 数据库游标
+        table: 不带前缀的表名
+        index_name: 索引名
+        columns: 索引字段定义
+    """
+    cursor.execute(
         """
+        SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+        """,
+        (f"{TABLE_PREFIX}{table}", index_name),
+    )
+    if cursor.fetchone():
+        return
+
+    logger.info(f"为表 {TABLE_PREFIX}{table} 添加索引 {index_name} ({columns})")
+    cursor.execute(
+        f"ALTER TABLE {TABLE_PREFIX}{table} ADD INDEX {index_name} ({columns})"
+    )
+
+
+def add_analytics_indexes(cursor):
+    """
+    为常用的分析查询添加薪资字段和组合索引
+
+    新增的salary_min、salary_max由salary_desc解析得到，已有岗位在此一并回填
+
+    Args:
+        cursor: 数据库游标
+    """
+    _ensure_column(
+        cursor,
+        "jobs",
+        "salary_min",
+        "INT COMMENT '最低月薪（千元）' AFTER salary_desc",
+    )
+    _ensure_column(
+        cursor,
+        "jobs",
+        "salary_max",
+        "INT COMMENT '最高月薪（千元）' AFTER salary_min",
+    )
+    _ensure_index(cursor, "jobs", "idx_search_city", "search_term, city_code")
+    _ensure_index(cursor, "jobs", "idx_created_at", "created_at")
+    _ensure_index(cursor, "jobs", "idx_salary", "salary_min, salary_max")
+    _ensure_index(
+        cursor, "job_company_recruiter", "idx_brand_created", "brand_id, created_at"
+    )
+
+    cursor.execute(
+        f"SELECT job_id, salary_desc FROM {TABLE_PREFIX}jobs "
+        f"WHERE salary_desc IS NOT NULL AND salary_min IS NULL"
+    )
+    updates = []
+    for job_id, salary_desc in cursor.fetchall():
+        salary_min, salary_max = parse_salary(salary_desc)
+        if salary_min is not None:
+            updates.append((salary_min, salary_max, job_id))
+    if updates:
+        cursor.executemany(
+            f"UPDATE {TABLE_PREFIX}jobs SET salary_min = %s, salary_max = %s "
+            f"WHERE job_id = %s",
+            updates,
         )
+        logger.info(f"已回填 {len(updates)} 个岗位的薪资范围")
+
+
+def _ensure_child_unique_keys(cursor):
+    """
+    检查子表是否已有(job_id, 值)唯一键，没有则先清理重复行再添加
 
-        # 创建岗位技能表（多对多关系）
+    Args:
+        cursor: 数据库游标
+    """
+    for table, key_columns, match_columns in CHILD_UNIQUE_KEYS:
         cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_skills (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            skill VARCHAR(50) NOT NULL COMMENT '技能内容',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位技能要求表';
-        """
+            """
+            SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+              AND INDEX_NAME = 'uk_job_value'
+            LIMIT 1
+            """,
+            (f"{TABLE_PREFIX}{table}",),
         )
+        if cursor.fetchone():
+            continue
 
-        # 创建岗位图标标志表（多对多关系）
+        logger.info(f"为表 {TABLE_PREFIX}{table} 添加唯一键 ({key_columns})")
+        join_condition = " AND ".join([f"a.{c} = b.{c}" for c in match_columns])
         cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_icon_flags (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            icon_flag INT NOT NULL COMMENT '图标标志值',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位图标标志表';
-        """
+            f"DELETE a FROM {TABLE_PREFIX}{table} a "
+            f"JOIN {TABLE_PREFIX}{table} b ON {join_condition} AND a.id > b.id"
         )
-
-        # 创建公司（品牌）表
         cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}companies (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            brand_id VARCHAR(50) COMMENT '公司ID（encryptBrandId）',
-            brand_name VARCHAR(100) NOT NULL COMMENT '公司名称',
-            brand_logo TEXT COMMENT '公司logo URL',
-            brand_stage_name VARCHAR(50) COMMENT '融资阶段',
-            brand_industry VARCHAR(100) COMMENT '行业',
-            industry_code INT COMMENT '行业代码',
-            brand_scale_name VARCHAR(50) COMMENT '公司规模',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
-            UNIQUE KEY (brand_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='公司信息表';
-        """
+            f"ALTER TABLE {TABLE_PREFIX}{table} "
+            f"ADD UNIQUE KEY uk_job_value ({key_columns})"
         )
 
-        # 创建公司福利表（多对多关系）
-        cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}company_welfare (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            welfare VARCHAR(50) NOT NULL COMMENT '福利内容',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='公司福利表';
+
+def _get_table_type(cursor, table):
+    """
+    查询表类型
+
+    Returns:
+        str: 'BASE TABLE'、'VIEW'，表不存在时返回None
+    """
+    cursor.execute(
         """
-        )
+        SELECT TABLE_TYPE FROM INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (f"{TABLE_PREFIX}{table}",),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _migrate_dictionary_tables(cursor):
+    """
+    将旧版本按字符串存储的子表迁移为字典表 + 关联表
+
+    旧表中的数据写入字典表和关联表后，旧表重命名为<表名>_legacy保留备查，
+    确认无误后可手动删除
+
+    Args:
+        cursor: 数据库游标
+    """
+    for legacy, link_table, id_column, kind, extra_columns in DICTIONARY_CHILD_TABLES:
+        if _get_table_type(cursor, legacy) != "BASE TABLE":
+            continue
+
+        dict_table, value_column = DICTIONARIES[kind]
+        dict_table = f"{TABLE_PREFIX}{dict_table}"
+        link_table = f"{TABLE_PREFIX}{link_table}"
+        logger.info(f"正在将表 {TABLE_PREFIX}{legacy} 迁移为字典编码存储...")
 
-        # 创建招聘者（Boss）表
         cursor.execute(
             f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}recruiters (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            boss_id VARCHAR(50) NOT NULL COMMENT 'Boss ID（encryptBossId）',
-            boss_name VARCHAR(50) COMMENT 'Boss姓名',
-            boss_title VARCHAR(100) COMMENT 'Boss职位',
-            boss_avatar TEXT COMMENT 'Boss头像URL',
-            boss_cert TINYINT DEFAULT 0 COMMENT 'Boss认证状态',
-            gold_hunter TINYINT(1) DEFAULT 0 COMMENT '是否为金牌猎头',
-            boss_online TINYINT(1) DEFAULT 0 COMMENT 'Boss是否在线',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
-            UNIQUE KEY (boss_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='招聘者信息表';
-        """
+            INSERT INTO {dict_table} ({value_column}, value_hash)
+            SELECT MIN({value_column}), MD5({value_column})
+            FROM {TABLE_PREFIX}{legacy}
+            GROUP BY MD5({value_column})
+            ON DUPLICATE KEY UPDATE {dict_table}.id = {dict_table}.id
+            """
         )
 
-        # 创建岗位-公司-招聘者关系表
+        columns = ["job_id", id_column] + extra_columns + ["created_at"]
+        select_columns = ["t.job_id", "d.id"] + [f"t.{c}" for c in extra_columns]
         cursor.execute(
             f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_company_recruiter (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            brand_id VARCHAR(50) COMMENT '公司ID',
-            boss_id VARCHAR(50) COMMENT 'Boss ID',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            UNIQUE KEY (job_id),
-            KEY (brand_id),
-            KEY (boss_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='岗位-公司-招聘者关系表';
-        """
+            INSERT INTO {link_table} ({", ".join(columns)})
+            SELECT {", ".join(select_columns)}, t.created_at
+            FROM {TABLE_PREFIX}{legacy} t
+            JOIN {dict_table} d ON d.value_hash = MD5(t.{value_column})
+            ON DUPLICATE KEY UPDATE {link_table}.job_id = {link_table}.job_id
+            """
         )
+        logger.info(f"已迁移 {cursor.rowcount} 行关联数据")
 
-        # 创建请求记录表
         cursor.execute(
-            f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}request_logs (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            url TEXT NOT NULL COMMENT '请求URL',
-            params TEXT COMMENT '请求参数',
-            status_code INT COMMENT 'HTTP状态码',
-            response_time DECIMAL(10,3) COMMENT '响应时间（秒）',
-            total_results INT COMMENT '总结果数',
-            has_more TINYINT(1) COMMENT '是否有更多结果',
-            cookies TEXT COMMENT '请求使用的Cookie',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间'
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='API请求日志表';
-        """
+            f"RENAME TABLE {TABLE_PREFIX}{legacy} TO {TABLE_PREFIX}{legacy}_legacy"
         )
 
-        # 创建图标URL表（名称前后图标）
+
+def _create_compat_views(cursor):
+    """
+    以旧表名创建兼容视图，还原(id, job_id, 值, created_at)结构，现有查询无需修改
+
+    Args:
+        cursor: 数据库游标
+    """
+    for view, link_table, id_column, kind, extra_columns in DICTIONARY_CHILD_TABLES:
+        dict_table, value_column = DICTIONARIES[kind]
+        select_columns = (
+            ["l.id", "l.job_id", f"d.{value_column}"]
+            + [f"l.{c}" for c in extra_columns]
+            + ["l.created_at"]
+        )
         cursor.execute(
             f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}name_icons (
-            id INT AUTO_INCREMENT PRIMARY KEY COMMENT '自增主键',
-            job_id VARCHAR(50) NOT NULL COMMENT '岗位ID',
-            icon_url TEXT NOT NULL COMMENT '图标URL',
-            position ENUM('before', 'after') NOT NULL COMMENT '图标位置：名称前/名称后',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
-            KEY (job_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='名称图标表';
-        """
+            CREATE OR REPLACE VIEW {TABLE_PREFIX}{view} AS
+            SELECT {", ".join(select_columns)}
+            FROM {TABLE_PREFIX}{link_table} l
+            JOIN {TABLE_PREFIX}{dict_table} d ON d.id = l.{id_column}
+            """
         )
 
-        logger.info("数据表创建成功或已存在")
-        conn.commit()
-        return True
-    except Error as e:
-        logger.error(f"创建表时出错: {e}")
+
+def _rename_legacy_request_logs(cursor):
+    """
+    将旧版本的请求记录表（params、cookies整段JSON存储）重命名为request_logs_legacy
+
+    Returns:
+        bool: 本次是否进行了重命名
+    """
+    if _get_table_type(cursor, "request_logs") != "BASE TABLE":
         return False
-    finally:
-        if conn.is_connected():
-            cursor.close()
-            conn.close()
-            logger.info("MySQL连接已关闭")
+    cursor.execute(
+        """
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'params'
+        LIMIT 1
+        """,
+        (f"{TABLE_PREFIX}request_logs",),
+    )
+    if not cursor.fetchone():
+        return False
+
+    cursor.execute(
+        f"RENAME TABLE {TABLE_PREFIX}request_logs "
+        f"TO {TABLE_PREFIX}request_logs_legacy"
+    )
+    return True
 
 
-def insert_job_data(job_data, search_term=None, page_number=None):
+def _migrate_request_logs(cursor):
     """
-    将工作岗位数据插入数据库
-    如果岗位已存在，则直接返回不做修改
+    将旧请求记录表的数据迁移到新表：Cookie写入字典表，参数拆分为独立字段
+
+    旧表保留为request_logs_legacy备查，确认无误后可手动删除。
+    迁移保留旧表中的ID，新表中已存在的ID会被跳过，中途失败后重跑时只迁移剩余的行
 
     Args:
-        job_data: 岗位数据字典
-        search_term: 搜索关键词
-        page_number: 页码
+        cursor: 数据库游标
+    """
+    legacy = f"{TABLE_PREFIX}request_logs_legacy"
+    target = f"{TABLE_PREFIX}request_logs"
+    dict_table = f"{TABLE_PREFIX}dict_cookie_sets"
+
+    cursor.execute(f"SELECT MAX(id) FROM {legacy}")
+    max_id = cursor.fetchone()[0]
+    if max_id is None:
+        return
+    logger.info(f"正在将表 {legacy} 迁移为紧凑的请求日志存储...")
+    # 新写入的日志从旧表最大ID之后编号，不会占用尚未迁移的旧ID
+    cursor.execute(f"ALTER TABLE {target} AUTO_INCREMENT = {int(max_id) + 1}")
+
+    cursor.execute(
+        f"""
+        INSERT INTO {dict_table} (cookies, value_hash)
+        SELECT MIN(cookies), MD5(cookies)
+        FROM {legacy}
+        WHERE cookies IS NOT NULL
+        GROUP BY MD5(cookies)
+        ON DUPLICATE KEY UPDATE {dict_table}.id = {dict_table}.id
+        """
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {target}
+        (id, url, query, city, page, status_code, response_time, total_results,
+         has_more, cookie_set_id, created_at)
+        SELECT t.id, LEFT(t.url, 255),
+               LEFT(JSON_UNQUOTE(JSON_EXTRACT(t.params, '$.query')), 100),
+               LEFT(JSON_UNQUOTE(JSON_EXTRACT(t.params, '$.city')), 20),
+               JSON_EXTRACT(t.params, '$.page'),
+               t.status_code, t.response_time, t.total_results, t.has_more,
+               d.id, COALESCE(t.created_at, NOW())
+        FROM {legacy} t
+        LEFT JOIN {dict_table} d ON d.value_hash = MD5(t.cookies)
+        LEFT JOIN {target} n ON n.id = t.id
+        WHERE n.id IS NULL
+        """
+    )
+    logger.info(f"已迁移 {cursor.rowcount} 条请求日志")
+
+
+def _get_request_log_partitions(cursor):
+    """
+    查询请求记录表的按天分区
 
     Returns:
-        bool: 操作是否成功
+        dict: 分区名 -> 分区对应的日期，不含pmax
+    """
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        AND PARTITION_NAME IS NOT NULL
+        """,
+        (f"{TABLE_PREFIX}request_logs",),
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        if name == "pmax":
+            continue
+        partitions[name] = datetime.strptime(name, "p%Y%m%d").date()
+    return partitions
+
+
+def ensure_request_log_partitions(cursor, days_ahead=None):
+    """
+    为请求记录表预先创建按天分区，从最后一个已有分区（没有时从今天）补到今天之后days_ahead天
+
+    新分区从pmax中拆分，第一个分区同时容纳更早的数据
+
+    Args:
+        cursor: 数据库游标
+        days_ahead: 预建未来分区的天数，默认使用配置REQUEST_LOG_PARTITION_DAYS_AHEAD
     """
+    if days_ahead is None:
+        days_ahead = REQUEST_LOG_PARTITION_DAYS_AHEAD
+
+    partitions = _get_request_log_partitions(cursor)
+    today = date.today()
+    start = max(partitions.values()) + timedelta(days=1) if partitions else today
+    end = today + timedelta(days=days_ahead)
+    if start > end:
+        return
+
+    definitions = []
+    day = start
+    while day <= end:
+        next_day = day + timedelta(days=1)
+        definitions.append(
+            f"PARTITION p{day:%Y%m%d} VALUES LESS THAN "
+            f"(TO_DAYS('{next_day:%Y-%m-%d}'))"
+        )
+        day = next_day
+    definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+    cursor.execute(
+        f"ALTER TABLE {TABLE_PREFIX}request_logs REORGANIZE PARTITION pmax INTO "
+        f"({', '.join(definitions)})"
+    )
+    logger.info(f"已为请求日志表创建 {len(definitions) - 1} 个按天分区")
+
+
+def prune_request_logs(retention_days=None):
+    """
+    删除超过保留天数的请求日志，整个分区直接DROP，不逐行删除
+
+    Args:
+        retention_days: 保留天数，默认使用配置REQUEST_LOG_RETENTION_DAYS
+
+    Returns:
+        int: 删除的分区数，失败时返回None
+    """
+    if retention_days is None:
+        retention_days = REQUEST_LOG_RETENTION_DAYS
+
     conn = get_connection()
     if conn is None:
-        return False
+        return None
 
+    cursor = None
     try:
         cursor = conn.cursor()
+        cutoff = date.today() - timedelta(days=retention_days)
+        expired = sorted(
+            name
+            for name, day in _get_request_log_partitions(cursor).items()
+            if day < cutoff
+        )
+        if expired:
+            cursor.execute(
+                f"ALTER TABLE {TABLE_PREFIX}request_logs "
+                f"DROP PARTITION {', '.join(expired)}"
+            )
+        logger.info(f"已删除 {len(expired)} 个早于 {cutoff} 的请求日志分区")
+        return len(expired)
+    except Error as e:
+        logger.error(f"清理请求日志时出错: {e}")
+        return None
+    finally:
+        if cursor is not None:
+            cursor.close()
+        conn.close()
 
-        # 首先检查岗位是否已存在
-        job_id = job_data.get("encryptJobId")
-        if not job_id:
-            logger.error("岗位数据缺少encryptJobId字段")
-            return False
 
-        # 检查岗位是否已存在
-        cursor.execute(
-            f"SELECT 1 FROM {TABLE_PREFIX}jobs WHERE job_id = %s LIMIT 1", (job_id,)
-        )
-        exists = cursor.fetchone()
-
-        if exists:
-            # 岗位已存在，直接返回成功
-            logger.info(f"岗位 {job_id} 已存在，跳过处理")
-            return True
-
-        # 岗位不存在，继续插入数据
-        # 1. 处理招聘者数据
-        if "encryptBossId" in job_data:
-            boss_values = {
-                "boss_id": job_data.get("encryptBossId"),
-                "boss_name": job_data.get("bossName"),
-                "boss_title": job_data.get("bossTitle"),
-                "boss_avatar": job_data.get("bossAvatar"),
-                "boss_cert": job_data.get("bossCert"),
-                "gold_hunter": job_data.get("goldHunter"),
-                "boss_online": int(job_data.get("bossOnline", False)),
-            }
+def build_boss_values(job_data):
+    """从岗位数据中提取招聘者表字段，没有encryptBossId时返回None"""
+    if "encryptBossId" not in job_data:
+        return None
+    return {
+        "boss_id": job_data.get("encryptBossId"),
+        "boss_name": job_data.get("bossName"),
+        "boss_title": job_data.get("bossTitle"),
+        "boss_avatar": job_data.get("bossAvatar"),
+        "boss_cert": job_data.get("bossCert"),
+        "gold_hunter": job_data.get("goldHunter"),
+        "boss_online": int(job_data.get("bossOnline", False)),
+    }
+
+
+def build_company_values(job_data):
+    """从岗位数据中提取公司表字段，没有encryptBrandId时返回None"""
+    brand_id = job_data.get("encryptBrandId")
+    if not brand_id:
+        return None
+    return {
+        "brand_id": brand_id,
+        "brand_name": job_data.get("brandName"),
+        "brand_logo": job_data.get("brandLogo"),
+        "brand_stage_name": job_data.get("brandStageName"),
+        "brand_industry": job_data.get("brandIndustry"),
+        "industry_code": job_data.get("industry"),
+        "brand_scale_name": job_data.get("brandScaleName"),
+    }
 
-            boss_columns = ", ".join(boss_values.keys())
-            boss_placeholders = ", ".join(["%s"] * len(boss_values))
 
-            # 使用ON DUPLICATE KEY UPDATE进行更新
-            boss_update = ", ".join(
-                [f"{k}=VALUES({k})" for k in boss_values.keys() if k != "boss_id"]
-            )
+# 月薪描述，如"15-25K"、"15-25K·13薪"
+SALARY_PATTERN = re.compile(r"^(\d+)-(\d+)K")
 
-            query = f"""
-                INSERT INTO {TABLE_PREFIX}recruiters ({boss_columns}) 
-                VALUES ({boss_placeholders})
-                ON DUPLICATE KEY UPDATE {boss_update}
-            """
-            cursor.execute(query, tuple(boss_values.values()))
-
-        # 2. 处理公司数据
-        brand_id = job_data.get("encryptBrandId")
-        if brand_id:
-            company_values = {
-                "brand_id": brand_id,
-                "brand_name": job_data.get("brandName"),
-                "brand_logo": job_data.get("brandLogo"),
-                "brand_stage_name": job_data.get("brandStageName"),
-                "brand_industry": job_data.get("brandIndustry"),
-                "industry_code": job_data.get("industry"),
-                "brand_scale_name": job_data.get("brandScaleName"),
-            }
 
-            company_columns = ", ".join(company_values.keys())
-            company_placeholders = ", ".join(["%s"] * len(company_values))
+def parse_salary(salary_desc):
+    """
+    从薪资描述中解析月薪范围
+
+    Args:
+        salary_desc: 薪资描述
 
-            # 使用ON DUPLICATE KEY UPDATE进行更新
-            company_update = ", ".join(
-                [f"{k}=VALUES({k})" for k in company_values.keys() if k != "brand_id"]
+    Returns:
+        tuple: (最低月薪, 最高月薪)，单位千元；日薪、面议等无法解析时为(None, None)
+    """
+    match = SALARY_PATTERN.match(salary_desc or "")
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def build_job_values(job_data, search_term=None, page_number=None):
+    """从岗位数据中提取岗位表字段，已过滤掉None值"""
+    gps = job_data.get("gps", {})
+    salary_min, salary_max = parse_salary(job_data.get("salaryDesc"))
+    job_values = {
+        "job_id": job_data.get("encryptJobId"),
+        "job_name": job_data.get("jobName"),
+        "salary_desc": job_data.get("salaryDesc"),
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "job_experience": job_data.get("jobExperience"),
+        "job_degree": job_data.get("jobDegree"),
+        "city_name": job_data.get("cityName"),
+        "city_code": job_data.get("city"),
+        "area_district": job_data.get("areaDistrict"),
+        "business_district": job_data.get("businessDistrict"),
+        "lid": job_data.get("lid"),
+        "item_id": job_data.get("itemId"),
+        "security_id": job_data.get("securityId"),
+        "job_type": job_data.get("jobType", 0),
+        "proxy_job": job_data.get("proxyJob", 0),
+        "anonymous": job_data.get("anonymous", 0),
+        "outland": job_data.get("outland", 0),
+        "longitude": gps.get("longitude"),
+        "latitude": gps.get("latitude"),
+        "is_shield": job_data.get("isShield", 0),
+        "show_top_position": int(job_data.get("showTopPosition", False)),
+        "ats_direct_post": int(job_data.get("atsDirectPost", False)),
+        "days_per_week_desc": job_data.get("daysPerWeekDesc"),
+        "least_month_desc": job_data.get("leastMonthDesc"),
+        "optimal": job_data.get("optimal", 0),
+        "search_term": search_term,
+        "page_number": page_number,
+    }
+
+    job_values["content_hash"] = compute_job_fingerprint(job_data)
+
+    # 过滤掉None值，避免覆盖已有数据
+    return {k: v for k, v in job_values.items() if v is not None}
+
+
+# 岗位表字段及建表时的默认值，批量写入时使用固定的字段集合，缺失的字段按默认值填充
+JOB_COLUMNS = [
+    "job_id",
+    "job_name",
+    "salary_desc",
+    "salary_min",
+    "salary_max",
+    "job_experience",
+    "job_degree",
+    "city_name",
+    "city_code",
+    "area_district",
+    "business_district",
+    "lid",
+    "item_id",
+    "security_id",
+    "job_type",
+    "proxy_job",
+    "anonymous",
+    "outland",
+    "longitude",
+    "latitude",
+    "is_shield",
+    "show_top_position",
+    "ats_direct_post",
+    "days_per_week_desc",
+    "least_month_desc",
+    "optimal",
+    "search_term",
+    "page_number",
+    "content_hash",
+]
+JOB_COLUMN_DEFAULTS = {
+    "job_type": 0,
+    "proxy_job": 0,
+    "anonymous": 0,
+    "outland": 0,
+    "is_shield": 0,
+    "show_top_position": 0,
+    "ats_direct_post": 0,
+    "optimal": 0,
+}
+
+# 每次请求都会变化、不代表岗位内容的字段，不参与内容指纹计算
+FINGERPRINT_EXCLUDED_FIELDS = {"lid", "itemId", "securityId"}
+
+
+def compute_job_fingerprint(job_data):
+    """
+    计算岗位内容指纹
+
+    对规范化后的岗位数据（键排序、列表去重排序、排除每次请求都会变化的字段）
+    做哈希，内容不变时指纹保持稳定
+
+    Args:
+        job_data: 岗位数据字典
+
+    Returns:
+        str: 32位十六进制指纹
+    """
+    normalized = {}
+    for key, value in job_data.items():
+        if key in FINGERPRINT_EXCLUDED_FIELDS:
+            continue
+        if isinstance(value, list):
+            value = sorted(set(map(str, value)))
+        normalized[key] = value
+
+    # 指纹与已存储的值比对，序列化格式必须固定，不随是否安装orjson变化，
+    # 因此这里使用标准库json而不是src.json_codec
+    payload = json.dumps(
+        normalized,
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# 多对多子表定义：(表名, 值字段, 岗位数据中的字段, 附加条件字段及值, 字典类型)
+# 字典类型不为None时，子表中存储的是字典ID而不是原始字符串
+CHILD_TABLES = [
+    ("job_label_links", "label_id", "jobLabels", None, "labels"),
+    ("job_skill_links", "skill_id", "skills", None, "skills"),
+    ("job_icon_flags", "icon_flag", "iconFlagList", None, None),
+    ("company_welfare_links", "welfare_id", "welfareList", None, "welfare"),
+    (
+        "name_icon_links",
+        "icon_id",
+        "beforeNameIcons",
+        ("position", "before"),
+        "icon_urls",
+    ),
+    (
+        "name_icon_links",
+        "icon_id",
+        "afterNameIcons",
+        ("position", "after"),
+        "icon_urls",
+    ),
+]
+
+
+def _upsert_rows(
+    conn,
+    table,
+    rows,
+    key_column,
+    written,
+    keep_columns=(),
+    columns=None,
+    defaults=None,
+):
+    """
+    使用编译好的upsert计划批量写入（多行INSERT ... ON DUPLICATE KEY UPDATE）
+
+    指定columns时所有行使用这一固定字段集合，缺失的字段按defaults填充，
+    值为None的字段不覆盖已有数据；否则按各行的字段集合分组，每组一个计划
+
+    Args:
+        conn: 数据库连接
+        table: 不带前缀的表名
+        rows: 字段字典列表
+        key_column: 唯一键字段，不参与UPDATE
+        written: 表名 -> 写入行数，累加本次写入的行数，提交后交给record_rows_written
+        keep_columns: 记录已存在时保留原值、不参与UPDATE的字段
+        columns: 固定的字段集合（可选）
+        defaults: 固定字段集合中缺失字段的默认值
+    """
+    written[table] = written.get(table, 0) + len(rows)
+    with DB_WRITE_SECONDS.time(table=table):
+        if columns is not None:
+            defaults = defaults or {}
+            plan = get_plan(table, columns, key_column, keep_columns, True)
+            plan.execute(
+                conn,
+                [tuple(row.get(c, defaults.get(c)) for c in columns) for row in rows],
             )
+            return
 
-            query = f"""
-                INSERT INTO {TABLE_PREFIX}companies ({company_columns}) 
-                VALUES ({company_placeholders})
-                ON DUPLICATE KEY UPDATE {company_update}
-            """
-            cursor.execute(query, tuple(company_values.values()))
-
-        # 3. 处理工作岗位基本数据
-        gps = job_data.get("gps", {})
-        job_values = {
-            "job_id": job_data.get("encryptJobId"),
-            "job_name": job_data.get("jobName"),
-            "salary_desc": job_data.get("salaryDesc"),
-            "job_experience": job_data.get("jobExperience"),
-            "job_degree": job_data.get("jobDegree"),
-            "city_name": job_data.get("cityName"),
-            "city_code": job_data.get("city"),
-            "area_district": job_data.get("areaDistrict"),
-            "business_district": job_data.get("businessDistrict"),
-            "lid": job_data.get("lid"),
-            "item_id": job_data.get("itemId"),
-            "security_id": job_data.get("securityId"),
-            "job_type": job_data.get("jobType", 0),
-            "proxy_job": job_data.get("proxyJob", 0),
-            "anonymous": job_data.get("anonymous", 0),
-            "outland": job_data.get("outland", 0),
-            "longitude": gps.get("longitude"),
-            "latitude": gps.get("latitude"),
-            "is_shield": job_data.get("isShield", 0),
-            "show_top_position": int(job_data.get("showTopPosition", False)),
-            "ats_direct_post": int(job_data.get("atsDirectPost", False)),
-            "days_per_week_desc": job_data.get("daysPerWeekDesc"),
-            "least_month_desc": job_data.get("leastMonthDesc"),
-            "optimal": job_data.get("optimal", 0),
-            "search_term": search_term,
-            "page_number": page_number,
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+        for group_columns, values in groups.items():
+            plan = get_plan(table, group_columns, key_column, keep_columns)
+            plan.execute(conn, values)
+
+
+def _sync_child_tables(cursor, jobs, written):
+    """
+    按差异同步多对多子表：批量读取整批岗位已存储的值，
+    只插入新增的值、只删除已移除的值，未变化的行不做任何写入
+    新数据中缺少或为空的列表视为没有值，会删除该岗位在子表中已存储的行，
+    字典编码的子表按字典ID比较
+
+    Args:
+        cursor: 数据库游标
+        jobs: 岗位数据列表
+        written: 表名 -> 写入行数，累加本次写入的行数，提交后交给record_rows_written
+
+    Returns:
+        list: (字典驻留缓存, 字符串到ID的映射)列表，应在事务提交后写入缓存
+    """
+    resolved = []
+    for table, value_column, source_key, extra, kind in CHILD_TABLES:
+        # 保持原有顺序去重，(job_id, 值)上有唯一键；没有值的岗位也要同步，
+        # 以删除刷新前存储的行
+        desired = {
+            job["encryptJobId"]: list(dict.fromkeys(job.get(source_key) or ()))
+            for job in jobs
         }
 
-        # 过滤掉None值，避免覆盖已有数据
-        job_values = {k: v for k, v in job_values.items() if v is not None}
+        if not desired:
+            continue
 
-        job_columns = ", ".join(job_values.keys())
-        job_placeholders = ", ".join(["%s"] * len(job_values))
+        # 字典编码的子表先把整批字符串解析为字典ID
+        if kind:
+            interner = get_interner(kind)
+            mapping = interner.resolve(
+                cursor, [v for values in desired.values() for v in values]
+            )
+            resolved.append((interner, mapping))
+            desired = {
+                job_id: list(dict.fromkeys(mapping[v] for v in values))
+                for job_id, values in desired.items()
+            }
 
-        # 使用ON DUPLICATE KEY UPDATE进行更新
-        job_update = ", ".join(
-            [f"{k}=VALUES({k})" for k in job_values.keys() if k != "job_id"]
+        extra_condition = f" AND {extra[0]} = %s" if extra else ""
+        extra_params = (extra[1],) if extra else ()
+
+        # 一次查询取出整批岗位已存储的值
+        job_ids = list(desired.keys())
+        cursor.execute(
+            f"SELECT job_id, {value_column} FROM {TABLE_PREFIX}{table} "
+            f"WHERE job_id IN ({', '.join(['%s'] * len(job_ids))}){extra_condition}",
+            tuple(job_ids) + extra_params,
         )
+        stored = {}
+        for job_id, value in cursor.fetchall():
+            stored.setdefault(job_id, set()).add(value)
+
+        to_delete = []
+        to_insert = []
+        for job_id, values in desired.items():
+            current = stored.get(job_id, set())
+            wanted = set(values)
+            to_delete.extend((job_id, value) for value in current - wanted)
+            to_insert.extend(
+                (job_id, value) + extra_params
+                for value in values
+                if value not in current
+            )
 
-        query = f"""
-            INSERT INTO {TABLE_PREFIX}jobs ({job_columns}) 
-            VALUES ({job_placeholders})
-            ON DUPLICATE KEY UPDATE {job_update}
-        """
-        cursor.execute(query, tuple(job_values.values()))
+        if not to_delete and not to_insert:
+            continue
+        written[table] = written.get(table, 0) + len(to_delete) + len(to_insert)
+        with DB_WRITE_SECONDS.time(table=table):
+            if to_delete:
+                cursor.execute(
+                    f"DELETE FROM {TABLE_PREFIX}{table} "
+                    f"WHERE (job_id, {value_column}) IN "
+                    f"({', '.join(['(%s, %s)'] * len(to_delete))}){extra_condition}",
+                    tuple(v for row in to_delete for v in row) + extra_params,
+                )
+
+            if to_insert:
+                columns = ["job_id", value_column] + ([extra[0]] if extra else [])
+                cursor.executemany(
+                    f"INSERT INTO {TABLE_PREFIX}{table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                    f"ON DUPLICATE KEY UPDATE job_id = job_id",
+                    to_insert,
+                )
+
+    return resolved
+
+
+def collect_candidate_jobs(pages):
+    """
+    展开所有页面的岗位数据并去重
 
-        job_id = job_data.get("encryptJobId")
+    同一页面内重复的岗位保留最后一条，跨页面重复的岗位保留最先出现的一条，
+    与逐页调用insert_jobs_batch的结果一致
 
-        # 4. 处理岗位公司招聘者关系
-        relation_values = {
-            "job_id": job_id,
-            "brand_id": brand_id,
-            "boss_id": job_data.get("encryptBossId"),
-        }
+    Args:
+        pages: 可迭代的(job_list, search_term, page_number)元组
 
-        relation_columns = ", ".join(relation_values.keys())
-        relation_placeholders = ", ".join(["%s"] * len(relation_values))
+    Returns:
+        dict: job_id -> (岗位数据, 搜索关键词, 页码)，保持首次出现的顺序
+    """
+    candidates = {}
+    for job_list, search_term, page_number in pages:
+        page_jobs = {}
+        for job in job_list:
+            job_id = job.get("encryptJobId")
+            if not job_id:
+                logger.error("岗位数据缺少encryptJobId字段")
+                continue
+            page_jobs[job_id] = job
+
+        for job_id, job in page_jobs.items():
+            if job_id not in candidates:
+                candidates[job_id] = (job, search_term, page_number)
+    return candidates
+
+
+def insert_jobs_batch(job_list, search_term=None, page_number=None, refresh=False):
+    """
+    在一个事务中批量写入一整页岗位数据
+    已存在且内容指纹未变化的岗位直接跳过；指纹变化的岗位会被刷新，
+    但保留首次抓取时的搜索关键词和页码
 
-        query = f"""
-            INSERT INTO {TABLE_PREFIX}job_company_recruiter ({relation_columns}) 
-            VALUES ({relation_placeholders})
-            ON DUPLICATE KEY UPDATE brand_id=VALUES(brand_id), boss_id=VALUES(boss_id)
-        """
-        cursor.execute(query, tuple(relation_values.values()))
+    Args:
+        job_list: 岗位数据字典列表（API返回的jobList）
+        search_term: 搜索关键词
+        page_number: 页码
+        refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化），
+                 修改字段映射后重放归档时使用
 
-        # 5. 处理所有的多对多关系表
+    Returns:
+        int: 成功处理的岗位数（包括内容未变化而跳过的岗位）
+    """
+    return insert_pages_batch([(job_list, search_term, page_number)], refresh)
 
-        # 5.1 岗位标签
-        if "jobLabels" in job_data and job_data["jobLabels"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}job_labels WHERE job_id = %s", (job_id,)
-            )
 
-            # 插入新数据
-            labels_data = [(job_id, label) for label in job_data["jobLabels"]]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}job_labels (job_id, label) VALUES (%s, %s)",
-                labels_data,
-            )
+def insert_pages_batch(pages, refresh=False):
+    """
+    在一个事务中批量写入多页岗位数据，去重与刷新语义与逐页调用insert_jobs_batch一致
 
-        # 5.2 岗位技能
-        if "skills" in job_data and job_data["skills"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}job_skills WHERE job_id = %s", (job_id,)
-            )
+    Args:
+        pages: 可迭代的(job_list, search_term, page_number)元组
+        refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
 
-            # 插入新数据
-            skills_data = [(job_id, skill) for skill in job_data["skills"]]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}job_skills (job_id, skill) VALUES (%s, %s)",
-                skills_data,
-            )
+    Returns:
+        int: 成功处理的岗位数（包括内容未变化而跳过的岗位）
+    """
+    candidates = collect_candidate_jobs(pages)
+    if not candidates:
+        return 0
 
-        # 5.3 岗位图标标志
-        if "iconFlagList" in job_data and job_data["iconFlagList"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}job_icon_flags WHERE job_id = %s", (job_id,)
-            )
+    conn = get_connection()
+    if conn is None:
+        return 0
 
-            # 插入新数据
-            icon_flags_data = [(job_id, flag) for flag in job_data["iconFlagList"]]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}job_icon_flags (job_id, icon_flag) VALUES (%s, %s)",
-                icon_flags_data,
-            )
+    cursor = None
+    try:
+        cursor = conn.cursor()
 
-        # 5.4 公司福利
-        if "welfareList" in job_data and job_data["welfareList"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}company_welfare WHERE job_id = %s",
-                (job_id,),
+        # 一次查询取出整批岗位已存储的内容指纹
+        job_ids = list(candidates.keys())
+        cursor.execute(
+            f"SELECT job_id, content_hash FROM {TABLE_PREFIX}jobs "
+            f"WHERE job_id IN ({', '.join(['%s'] * len(job_ids))})",
+            tuple(job_ids),
+        )
+        stored_hashes = dict(cursor.fetchall())
+
+        # 新岗位和内容有变化的岗位需要写入，其余岗位跳过
+        new_jobs = []
+        changed_count = 0
+        for job_id, candidate in candidates.items():
+            if job_id not in stored_hashes:
+                new_jobs.append(candidate)
+            elif refresh or stored_hashes[job_id] != compute_job_fingerprint(
+                candidate[0]
+            ):
+                new_jobs.append(candidate)
+                changed_count += 1
+
+        unchanged_count = len(candidates) - len(new_jobs)
+        if unchanged_count:
+            logger.info(f"{unchanged_count} 个岗位已存在且内容未变化，跳过处理")
+        if changed_count:
+            logger.info(
+                f"{changed_count} 个已存在岗位"
+                f"{'将强制刷新' if refresh else '内容有变化，将刷新'}"
             )
 
-            # 插入新数据
-            welfare_data = [(job_id, welfare) for welfare in job_data["welfareList"]]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}company_welfare (job_id, welfare) VALUES (%s, %s)",
-                welfare_data,
-            )
+        if not new_jobs:
+            record_job_outcomes(0, 0, unchanged_count)
+            return len(candidates)
+
+        # 1. 招聘者和公司，同一批次中按ID去重
+        bosses = {}
+        companies = {}
+        for job, _, _ in new_jobs:
+            boss_values = build_boss_values(job)
+            if boss_values:
+                bosses[boss_values["boss_id"]] = boss_values
+            company_values = build_company_values(job)
+            if company_values:
+                companies[company_values["brand_id"]] = company_values
+
+        # 本进程已写入过且属性未变化的维度数据无需再次upsert
+        bosses = {
+            k: v for k, v in bosses.items() if not recruiter_cache.is_unchanged(k, v)
+        }
+        companies = {
+            k: v for k, v in companies.items() if not company_cache.is_unchanged(k, v)
+        }
 
-        # 5.5 处理名称前后图标
-        # 名称前图标
-        if "beforeNameIcons" in job_data and job_data["beforeNameIcons"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}name_icons WHERE job_id = %s AND position = 'before'",
-                (job_id,),
+        written = {}
+        if bosses:
+            _upsert_rows(
+                conn, "recruiters", list(bosses.values()), "boss_id", written
             )
-
-            # 插入新数据
-            icons_data = [
-                (job_id, icon, "before") for icon in job_data["beforeNameIcons"]
-            ]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}name_icons (job_id, icon_url, position) VALUES (%s, %s, %s)",
-                icons_data,
+        if companies:
+            _upsert_rows(
+                conn, "companies", list(companies.values()), "brand_id", written
             )
 
-        # 名称后图标
-        if "afterNameIcons" in job_data and job_data["afterNameIcons"]:
-            # 先删除旧数据
-            cursor.execute(
-                f"DELETE FROM {TABLE_PREFIX}name_icons WHERE job_id = %s AND position = 'after'",
-                (job_id,),
-            )
+        # 2. 岗位基本数据
+        _upsert_rows(
+            conn,
+            "jobs",
+            [build_job_values(job, term, page) for job, term, page in new_jobs],
+            "job_id",
+            written,
+            keep_columns=("search_term", "page_number"),
+            columns=JOB_COLUMNS,
+            defaults=JOB_COLUMN_DEFAULTS,
+        )
 
-            # 插入新数据
-            icons_data = [
-                (job_id, icon, "after") for icon in job_data["afterNameIcons"]
-            ]
-            cursor.executemany(
-                f"INSERT INTO {TABLE_PREFIX}name_icons (job_id, icon_url, position) VALUES (%s, %s, %s)",
-                icons_data,
-            )
+        # 3. 岗位公司招聘者关系
+        _upsert_rows(
+            conn,
+            "job_company_recruiter",
+            [
+                {
+                    "job_id": job["encryptJobId"],
+                    "brand_id": job.get("encryptBrandId"),
+                    "boss_id": job.get("encryptBossId"),
+                }
+                for job, _, _ in new_jobs
+            ],
+            "job_id",
+            written,
+        )
+
+        # 4. 多对多关系表
+        resolved = _sync_child_tables(
+            cursor, [job for job, _, _ in new_jobs], written
+        )
 
         conn.commit()
-        logger.info(f"成功插入/更新岗位数据，ID: {job_id}")
-        return True
+        record_rows_written(written)
+        record_job_outcomes(
+            len(new_jobs) - changed_count, changed_count, unchanged_count
+        )
+
+        for interner, mapping in resolved:
+            interner.remember(mapping)
+
+        # 事务提交成功后才记入缓存，回滚的数据下次仍会写入
+        for boss_id, boss_values in bosses.items():
+            recruiter_cache.remember(boss_id, boss_values)
+        for brand_id, company_values in companies.items():
+            company_cache.remember(brand_id, company_values)
+        logger.info(f"成功批量插入/更新 {len(new_jobs)} 条岗位数据")
+        return len(candidates)
     except Error as e:
-        logger.error(f"插入数据时出错: {e}")
-        return False
+        logger.error(f"批量插入数据时出错: {e}")
+        if len(candidates) == 1:
+            return 0
     finally:
-        if conn.is_connected():
+        if cursor is not None:
             cursor.close()
-            conn.close()
+        conn.close()
+
+    # 整批失败时逐条重试，避免个别异常数据拖累整批
+    logger.warning(f"批量写入失败，改为逐条写入 {len(candidates)} 条岗位数据")
+    return sum(
+        1
+        for job, term, page in candidates.values()
+        if insert_job_data(job, term, page, refresh)
+    )
+
+
+def get_known_job_ids(job_ids):
+    """
+    一次查询判断哪些岗位ID已经存储
+
+    Args:
+        job_ids: 岗位ID（encryptJobId）列表
+
+    Returns:
+        set: 已存储的岗位ID集合，失败时返回None
+    """
+    job_ids = list(dict.fromkeys(job_id for job_id in job_ids if job_id))
+    if not job_ids:
+        return set()
+
+    conn = get_connection()
+    if conn is None:
+        return None
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT job_id FROM {TABLE_PREFIX}jobs "
+            f"WHERE job_id IN ({', '.join(['%s'] * len(job_ids))})",
+            tuple(job_ids),
+        )
+        return {row[0] for row in cursor.fetchall()}
+    except Error as e:
+        logger.error(f"查询已存储岗位时出错: {e}")
+        return None
+    finally:
+        if cursor is not None:
+            cursor.close()
+        conn.close()
+
+
+def insert_job_data(job_data, search_term=None, page_number=None, refresh=False):
+    """
+    将工作岗位数据插入数据库
+    如果岗位已存在且内容指纹未变化，则直接返回不做修改
+
+    Args:
+        job_data: 岗位数据字典
+        search_term: 搜索关键词
+        page_number: 页码
+        refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
+
+    Returns:
+        bool: 操作是否成功
+    """
+    return insert_jobs_batch([job_data], search_term, page_number, refresh) == 1
+
+
+def build_request_log_row(
+    url, params, status_code, response_time, total_results, has_more, cookies
+):
+    """
+    将一次API请求的信息转换为request_logs表的一行
+
+    请求参数只保留query、city、page三个字段，Cookie序列化为JSON，
+    写入时再替换为Cookie集合字典ID
+
+    Returns:
+        tuple: (url, query, city, page, status_code, response_time,
+                total_results, has_more, cookies_json)
+    """
+    params = params or {}
+    # Cookie集合按该字符串的哈希去重，保持与已有字典数据相同的标准库json格式
+    cookies_json = json.dumps(cookies, ensure_ascii=False) if cookies else None
+    return (
+        url,
+        params.get("query"),
+        params.get("city"),
+        params.get("page"),
+        status_code,
+        response_time,
+        total_results,
+        has_more,
+        cookies_json,
+    )
 
 
 def insert_request_log(
@@ -510,41 +1439,65 @@ def insert_request_log(
     Returns:
         bool: 操作是否成功
     """
+    row = build_request_log_row(
+        url, params, status_code, response_time, total_results, has_more, cookies
+    )
+    return insert_request_logs_batch([row]) == 1
+
+
+def insert_request_logs_batch(rows):
+    """
+    在一个事务中批量写入API请求日志
+
+    Args:
+        rows: build_request_log_row生成的行列表
+
+    Returns:
+        int: 写入的日志条数，失败时返回0
+    """
+    if not rows:
+        return 0
+
     conn = get_connection()
     if conn is None:
-        return False
+        return 0
 
+    cursor = None
     try:
         cursor = conn.cursor()
+        interner = get_interner("cookie_sets")
+        cookie_ids = interner.resolve(
+            cursor, [row[-1] for row in rows if row[-1] is not None]
+        )
 
-        params_json = json.dumps(params, ensure_ascii=False) if params else None
-        cookies_json = json.dumps(cookies, ensure_ascii=False) if cookies else None
-
+        # executemany会把INSERT改写为一条多行INSERT
         query = f"""
-            INSERT INTO {TABLE_PREFIX}request_logs 
-            (url, params, status_code, response_time, total_results, has_more, cookies)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO {TABLE_PREFIX}request_logs
+            (url, query, city, page, status_code, response_time, total_results,
+             has_more, cookie_set_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(
-            query,
-            (
-                url,
-                params_json,
-                status_code,
-                response_time,
-                total_results,
-                has_more,
-                cookies_json,
-            ),
-        )
-
+        with DB_WRITE_SECONDS.time(table="request_logs"):
+            cursor.executemany(
+                query,
+                [
+                    row[:-1] + (cookie_ids.get(row[-1]) if row[-1] else None,)
+                    for row in rows
+                ],
+            )
         conn.commit()
-        logger.info(f"成功记录API请求日志，ID: {cursor.lastrowid}")
-        return True
+        record_rows_written({"request_logs": len(rows)})
+        interner.remember(cookie_ids)
+        logger.debug(f"成功写入 {len(rows)} 条API请求日志")
+        return len(rows)
     except Error as e:
         logger.error(f"记录API请求日志时出错: {e}")
-        return False
+        try:
+            conn.rollback()
+        except Error:
+            pass
+        return 0
     finally:
-        if conn.is_connected():
+        if cursor is not None:
             cursor.close()
-            conn.close()
+        conn.close()
@@ -0,0 +1,268 @@
+"""
+MySQL connection pool module: a process-wide pool shared by every database operation.
+"""
+
+import atexit
+import queue
+import threading
+import time
+import mysql.connector
+from mysql.connector import Error
+from loguru import logger
+from config.db_config import (
+    DB_CONFIG,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_PING_INTERVAL,
+)
+
+
+class PoolTimeoutError(Error):
+    """在等待时间内无法从连接池获取到连接"""
+
+
+class PooledConnection:
+    """
+    连接池中借出的连接代理
+
+    除close()外的所有属性和方法都直接转发给底层MySQL连接，
+    close()不会真正断开连接，而是将连接归还连接池。
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw_connection(self):
+        """底层MySQL连接，用于按连接缓存预处理语句等场景"""
+        if self._conn is None:
+            raise Error("连接已归还连接池，无法继续使用")
+        return self._conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise Error("连接已归还连接池，无法继续使用")
+        return getattr(self._conn, name)
+
+    def close(self):
+        """将连接归还连接池（可重复调用）"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    线程安全的MySQL连接池
+
+    - 连接数上限由size控制，连接耗尽时调用方最多等待timeout秒
+    - 借出空闲超过ping_interval秒的连接前先ping，失效则自动重连
+    - 统计借出次数、等待次数和等待耗时，便于在负载下调整池大小
+    """
+
+    def __init__(self, config, size=5, timeout=30, ping_interval=60):
+        self._config = config
+        self._size = max(1, int(size))
+        self._timeout = timeout
+        self._ping_interval = ping_interval
+        # LIFO队列优先复用最近归还的连接，冷连接自然空闲
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self._size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+            "created": 0,
+            "reconnects": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+        }
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self._config)
+        with self._lock:
+            self._stats["created"] += 1
+        return conn
+
+    def _checkout_idle(self):
+        """取出一个健康的空闲连接，没有可用空闲连接时返回None"""
+        try:
+            conn, released_at = self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+        if time.monotonic() - released_at < self._ping_interval:
+            return conn
+
+        try:
+            # 空闲过久的连接可能已被服务端断开，ping时自动重连
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            return conn
+        except Error as e:
+            logger.warning(f"连接池中的连接已失效，将重新建立: {e}")
+            with self._lock:
+                self._stats["reconnects"] += 1
+            try:
+                conn.close()
+            except Error:
+                pass
+            return None
+
+    def acquire(self):
+        """
+        从连接池借出一个连接
+
+        Returns:
+            PooledConnection: 连接代理，调用close()即归还
+
+        Raises:
+            PoolTimeoutError: 等待超时仍没有可用连接
+            Error: 建立新连接失败
+        """
+        if self._closed:
+            raise Error("连接池已关闭")
+
+        start = time.monotonic()
+        waited = not self._slots.acquire(blocking=False)
+        if waited and not self._slots.acquire(timeout=self._timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                msg=f"等待 {self._timeout} 秒后仍未获取到数据库连接（池大小 {self._size}）"
+            )
+        wait_time = time.monotonic() - start
+
+        try:
+            conn = self._checkout_idle()
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            stats = self._stats
+            stats["checkouts"] += 1
+            if waited:
+                stats["waits"] += 1
+                stats["total_wait"] += wait_time
+                stats["max_wait"] = max(stats["max_wait"], wait_time)
+            stats["in_use"] += 1
+            stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """归还连接，未提交的事务会被回滚"""
+        try:
+            if self._closed:
+                conn.close()
+            else:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, time.monotonic()))
+        except Error as e:
+            # 连接已损坏，直接丢弃，下次借出时会新建
+            logger.warning(f"归还连接时出错，连接已丢弃: {e}")
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def get_stats(self):
+        """
+        获取连接池统计信息
+
+        Returns:
+            dict: 包含借出次数、等待次数、平均/最大等待时间等
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self._size
+        stats["idle"] = self._idle.qsize()
+        stats["avg_wait"] = stats["total_wait"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
+
+    def close(self):
+        """关闭连接池中所有空闲连接"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Error:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    获取进程级共享连接池，首次调用时创建
+
+    Returns:
+        ConnectionPool: 连接池对象
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DB_CONFIG,
+                    size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    ping_interval=DB_POOL_PING_INTERVAL,
+                )
+                atexit.register(close_pool)
+                logger.info(f"数据库连接池已创建，大小: {DB_POOL_SIZE}")
+    return _pool
+
+
+def get_pool_stats():
+    """
+    获取共享连接池的统计信息
+
+    Returns:
+        dict: 统计信息，连接池尚未创建时返回空字典
+    """
+    return _pool.get_stats() if _pool is not None else {}
+
+
+def log_pool_stats():
+    """将连接池统计信息输出到日志"""
+    stats = get_pool_stats()
+    if not stats:
+        return
+    logger.info(
+        f"连接池统计: 借出 {stats['checkouts']} 次, 新建连接 {stats['created']} 个, "
+        f"重连 {stats['reconnects']} 次, 等待 {stats['waits']} 次 "
+        f"(平均 {stats['avg_wait'] * 1000:.1f} ms, 最大 {stats['max_wait'] * 1000:.1f} ms), "
+        f"超时 {stats['timeouts']} 次, 峰值占用 {stats['peak_in_use']}/{stats['size']}"
+    )
+
+
+def close_pool():
+    """关闭共享连接池并输出统计信息"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            return
+        log_pool_stats()
+        _pool.close()
+        _pool = None
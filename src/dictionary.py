@@ -0,0 +1,180 @@
+"""
+Dictionary encoding module: interns repeated strings (labels, skills, welfare, icon URLs, cookie sets) as integer IDs.
+"""
+
+import atexit
+import hashlib
+import threading
+from loguru import logger
+from config.db_config import TABLE_PREFIX, DICT_CACHE_SIZE
+
+# 字典定义：类型 -> (字典表名, 值字段)
+DICTIONARIES = {
+    "labels": ("dict_labels", "label"),
+    "skills": ("dict_skills", "skill"),
+    "welfare": ("dict_welfare", "welfare"),
+    "icon_urls": ("dict_icon_urls", "icon_url"),
+    "cookie_sets": ("dict_cookie_sets", "cookies"),
+}
+
+# 每次按哈希查询字典ID的数量
+RESOLVE_CHUNK_SIZE = 1000
+
+
+def value_hash(value):
+    """
+    计算字典值的哈希，与MySQL的MD5()结果一致，便于在SQL中完成迁移
+
+    按字节精确比较，不受字段排序规则（大小写、尾部空格）影响
+    """
+    return hashlib.md5(str(value).encode("utf-8")).hexdigest()
+
+
+class DictionaryInterner:
+    """
+    字符串到字典ID的进程内驻留缓存
+
+    缓存未命中的值会批量查询字典表，仍不存在的再批量插入。
+    resolve()返回的映射应在事务提交后通过remember()写入缓存，
+    避免缓存回滚事务中分配的ID
+    """
+
+    def __init__(self, kind, table, value_column, max_size=100000):
+        self.kind = kind
+        self.table = f"{TABLE_PREFIX}{table}"
+        self.value_column = value_column
+        self._max_size = max_size
+        self._ids = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._inserted = 0
+
+    def _select_ids(self, cursor, hashes):
+        """按哈希分块查询已存在的字典ID"""
+        found = {}
+        hash_list = list(hashes)
+        for i in range(0, len(hash_list), RESOLVE_CHUNK_SIZE):
+            chunk = hash_list[i : i + RESOLVE_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT value_hash, id FROM {self.table} "
+                f"WHERE value_hash IN ({', '.join(['%s'] * len(chunk))})",
+                tuple(chunk),
+            )
+            found.update(cursor.fetchall())
+        return found
+
+    def resolve(self, cursor, values):
+        """
+        批量将字符串解析为字典ID，不存在的值会被插入字典表
+
+        Args:
+            cursor: 数据库游标（与写入子表处于同一事务）
+            values: 字符串列表
+
+        Returns:
+            dict: 字符串 -> 字典ID
+        """
+        result = {}
+        missing = {}
+        with self._lock:
+            for value in dict.fromkeys(values):
+                dict_id = self._ids.get(value)
+                if dict_id is None:
+                    missing[value_hash(value)] = value
+                else:
+                    result[value] = dict_id
+            self._hits += len(result)
+            self._misses += len(missing)
+
+        if not missing:
+            return result
+
+        found = self._select_ids(cursor, missing.keys())
+        to_insert = [(missing[h], h) for h in missing if h not in found]
+        if to_insert:
+            cursor.executemany(
+                f"INSERT INTO {self.table} ({self.value_column}, value_hash) "
+                f"VALUES (%s, %s) ON DUPLICATE KEY UPDATE id = id",
+                to_insert,
+            )
+            found.update(self._select_ids(cursor, [h for _, h in to_insert]))
+            with self._lock:
+                self._inserted += len(to_insert)
+
+        for h, dict_id in found.items():
+            result[missing[h]] = dict_id
+        return result
+
+    def remember(self, mapping):
+        """
+        将已提交的字符串到ID映射写入缓存，超出容量后不再缓存新值
+
+        Args:
+            mapping: 字符串 -> 字典ID
+        """
+        with self._lock:
+            for value, dict_id in mapping.items():
+                if value in self._ids or len(self._ids) < self._max_size:
+                    self._ids[value] = dict_id
+
+    def get_stats(self):
+        """
+        获取驻留缓存统计信息
+
+        Returns:
+            dict: 包含命中、未命中、新插入字典值的次数、命中率和缓存大小
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "inserted": self._inserted,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": len(self._ids),
+            }
+
+
+_interners = {
+    kind: DictionaryInterner(kind, table, column, DICT_CACHE_SIZE)
+    for kind, (table, column) in DICTIONARIES.items()
+}
+
+
+def get_interner(kind):
+    """
+    获取指定类型的字典驻留缓存
+
+    Args:
+        kind: 字典类型，见DICTIONARIES
+
+    Returns:
+        DictionaryInterner: 驻留缓存对象
+    """
+    return _interners[kind]
+
+
+def get_dictionary_stats():
+    """
+    获取所有字典驻留缓存的统计信息
+
+    Returns:
+        dict: 字典类型 -> 统计信息
+    """
+    return {kind: interner.get_stats() for kind, interner in _interners.items()}
+
+
+def log_dictionary_stats():
+    """将字典驻留缓存的命中统计输出到日志"""
+    for kind, stats in get_dictionary_stats().items():
+        if stats["hits"] + stats["misses"] == 0:
+            continue
+        logger.info(
+            f"字典缓存 {kind}: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+            f"命中率 {stats['hit_rate']:.1%}, 新增字典值 {stats['inserted']} 个, "
+            f"大小 {stats['size']}"
+        )
+
+
+atexit.register(log_dictionary_stats)
@@ -0,0 +1,116 @@
+"""
+In-process dimension cache: remembers which recruiter and company rows were already written.
+"""
+
+import atexit
+import threading
+from collections import OrderedDict
+from loguru import logger
+from config.db_config import DIM_CACHE_SIZE
+
+
+class DimensionCache:
+    """
+    有容量上限的LRU缓存，记录维度数据（招聘者、公司）最近一次写入时的属性哈希
+
+    属性哈希与缓存一致说明本进程已写入过相同的数据，可以跳过这次upsert
+    """
+
+    def __init__(self, name, max_size=10000):
+        self.name = name
+        self._max_size = max(1, int(max_size))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def attribute_hash(values):
+        """计算维度数据的属性哈希"""
+        return hash(tuple(sorted(values.items())))
+
+    def is_unchanged(self, key, values):
+        """
+        判断维度数据自上次写入后是否未变化，并更新命中统计
+
+        Args:
+            key: 维度ID（encryptBossId或encryptBrandId）
+            values: 待写入的字段字典
+
+        Returns:
+            bool: 属性与上次写入一致时返回True
+        """
+        attr_hash = self.attribute_hash(values)
+        with self._lock:
+            if self._entries.get(key) == attr_hash:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True
+            self._misses += 1
+            return False
+
+    def remember(self, key, values):
+        """
+        记录已成功写入数据库的维度数据，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 维度ID
+            values: 已写入的字段字典
+        """
+        attr_hash = self.attribute_hash(values)
+        with self._lock:
+            self._entries[key] = attr_hash
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 包含命中、未命中、淘汰次数、命中率和当前大小
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self._max_size,
+            }
+
+
+recruiter_cache = DimensionCache("recruiters", DIM_CACHE_SIZE)
+company_cache = DimensionCache("companies", DIM_CACHE_SIZE)
+
+
+def get_dim_cache_stats():
+    """
+    获取所有维度缓存的统计信息
+
+    Returns:
+        dict: 缓存名称 -> 统计信息
+    """
+    return {
+        cache.name: cache.get_stats() for cache in (recruiter_cache, company_cache)
+    }
+
+
+def log_dim_cache_stats():
+    """将维度缓存的命中统计输出到日志"""
+    for name, stats in get_dim_cache_stats().items():
+        if stats["hits"] + stats["misses"] == 0:
+            continue
+        logger.info(
+            f"维度缓存 {name}: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+            f"命中率 {stats['hit_rate']:.1%}, 淘汰 {stats['evictions']} 次, "
+            f"大小 {stats['size']}/{stats['max_size']}"
+        )
+
+
+atexit.register(log_dim_cache_stats)
@@ -0,0 +1,180 @@
+"""
+HTTP session module: a shared keep-alive session with full content-encoding support and transfer statistics.
+"""
+
+import atexit
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+from config.settings import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+# brotli由urllib3在安装了brotli（或brotlicffi）时自动解码
+try:
+    import brotli  # noqa: F401
+except ImportError:
+    try:
+        import brotlicffi as brotli  # noqa: F401
+    except ImportError:
+        brotli = None
+
+# urllib3 1.x不支持zstd，收到后由本模块自行解码
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def get_supported_encodings():
+    """
+    获取当前环境可以解码的内容编码
+
+    Returns:
+        list: 编码名列表，按优先顺序排列
+    """
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    return encodings
+
+
+def _filter_accept_encoding(value):
+    """只保留请求头Accept-Encoding中能够解码的编码，避免收到无法解析的响应"""
+    supported = set(get_supported_encodings())
+    accepted = [
+        part.strip()
+        for part in value.split(",")
+        if part.split(";")[0].strip().lower() in supported
+    ]
+    return ", ".join(accepted) or "identity"
+
+
+class HttpSession:
+    """
+    进程级共享的HTTP会话
+
+    - 复用TCP/TLS连接（keep-alive），每个主机最多保持pool_size条连接
+    - 请求头中的Accept-Encoding只声明能解码的编码，zstd响应在此解码
+    - 统计请求数、新建连接数，以及传输字节数（压缩后）与解码后的字节数
+    - 会话自身不保存任何Cookie：各身份的Cookie由调用方通过请求头传入，
+      响应中的Set-Cookie只出现在response.cookies中，不会带到其他身份的请求里
+    """
+
+    def __init__(self, pool_size, connect_timeout, read_timeout):
+        self._timeout = (connect_timeout, read_timeout)
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session = requests.Session()
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+
+    def get(self, url, headers=None, params=None):
+        """
+        发送GET请求并读取完整响应体
+
+        Args:
+            url: 目标URL
+            headers: HTTP请求头(可选)
+            params: URL参数(可选)
+
+        Returns:
+            requests.Response: 响应对象，content已解码
+        """
+        headers = dict(headers or {})
+        if "Accept-Encoding" in headers:
+            headers["Accept-Encoding"] = _filter_accept_encoding(
+                headers["Accept-Encoding"]
+            )
+
+        response = self._session.get(
+            url, headers=headers, params=params, timeout=self._timeout
+        )
+        content = response.content
+        # urllib3记录的是从连接上读取的原始（压缩后）字节数
+        wire_bytes = response.raw.tell() or len(content)
+
+        encoding = response.headers.get("Content-Encoding", "").strip().lower()
+        if encoding == "zstd" and zstandard is not None and content:
+            content = zstandard.ZstdDecompressor().decompressobj().decompress(content)
+            response._content = content
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["wire_bytes"] += wire_bytes
+            self._stats["decoded_bytes"] += len(content)
+        return response
+
+    def get_stats(self):
+        """
+        获取会话统计信息
+
+        Returns:
+            dict: 包含请求数requests、新建连接数connections、复用连接的请求数reused、
+                  传输字节数wire_bytes、解码后字节数decoded_bytes和压缩比
+        """
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        with self._lock:
+            stats = dict(self._stats)
+        stats["connections"] = connections
+        stats["reused"] = max(stats["requests"] - connections, 0)
+        stats["compression_ratio"] = (
+            stats["decoded_bytes"] / stats["wire_bytes"] if stats["wire_bytes"] else 0.0
+        )
+        return stats
+
+    def close(self):
+        """关闭会话及其连接池"""
+        self._session.close()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """
+    获取进程级共享的HTTP会话，首次调用时创建
+
+    Returns:
+        HttpSession: HTTP会话
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = HttpSession(
+                    HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+                )
+                logger.info(
+                    f"HTTP会话已创建，连接池大小: {HTTP_POOL_SIZE}, "
+                    f"支持的编码: {', '.join(get_supported_encodings())}"
+                )
+    return _session
+
+
+def log_http_stats():
+    """将HTTP会话的连接复用和传输统计输出到日志"""
+    if _session is None:
+        return
+    stats = _session.get_stats()
+    if not stats["requests"]:
+        return
+    logger.info(
+        f"HTTP会话: 请求 {stats['requests']} 次, 新建连接 {stats['connections']} 条, "
+        f"复用连接 {stats['reused']} 次, 传输 {stats['wire_bytes']} 字节, "
+        f"解码后 {stats['decoded_bytes']} 字节, "
+        f"压缩比 {stats['compression_ratio']:.1f}"
+    )
+
+
+atexit.register(log_http_stats)
@@ -0,0 +1,404 @@
+"""
+Identity pool module: named crawl identities with their own cookies, headers, rate budget, health and cool-down.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from loguru import logger
+from config.settings import (
+    DEFAULT_HEADERS,
+    CRAWL_CONCURRENCY,
+    COOKIE_EXPIRY_MARGIN,
+    COOKIE_FLUSH_INTERVAL,
+    IDENTITIES_FILE,
+    IDENTITY_MAX_STREAMS,
+    IDENTITY_COOLDOWN,
+    IDENTITY_MAX_COOLDOWN,
+)
+from src.cookie_jar import CookieJar, get_cookie_jar
+from src.json_codec import load_file
+from src.rate_limiter import create_rate_limiter, get_rate_limiter
+
+# 健康度的调整系数：正常响应向1恢复，失败和触发反爬时按比例下降
+_HEALTH_RECOVERY = 0.1
+_HEALTH_FAILURE = 0.8
+_HEALTH_ANTI_CRAWL = 0.5
+
+# 等待空闲身份时的轮询间隔（秒）
+_POLL_INTERVAL = 0.5
+
+
+class Identity:
+    """
+    一个抓取身份：独立的Cookie容器、请求头（含User-Agent）和限速器
+
+    - 健康度在0到1之间，正常响应时向1恢复，失败时下降，触发反爬时大幅下降
+    - 触发反爬（HTTP 403/429或ANTI_CRAWL_CODES中的API返回码）后进入冷却，
+      冷却期间不分配新的工作项；冷却时长从cooldown起按连续触发次数翻倍，
+      不超过max_cooldown，响应带Retry-After时至少为其指定的时长
+    - 同时最多承担max_streams个工作项
+    """
+
+    def __init__(
+        self,
+        name,
+        cookie_jar,
+        headers,
+        limiter,
+        max_streams=1,
+        cooldown=600,
+        max_cooldown=3600,
+    ):
+        self.name = name
+        self.cookie_jar = cookie_jar
+        self.headers = headers
+        self.limiter = limiter
+        self.max_streams = max(1, max_streams)
+        self.active = 0
+        self.work_items = 0
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._health = 1.0
+        self._strikes = 0
+        self._cooldown_until = 0.0
+        self._stats = {
+            "successes": 0,
+            "failures": 0,
+            "anti_crawl": 0,
+            "cooldown_seconds": 0.0,
+        }
+
+    @property
+    def health(self):
+        """当前健康度（0到1）"""
+        return self._health
+
+    def cooldown_remaining(self, now=None):
+        """
+        获取剩余冷却时长
+
+        Args:
+            now: time.monotonic()的当前值(可选)
+
+        Returns:
+            float: 剩余秒数，不在冷却中时为0
+        """
+        now = time.monotonic() if now is None else now
+        return max(self._cooldown_until - now, 0.0)
+
+    def request_headers(self):
+        """获取该身份发送请求使用的请求头副本"""
+        return dict(self.headers)
+
+    def record(
+        self, ok, latency=None, retry_after=None, reason=None, anti_crawl=False
+    ):
+        """
+        记录一次请求的结果：反馈给该身份的限速器，并调整健康度和冷却
+
+        Args:
+            ok: 请求是否正常
+            latency: 响应耗时(秒，可选)
+            retry_after: 响应头Retry-After解析出的等待秒数(可选)
+            reason: 异常原因，用于日志(可选)
+            anti_crawl: 是否触发了反爬
+        """
+        self.limiter.record(ok, latency, retry_after, reason)
+        with self._lock:
+            if ok:
+                self._strikes = 0
+                self._health += _HEALTH_RECOVERY * (1.0 - self._health)
+                self._stats["successes"] += 1
+                return
+            self._stats["failures"] += 1
+            if not anti_crawl:
+                self._health *= _HEALTH_FAILURE
+                return
+
+            self._strikes += 1
+            self._health *= _HEALTH_ANTI_CRAWL
+            self._stats["anti_crawl"] += 1
+            cooldown = min(
+                self._max_cooldown, self._cooldown * 2 ** (self._strikes - 1)
+            )
+            if retry_after is not None:
+                cooldown = max(cooldown, retry_after)
+            now = time.monotonic()
+            cooldown_until = max(self._cooldown_until, now + cooldown)
+            self._stats["cooldown_seconds"] += cooldown_until - max(
+                self._cooldown_until, now
+            )
+            self._cooldown_until = cooldown_until
+        logger.warning(
+            f"身份 {self.name} 触发反爬（{reason or '未知原因'}），"
+            f"冷却 {cooldown_until - now:.0f} 秒，健康度 {self._health:.2f}"
+        )
+
+    def get_stats(self):
+        """
+        获取身份统计信息
+
+        Returns:
+            dict: 包含承担的工作项数work_items、正常/失败/触发反爬次数、累计冷却时长、
+                  健康度health和限速器的当前速率rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["health"] = self._health
+        stats["work_items"] = self.work_items
+        stats["rate"] = self.limiter.rate
+        return stats
+
+
+class IdentityPool:
+    """
+    身份池：把工作项分配给健康度最高且有空余额度的身份
+
+    空余额度指身份承担的工作项数未达到max_streams且不在冷却中。
+    每个身份按自己的限速器发出请求，总吞吐随身份数增加，
+    需要配合异步引擎同时执行多个工作项
+    """
+
+    def __init__(self, identities):
+        self._identities = list(identities)
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def __len__(self):
+        return len(self._identities)
+
+    @property
+    def identities(self):
+        return list(self._identities)
+
+    def _select(self, exclude=None):
+        """
+        选择身份并占用一个名额（调用方持有锁）
+
+        Returns:
+            tuple: (身份, 需要等待的秒数)；没有可用身份时身份为None，
+                   所有空闲身份都在冷却中时等待秒数为最短的剩余冷却时长，否则为None
+        """
+        now = time.monotonic()
+        free = [
+            identity
+            for identity in self._identities
+            if identity is not exclude and identity.active < identity.max_streams
+        ]
+        if not free:
+            return None, None
+        ready = [identity for identity in free if not identity.cooldown_remaining(now)]
+        if not ready:
+            return None, min(identity.cooldown_remaining(now) for identity in free)
+        identity = max(ready, key=lambda i: (i.health, -i.active))
+        identity.active += 1
+        identity.work_items += 1
+        return identity, 0.0
+
+    def try_assign(self, exclude=None):
+        """
+        不等待地分配一个身份
+
+        Args:
+            exclude: 不参与分配的身份(可选)，用于把工作项换到其他身份
+
+        Returns:
+            Identity: 分配到的身份，没有可用身份时返回None
+        """
+        with self._lock:
+            return self._select(exclude)[0]
+
+    def assign(self):
+        """
+        在当前线程中等待，直到分配到一个身份
+
+        Returns:
+            Identity: 分配到的身份
+        """
+        logged = False
+        with self._lock:
+            while True:
+                identity, wait = self._select()
+                if identity is not None:
+                    return identity
+                if wait is not None and not logged:
+                    logger.warning(f"所有身份都在冷却中，等待 {wait:.0f} 秒")
+                    logged = True
+                self._released.wait(wait)
+
+    async def assign_async(self):
+        """
+        在事件循环中等待，直到分配到一个身份，不阻塞其他协程
+
+        Returns:
+            Identity: 分配到的身份
+        """
+        logged = False
+        while True:
+            with self._lock:
+                identity, wait = self._select()
+            if identity is not None:
+                return identity
+            if wait is not None and not logged:
+                logger.warning(f"所有身份都在冷却中，等待 {wait:.0f} 秒")
+                logged = True
+            await asyncio.sleep(
+                _POLL_INTERVAL if wait is None else min(wait, _POLL_INTERVAL)
+            )
+
+    def release(self, identity):
+        """
+        释放身份的一个名额
+
+        Args:
+            identity: assign/try_assign分配的身份
+        """
+        with self._lock:
+            identity.active = max(identity.active - 1, 0)
+            self._released.notify_all()
+
+    def reassign(self, identity):
+        """
+        当前身份冷却中或Cookie已过期时，尝试把工作项换到其他身份
+
+        Args:
+            identity: 当前身份
+
+        Returns:
+            Identity: 新身份（原身份的名额已释放），没有其他可用身份时返回None
+        """
+        with self._lock:
+            other, _ = self._select(exclude=identity)
+            if other is None:
+                return None
+            identity.active = max(identity.active - 1, 0)
+            self._released.notify_all()
+        logger.info(f"工作项从身份 {identity.name} 换到 {other.name}")
+        return other
+
+
+def _load_identity_configs(path):
+    """
+    读取身份配置文件
+
+    文件内容为身份列表，或 {"identities": [...]}，每个身份：
+    name（必填）、cookie_file、user_agent、headers、rate、max_rate、max_streams
+
+    Returns:
+        list: 身份配置列表，读取失败时返回None
+    """
+    try:
+        data = load_file(path)
+    except Exception as e:
+        logger.error(f"读取身份配置文件 {path} 时出错: {e}")
+        return None
+    if isinstance(data, dict):
+        data = data.get("identities")
+    if not isinstance(data, list) or not data:
+        logger.error(f"身份配置文件 {path} 中没有身份列表")
+        return None
+    names = [config.get("name") for config in data if isinstance(config, dict)]
+    if len(names) != len(data) or not all(names) or len(set(names)) != len(names):
+        logger.error(f"身份配置文件 {path} 中每个身份都需要唯一的name")
+        return None
+    return data
+
+
+def _create_identity(config):
+    headers = DEFAULT_HEADERS.copy()
+    headers.update(config.get("headers") or {})
+    if config.get("user_agent"):
+        headers["User-Agent"] = config["user_agent"]
+    cookie_file = config.get("cookie_file") or f"cookies.{config['name']}.secret.json"
+    return Identity(
+        config["name"],
+        CookieJar(cookie_file, COOKIE_EXPIRY_MARGIN, COOKIE_FLUSH_INTERVAL),
+        headers,
+        create_rate_limiter(config.get("rate"), config.get("max_rate")),
+        max_streams=config.get("max_streams", IDENTITY_MAX_STREAMS),
+        cooldown=IDENTITY_COOLDOWN,
+        max_cooldown=IDENTITY_MAX_COOLDOWN,
+    )
+
+
+def create_identity_pool(path=None):
+    """
+    按身份配置文件创建身份池
+
+    配置文件不存在或无效时只包含默认身份：COOKIE_FILE的Cookie、
+    DEFAULT_HEADERS和共享限速器，与不使用身份池时的行为一致。
+    默认身份同时承担的工作项数不少于CRAWL_CONCURRENCY，
+    异步引擎仍按CRAWL_CONCURRENCY并发执行多个抓取流
+
+    Args:
+        path: 身份配置文件路径(可选)，默认IDENTITIES_FILE
+
+    Returns:
+        IdentityPool: 身份池
+    """
+    path = path or IDENTITIES_FILE
+    configs = _load_identity_configs(path) if os.path.exists(path) else None
+    if configs is None:
+        return IdentityPool(
+            [
+                Identity(
+                    "default",
+                    get_cookie_jar(),
+                    DEFAULT_HEADERS.copy(),
+                    get_rate_limiter(),
+                    max_streams=max(IDENTITY_MAX_STREAMS, CRAWL_CONCURRENCY),
+                    cooldown=IDENTITY_COOLDOWN,
+                    max_cooldown=IDENTITY_MAX_COOLDOWN,
+                )
+            ]
+        )
+    pool = IdentityPool([_create_identity(config) for config in configs])
+    logger.info(
+        f"已从 {path} 加载 {len(pool)} 个身份: "
+        f"{', '.join(identity.name for identity in pool.identities)}"
+    )
+    return pool
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_identity_pool():
+    """
+    获取进程级共享的身份池，首次调用时按IDENTITIES_FILE创建
+
+    Returns:
+        IdentityPool: 身份池
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_identity_pool()
+    return _pool
+
+
+def close_identity_pool():
+    """写回各身份尚未写回的Cookie，并输出各身份的统计信息"""
+    if _pool is None or len(_pool) < 2:
+        # 默认身份的Cookie和限速统计由各自的模块在退出时处理
+        return
+    for identity in _pool.identities:
+        identity.cookie_jar.flush(force=True)
+        stats = identity.get_stats()
+        if not stats["work_items"]:
+            continue
+        logger.info(
+            f"身份 {identity.name}: 工作项 {stats['work_items']} 个, "
+            f"正常 {stats['successes']} 次, 失败 {stats['failures']} 次, "
+            f"触发反爬 {stats['anti_crawl']} 次（冷却 {stats['cooldown_seconds']:.0f} 秒）, "
+            f"健康度 {stats['health']:.2f}, 速率 {stats['rate']:.3f} 次/秒"
+        )
+
+
+atexit.register(close_identity_pool)
@@ -4,13 +4,13 @@ JSON文件导入模块：从本地文件夹导入JSON数据到数据库。
 """
 
 import os
-import json
-import time
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
 
-from src.database import insert_job_data
+from src.json_codec import JSONDecodeError, loads
+from src.scraper import JSON_PARSE_SECONDS
+from src.storage import get_storage
 from src.utils import get_timestamp
 
 
@@ -58,11 +58,13 @@ def parse_json_file(file_path):
         dict: 解析后的JSON数据，失败时返回None
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(file_path, "rb") as f:
+            content = f.read()
+        with JSON_PARSE_SECONDS.time(source="import"):
+            data = loads(content)
         logger.info(f"成功解析文件: {file_path}")
         return data
-    except json.JSONDecodeError as e:
+    except JSONDecodeError as e:
         logger.error(f"解析JSON文件 {file_path} 时出错: {e}")
         return None
     except Exception as e:
@@ -108,14 +110,14 @@ def process_boss_json_file(file_path, file_info=None):
     success_count = 0
     total_count = len(job_list)
 
-    for job in job_list:
-        try:
-            if insert_job_data(job, search_term, page_number):
-                success_count += 1
-            time.sleep(0.1)  # 添加短暂延迟，避免数据库压力过大
-        except Exception as e:
-            logger.error(f"处理职位数据时出错: {e}")
-            logger.error(f"出错的文件: {file_path}")
+    try:
+        # 整个文件的岗位在一个事务中批量写入
+        success_count = get_storage().insert_jobs_batch(
+            job_list, search_term, page_number
+        )
+    except Exception as e:
+        logger.error(f"处理职位数据时出错: {e}")
+        logger.error(f"出错的文件: {file_path}")
 
     logger.info(
         f"从文件 {file_path} 中成功导入 {success_count}/{total_count} 条职位数据"
@@ -156,13 +158,84 @@ def extract_file_info(file_path):
         return {}
 
 
-def import_all_json_files(directory_path, process_file_callback=None):
+def iter_json_pages(json_files):
+    """
+    逐个解析JSON文件，产出其中的岗位列表
+
+    Args:
+        json_files: JSON文件路径列表
+
+    Yields:
+        tuple: (job_list, search_term, page_number)
+    """
+    for file_path in json_files:
+        file_info = extract_file_info(file_path)
+        json_data = parse_json_file(file_path)
+        if not json_data:
+            continue
+
+        code = json_data.get("code")
+        if code != 0:
+            error_msg = json_data.get("message", "未知错误")
+            logger.error(f"JSON文件中API返回错误: 代码 {code}, 消息: {error_msg}")
+            continue
+
+        job_list = json_data.get("zpData", {}).get("jobList", [])
+        if not job_list:
+            logger.warning(f"文件 {file_path} 中的职位列表为空")
+            continue
+
+        yield job_list, file_info.get("search_term"), file_info.get("page_number")
+
+
+def bulk_import_json_files(json_files):
+    """
+    使用存储后端的批量导入接口导入所有JSON文件（MySQL后端使用LOAD DATA LOCAL INFILE）
+
+    Args:
+        json_files: JSON文件路径列表
+
+    Returns:
+        dict: 导入结果统计
+    """
+    start_time = datetime.now()
+    stats = get_storage().bulk_load_pages(iter_json_pages(json_files))
+    duration = (datetime.now() - start_time).total_seconds()
+
+    if stats is None:
+        return {
+            "status": "error",
+            "message": "批量导入失败，事务已回滚",
+            "processed": len(json_files),
+            "duration_seconds": duration,
+        }
+
+    logger.info(f"批量导入完成，耗时 {duration:.2f} 秒")
+    return {
+        "status": "success",
+        "message": (
+            f"成功处理 {len(json_files)} 个文件，共 {stats['candidates']} 个岗位，"
+            f"新增 {stats['inserted']} 个，刷新 {stats['refreshed']} 个，"
+            f"未变化 {stats['unchanged']} 个"
+        ),
+        "processed": len(json_files),
+        "successful_imports": stats["candidates"],
+        "total_jobs": stats["candidates"],
+        "duration_seconds": duration,
+        "tables": stats["tables"],
+    }
+
+
+def import_all_json_files(
+    directory_path, process_file_callback=None, bulk_load=False
+):
     """
     处理目录中的所有JSON文件
 
     Args:
         directory_path: JSON文件所在目录
         process_file_callback: 处理单个文件的回调函数，默认使用process_boss_json_file
+        bulk_load: 是否使用LOAD DATA LOCAL INFILE批量导入模式
 
     Returns:
         dict: 导入结果统计
@@ -178,6 +251,9 @@ def import_all_json_files(directory_path, process_file_callback=None):
             "processed": 0,
         }
 
+    if bulk_load:
+        return bulk_import_json_files(json_files)
+
     start_time = datetime.now()
     total_success = 0
     total_jobs = 0
@@ -193,9 +269,6 @@ def import_all_json_files(directory_path, process_file_callback=None):
         total_jobs += total
         files_processed += 1
 
-        # 短暂暂停，避免数据库压力
-        time.sleep(0.5)
-
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
 
@@ -0,0 +1,71 @@
+"""
+Incremental crawl module: stops paging a stream once consecutive pages consist mostly of already stored jobs.
+"""
+
+from loguru import logger
+from config.settings import INCREMENTAL_KNOWN_RATIO, INCREMENTAL_STOP_PAGES
+from src.storage import get_storage
+
+
+class IncrementalStopRule:
+    """
+    增量抓取的停止规则，每个抓取流一个实例
+
+    列表按时间排序，连续stop_pages页中已存储岗位的占比都不低于known_ratio时，
+    更深的分页基本都是旧数据，停止翻页。每页的岗位ID通过一次批量查询判断是否已存储，
+    必须在该页写入之前调用
+    """
+
+    def __init__(self, storage, known_ratio, stop_pages):
+        self._storage = storage
+        self._known_ratio = known_ratio
+        self._stop_pages = max(1, stop_pages)
+        self._streak = 0
+
+    def observe(self, job_list):
+        """
+        检查一页岗位，判断是否应在这一页之后停止翻页
+
+        Args:
+            job_list: 该页的岗位数据字典列表
+
+        Returns:
+            bool: 是否停止
+        """
+        job_ids = {job.get("encryptJobId") for job in job_list} - {None, ""}
+        if not job_ids:
+            return False
+
+        known = self._storage.get_known_job_ids(list(job_ids))
+        if known is None:
+            # 查询失败时继续翻页，宁可多抓也不漏抓
+            self._streak = 0
+            return False
+
+        ratio = len(known) / len(job_ids)
+        if ratio >= self._known_ratio:
+            self._streak += 1
+        else:
+            self._streak = 0
+        logger.info(
+            f"增量模式: 本页 {len(known)}/{len(job_ids)} 个岗位已存储 "
+            f"({ratio:.0%})，连续 {self._streak}/{self._stop_pages} 页达到阈值"
+        )
+        return self._streak >= self._stop_pages
+
+
+def create_stop_rule(incremental):
+    """
+    按配置为一个抓取流创建增量停止规则
+
+    Args:
+        incremental: 是否启用增量模式
+
+    Returns:
+        IncrementalStopRule: 停止规则，未启用增量模式时返回None
+    """
+    if not incremental:
+        return None
+    return IncrementalStopRule(
+        get_storage(), INCREMENTAL_KNOWN_RATIO, INCREMENTAL_STOP_PAGES
+    )
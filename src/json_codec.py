@@ -0,0 +1,93 @@
+"""
+JSON codec module: parses and serialises JSON with orjson when installed, falling back to the standard json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError是json.JSONDecodeError的子类，两种实现的解析错误都可以用它捕获
+JSONDecodeError = json.JSONDecodeError
+
+
+def get_backend():
+    """
+    获取当前使用的JSON实现
+
+    Returns:
+        str: "orjson"或"json"
+    """
+    return "orjson" if orjson is not None else "json"
+
+
+def loads(data):
+    """
+    解析JSON
+
+    bytes直接交给解析器，不先解码为str，避免多复制一份响应体
+
+    Args:
+        data: UTF-8编码的bytes/bytearray/memoryview，或str
+
+    Returns:
+        解析后的对象
+
+    Raises:
+        JSONDecodeError: 内容不是合法的JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj, indent=False, sort_keys=False, default=None):
+    """
+    序列化为UTF-8编码的JSON，非ASCII字符不转义
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否缩进2个空格输出，默认输出紧凑格式
+        sort_keys: 是否按键排序
+        default: 无法直接序列化的对象的转换函数(可选)
+
+    Returns:
+        bytes: JSON内容
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=default,
+    ).encode("utf-8")
+
+
+def load_file(path):
+    """
+    读取并解析JSON文件，按二进制读取后直接解析
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        解析后的对象
+
+    Raises:
+        OSError: 文件无法读取
+        JSONDecodeError: 内容不是合法的JSON
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
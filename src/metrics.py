@@ -0,0 +1,407 @@
+"""
+Metrics module: in-process counters, gauges and latency histograms exposed in Prometheus text format and summarised at exit.
+"""
+
+import atexit
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+
+# 延迟直方图的默认桶上界（秒）
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类：按标签值组合分别记录"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        """
+        按Prometheus文本格式输出
+
+        Returns:
+            list: 文本行列表
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, value in self.collect():
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} "
+                f"{_format_number(value)}"
+            )
+        return lines
+
+    def collect(self):
+        """返回(标签值, 数值)列表"""
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        增加计数
+
+        Args:
+            amount: 增加量，默认1
+            **labels: 标签值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    可增可减的当前值，也可以绑定一个函数，在输出时取值（如队列长度）
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._functions = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._functions.pop(key, None)
+            self._values[key] = value
+
+    def set_function(self, function, **labels):
+        """
+        绑定取值函数，function为None时解除绑定并把值置为0
+
+        Args:
+            function: 无参数、返回数值的函数
+            **labels: 标签值
+        """
+        key = self._key(labels)
+        with self._lock:
+            if function is None:
+                self._functions.pop(key, None)
+                self._values[key] = 0
+            else:
+                self._functions[key] = function
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception as e:
+                logger.debug(f"读取指标 {self.name} 时出错: {e}")
+        return sorted(values.items())
+
+
+class Histogram(_Metric):
+    """
+    延迟直方图：按桶累计观测次数，同时记录总和与次数，可按桶估算分位数
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        记录一次观测
+
+        Args:
+            value: 观测值（秒）
+            **labels: 标签值
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels):
+        """
+        计时上下文管理器，退出时记录经过的时间
+
+        Args:
+            **labels: 标签值
+        """
+        return _Timer(self, labels)
+
+    def collect(self):
+        with self._lock:
+            return sorted(
+                (key, (list(counts), total, count))
+                for key, (counts, total, count) in self._values.items()
+            )
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, (counts, total, count) in self.collect():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} "
+                    f"{cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def quantile(self, q, counts, count):
+        """
+        按桶线性插值估算分位数（与Prometheus的histogram_quantile一致）
+
+        Args:
+            q: 分位（0到1）
+            counts: 各桶的观测次数
+            count: 总观测次数
+
+        Returns:
+            float: 估算值，落在最后一个桶之外时返回最大的桶上界
+        """
+        if not count:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (
+                    (rank - cumulative) / bucket_count
+                )
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    指标注册表：同名指标只创建一次，按Prometheus文本格式统一输出
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.type_name}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self):
+        """
+        输出全部指标
+
+        Returns:
+            str: Prometheus文本格式（0.0.4）
+        """
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self):
+        """
+        生成退出时输出的摘要：计数器的值、直方图的次数、平均值和p50/p95/p99
+
+        Returns:
+            list: 文本行列表，没有任何观测时为空
+        """
+        lines = []
+        for metric in self.metrics():
+            for key, value in metric.collect():
+                labels = _format_labels(metric.labelnames, key)
+                if isinstance(metric, Histogram):
+                    counts, total, count = value
+                    if not count:
+                        continue
+                    p50, p95, p99 = (
+                        metric.quantile(q, counts, count) for q in (0.5, 0.95, 0.99)
+                    )
+                    lines.append(
+                        f"{metric.name}{labels}: {count} 次, "
+                        f"平均 {total / count * 1000:.1f}ms, p50 {p50 * 1000:.1f}ms, "
+                        f"p95 {p95 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms"
+                    )
+                elif isinstance(metric, Counter) and value:
+                    lines.append(f"{metric.name}{labels}: {_format_number(value)}")
+        return lines
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry():
+    """
+    获取进程级共享的指标注册表
+
+    Returns:
+        MetricsRegistry: 指标注册表
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def counter(name, documentation, labelnames=()):
+    """在共享注册表中获取或创建计数器"""
+    return get_metrics_registry().counter(name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    """在共享注册表中获取或创建当前值指标"""
+    return get_metrics_registry().gauge(name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """在共享注册表中获取或创建直方图"""
+    return get_metrics_registry().histogram(name, documentation, labelnames, buckets)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = get_metrics_registry().render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"指标请求: {format % args}")
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """
+    在后台线程中启动指标HTTP服务，GET /metrics返回Prometheus文本格式
+
+    Args:
+        port: 监听端口
+        host: 监听地址，默认只监听本机
+
+    Returns:
+        ThreadingHTTPServer: HTTP服务，启动失败时返回None
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error(f"启动指标服务 {host}:{port} 失败: {e}")
+        return None
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    logger.info(f"指标服务已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def log_metrics_summary():
+    """退出时把指标摘要输出到日志"""
+    if _registry is None:
+        return
+    lines = _registry.summary_lines()
+    if lines:
+        logger.info("指标摘要:\n" + "\n".join(lines))
+
+
+atexit.register(log_metrics_summary)
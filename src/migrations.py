@@ -0,0 +1,86 @@
+"""
+Schema migration module: versioned, ordered schema changes recorded in a schema-version table.
+"""
+
+from mysql.connector import Error, errorcode
+from loguru import logger
+from config.db_config import TABLE_PREFIX, CHARSET, COLLATION
+from src.database import create_base_schema, add_analytics_indexes
+
+# 有序的迁移列表：(版本号, 说明, 迁移函数)
+# 迁移函数接收数据库游标，须可重复执行（DDL会隐式提交，中途失败后会整体重跑）
+MIGRATIONS = [
+    (1, "基础表结构", create_base_schema),
+    (2, "薪资字段与分析查询索引", add_analytics_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(cursor):
+    """创建结构版本表（如果不存在）"""
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}schema_version (
+            version INT PRIMARY KEY COMMENT '结构版本号',
+            description VARCHAR(100) COMMENT '迁移说明',
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '应用时间'
+        ) ENGINE=InnoDB DEFAULT CHARSET={CHARSET} COLLATE={COLLATION} COMMENT='数据库结构版本表';
+        """
+    )
+
+
+def get_schema_version(cursor):
+    """
+    查询当前数据库结构版本，只执行一条查询
+
+    Args:
+        cursor: 数据库游标
+
+    Returns:
+        int: 已应用的最高版本号，版本表不存在时返回0
+    """
+    try:
+        cursor.execute(f"SELECT MAX(version) FROM {TABLE_PREFIX}schema_version")
+    except Error as e:
+        # 新数据库或版本管理之前创建的数据库没有版本表
+        if e.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+        return 0
+    row = cursor.fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(cursor):
+    """
+    按版本号依次执行尚未应用的迁移，并记录到结构版本表
+
+    已是最新版本时只执行一次版本查询
+
+    Args:
+        cursor: 数据库游标
+
+    Returns:
+        int: 本次应用的迁移数量
+    """
+    current = get_schema_version(cursor)
+    if current >= LATEST_VERSION:
+        logger.debug(f"数据库结构已是最新版本 {current}")
+        return 0
+
+    _ensure_version_table(cursor)
+    applied = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.info(f"正在应用数据库迁移 {version}: {description}")
+        migrate(cursor)
+        cursor.execute(
+            f"INSERT INTO {TABLE_PREFIX}schema_version (version, description) "
+            f"VALUES (%s, %s)",
+            (version, description),
+        )
+        applied += 1
+
+    logger.info(f"数据库结构已升级到版本 {LATEST_VERSION}")
+    return applied
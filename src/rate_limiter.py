@@ -0,0 +1,301 @@
+"""
+Adaptive rate limiter: a shared token bucket that speeds up on healthy responses and backs off on throttling.
+"""
+
+import asyncio
+import atexit
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from loguru import logger
+from config.settings import (
+    RETRY_DELAY,
+    RATE_LIMIT_INITIAL_RATE,
+    RATE_LIMIT_MIN_RATE,
+    RATE_LIMIT_MAX_RATE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_INCREASE,
+    RATE_LIMIT_DECREASE,
+    RATE_LIMIT_JITTER,
+    RATE_LIMIT_MAX_BACKOFF,
+    RATE_LIMIT_LATENCY_FACTOR,
+)
+
+# 视为被限流的HTTP状态码
+THROTTLE_STATUS_CODES = (403, 429)
+
+# 延迟的指数移动平均系数
+_LATENCY_ALPHA = 0.2
+
+
+def parse_retry_after(value):
+    """
+    解析Retry-After响应头
+
+    Args:
+        value: 秒数或HTTP日期格式的字符串
+
+    Returns:
+        float: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应令牌桶限速器，所有抓取线程和异步抓取流共享
+
+    - 每个请求发出前取一个令牌，令牌按rate个/秒补充，最多积累burst个；
+      令牌不足时按排队顺序等待，等待时间带随机抖动，请求间隔不完全固定
+    - 响应正常时速率加性增加increase，直到max_rate
+    - API返回非0的code、HTTP 403/429、网络错误时速率乘以decrease，并暂停发出请求：
+      暂停时长从base_backoff起按连续失败次数指数增长（带抖动，不超过max_backoff），
+      响应带Retry-After时至少等待其指定的时长
+    - 延迟的移动平均超过基线的latency_factor倍时视为服务端吃紧，只降速不暂停
+    """
+
+    def __init__(
+        self,
+        rate,
+        min_rate,
+        max_rate,
+        burst=1,
+        increase=0.01,
+        decrease=0.5,
+        jitter=0.3,
+        base_backoff=5,
+        max_backoff=300,
+        latency_factor=2.0,
+    ):
+        self._min_rate = max(min_rate, 1e-3)
+        self._max_rate = max(max_rate, self._min_rate)
+        self._rate = min(max(rate, self._min_rate), self._max_rate)
+        self._burst = max(1, burst)
+        self._increase = increase
+        self._decrease = decrease
+        self._jitter = jitter
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._latency_factor = latency_factor
+
+        self._lock = threading.Lock()
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._latency = None
+        self._baseline = None
+        self._stats = {
+            "requests": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "successes": 0,
+            "throttled": 0,
+            "slowdowns": 0,
+            "backoff_seconds": 0.0,
+            "lowest_rate": self._rate,
+            "highest_rate": self._rate,
+        }
+
+    @property
+    def rate(self):
+        """当前速率（请求/秒）"""
+        return self._rate
+
+    def reserve(self):
+        """
+        预定一个令牌
+
+        Returns:
+            float: 发出请求前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # 令牌可以透支，后来的请求排在透支部分之后
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            wait = max(wait, self._blocked_until - now)
+            if self._jitter:
+                wait += random.uniform(0, self._jitter) / self._rate
+
+            self._stats["requests"] += 1
+            if wait > 0:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += wait
+        return wait
+
+    def acquire(self):
+        """在当前线程中等待，直到可以发出下一个请求"""
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"限速等待 {wait:.2f} 秒，当前速率 {self._rate:.3f} 次/秒")
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """在事件循环中等待，直到可以发出下一个请求，不阻塞其他协程"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _set_rate(self, rate):
+        self._rate = min(max(rate, self._min_rate), self._max_rate)
+        self._stats["lowest_rate"] = min(self._stats["lowest_rate"], self._rate)
+        self._stats["highest_rate"] = max(self._stats["highest_rate"], self._rate)
+
+    def record(self, ok, latency=None, retry_after=None, reason=None):
+        """
+        根据一次请求的结果调整速率
+
+        Args:
+            ok: 请求是否正常（HTTP 2xx且API返回code为0）
+            latency: 响应耗时(秒，可选)
+            retry_after: 响应头Retry-After解析出的等待秒数(可选)
+            reason: 异常原因，用于日志(可选)
+        """
+        with self._lock:
+            if ok:
+                self._record_success(latency)
+            else:
+                self._record_throttle(retry_after, reason)
+
+    def _record_success(self, latency):
+        self._failures = 0
+        self._stats["successes"] += 1
+        if latency is not None:
+            if self._latency is None:
+                self._latency = self._baseline = latency
+            else:
+                self._latency += _LATENCY_ALPHA * (latency - self._latency)
+                # 基线跟随延迟下降，上升时只缓慢跟随
+                if self._latency < self._baseline:
+                    self._baseline = self._latency
+                else:
+                    self._baseline += 0.05 * (self._latency - self._baseline)
+            if self._latency > self._baseline * self._latency_factor:
+                self._stats["slowdowns"] += 1
+                self._set_rate(self._rate * self._decrease)
+                logger.warning(
+                    f"响应延迟上升（{self._latency:.2f}秒，基线"
+                    f"{self._baseline:.2f}秒），降速至 {self._rate:.3f} 次/秒"
+                )
+                # 降速后重新建立基线，避免连续触发
+                self._baseline = self._latency
+                return
+        self._set_rate(self._rate + self._increase)
+
+    def _record_throttle(self, retry_after, reason):
+        self._failures += 1
+        self._stats["throttled"] += 1
+        self._set_rate(self._rate * self._decrease)
+
+        backoff = min(
+            self._max_backoff, self._base_backoff * 2 ** (self._failures - 1)
+        )
+        # 一半固定、一半随机，多个抓取流不会在同一时刻同时恢复
+        backoff = backoff / 2 + random.uniform(0, backoff / 2)
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+
+        now = time.monotonic()
+        blocked_until = max(self._blocked_until, now + backoff)
+        self._stats["backoff_seconds"] += blocked_until - max(self._blocked_until, now)
+        self._blocked_until = blocked_until
+        logger.warning(
+            f"请求被限流或失败（{reason or '未知原因'}），连续 {self._failures} 次，"
+            f"暂停 {blocked_until - now:.1f} 秒，降速至 {self._rate:.3f} 次/秒"
+        )
+
+    def get_stats(self):
+        """
+        获取限速统计信息
+
+        Returns:
+            dict: 包含请求数、等待次数与耗时、正常与限流次数、因延迟降速次数、
+                  退避总时长、当前/最低/最高速率
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["rate"] = self._rate
+        return stats
+
+
+def create_rate_limiter(rate=None, max_rate=None):
+    """
+    按RATE_LIMIT_*配置创建一个新的限速器
+
+    Args:
+        rate: 初始速率(可选)，默认RATE_LIMIT_INITIAL_RATE
+        max_rate: 速率上限(可选)，默认RATE_LIMIT_MAX_RATE
+
+    Returns:
+        AdaptiveRateLimiter: 限速器
+    """
+    return AdaptiveRateLimiter(
+        RATE_LIMIT_INITIAL_RATE if rate is None else rate,
+        RATE_LIMIT_MIN_RATE,
+        RATE_LIMIT_MAX_RATE if max_rate is None else max_rate,
+        burst=RATE_LIMIT_BURST,
+        increase=RATE_LIMIT_INCREASE,
+        decrease=RATE_LIMIT_DECREASE,
+        jitter=RATE_LIMIT_JITTER,
+        base_backoff=RETRY_DELAY,
+        max_backoff=RATE_LIMIT_MAX_BACKOFF,
+        latency_factor=RATE_LIMIT_LATENCY_FACTOR,
+    )
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    获取进程级共享的限速器，首次调用时创建
+
+    Returns:
+        AdaptiveRateLimiter: 限速器
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = create_rate_limiter()
+    return _limiter
+
+
+def log_rate_limit_stats():
+    """将限速器的统计输出到日志"""
+    if _limiter is None:
+        return
+    stats = _limiter.get_stats()
+    if not stats["requests"]:
+        return
+    logger.info(
+        f"限速器: 请求 {stats['requests']} 次, 等待 {stats['waits']} 次"
+        f"共 {stats['wait_seconds']:.1f} 秒, 正常 {stats['successes']} 次, "
+        f"限流 {stats['throttled']} 次（退避 {stats['backoff_seconds']:.1f} 秒）, "
+        f"因延迟降速 {stats['slowdowns']} 次, 速率 {stats['rate']:.3f} 次/秒 "
+        f"（最低 {stats['lowest_rate']:.3f}, 最高 {stats['highest_rate']:.3f}）"
+    )
+
+
+atexit.register(log_rate_limit_stats)
@@ -0,0 +1,149 @@
+"""
+Replay module: re-processes archived raw responses through the normal storage path without network access.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from loguru import logger
+from src.archive import iter_index, read_record_bytes
+from src.json_codec import loads
+from src.scraper import JSON_PARSE_SECONDS, process_boss_zhipin_data
+from src.write_pipeline import create_write_pipeline
+
+
+def _parse_time(value, end=False):
+    """
+    解析时间过滤条件
+
+    Args:
+        value: ISO格式的日期或日期时间字符串
+        end: 是否为结束时间，只有日期时包含当天
+
+    Returns:
+        datetime: 解析后的时间，value为空时返回None
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def iter_archived_responses(directory, since=None, until=None, queries=None):
+    """
+    按归档顺序逐条读取符合条件的成功响应，同一分段只打开一次
+
+    Args:
+        directory: 归档目录
+        since: 起始时间（包含），datetime或None
+        until: 结束时间（不包含），datetime或None
+        queries: 只保留这些搜索关键词(可选)
+
+    Yields:
+        dict: 归档记录
+    """
+    segment_name = None
+    segment_file = None
+    try:
+        for entry in iter_index(directory):
+            if entry.get("code") != 0:
+                continue
+            if queries and entry.get("query") not in queries:
+                continue
+            if since or until:
+                archived_at = datetime.fromisoformat(entry["time"])
+                if since and archived_at < since:
+                    continue
+                if until and archived_at >= until:
+                    continue
+
+            if entry["segment"] != segment_name:
+                if segment_file is not None:
+                    segment_file.close()
+                segment_name = entry["segment"]
+                segment_file = open(os.path.join(directory, segment_name), "rb")
+            line = read_record_bytes(directory, entry, segment_file)
+            with JSON_PARSE_SECONDS.time(source="replay"):
+                record = loads(line)
+            yield record
+    finally:
+        if segment_file is not None:
+            segment_file.close()
+
+
+def replay_archive(directory, since=None, until=None, queries=None):
+    """
+    把归档的原始响应按原顺序重新处理并写入存储，不发出网络请求、不等待
+
+    与在线抓取走同一条处理路径（process_boss_zhipin_data和写入流水线），
+    已存储的岗位也会强制刷新（内容指纹相同时同样按当前字段映射重新写入），
+    字段映射变更后可以据此重建数据库，也可以作为端到端写入吞吐的可复现基准
+
+    Args:
+        directory: 归档目录
+        since: 起始时间，ISO格式字符串(可选)
+        until: 结束时间，ISO格式字符串(可选)，只有日期时包含当天
+        queries: 只重放这些搜索关键词的响应(可选)
+
+    Returns:
+        dict: 统计信息，包含pages、jobs、processed、elapsed_seconds、
+              pages_per_second和jobs_per_second；失败时返回None
+    """
+    if not os.path.exists(directory):
+        logger.error(f"归档目录不存在: {directory}")
+        return None
+    try:
+        since_time = _parse_time(since)
+        until_time = _parse_time(until, end=True)
+    except ValueError as e:
+        logger.error(
+            f"时间格式错误，应为ISO格式（如2024-05-01或2024-05-01T08:00）: {e}"
+        )
+        return None
+
+    logger.info(
+        f"开始重放归档 {directory}"
+        + (f"，起始 {since_time}" if since_time else "")
+        + (f"，截止 {until_time}" if until_time else "")
+        + (f"，关键词 {', '.join(queries)}" if queries else "")
+    )
+
+    stats = {"pages": 0, "jobs": 0, "processed": 0}
+    start = time.perf_counter()
+    pipeline = create_write_pipeline()
+    try:
+        for record in iter_archived_responses(
+            directory, since_time, until_time, queries
+        ):
+            # 内容指纹取自原始响应，重放时必须强制刷新，新的字段映射才会生效
+            processed, total = process_boss_zhipin_data(
+                record["response"],
+                record.get("query"),
+                record.get("page"),
+                pipeline,
+                refresh=True,
+            )
+            stats["pages"] += 1
+            stats["jobs"] += total
+            stats["processed"] += processed
+    except Exception as e:
+        logger.error(f"重放归档时出错: {e}")
+        return None
+    finally:
+        # 写完队列中剩余的页面，吞吐量按全部写入完成的时间计算
+        if pipeline is not None:
+            pipeline_stats = pipeline.close()
+            stats["processed"] = pipeline_stats["written"]
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_seconds"] = elapsed
+    stats["pages_per_second"] = stats["pages"] / elapsed if elapsed > 0 else 0.0
+    stats["jobs_per_second"] = stats["jobs"] / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"重放完成: {stats['pages']} 页, {stats['processed']}/{stats['jobs']} "
+        f"个岗位处理成功, 耗时 {elapsed:.2f} 秒, "
+        f"{stats['pages_per_second']:.1f} 页/秒, {stats['jobs_per_second']:.1f} 个/秒"
+    )
+    return stats
@@ -0,0 +1,205 @@
+"""
+Asynchronous request-log writer: buffers request logs in a bounded queue and writes them in batches.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from loguru import logger
+from config.db_config import (
+    REQUEST_LOG_QUEUE_SIZE,
+    REQUEST_LOG_BATCH_SIZE,
+    REQUEST_LOG_FLUSH_INTERVAL,
+    REQUEST_LOG_FULL_POLICY,
+)
+from src.database import build_request_log_row
+from src.metrics import gauge
+from src.storage import get_storage
+
+# 队列中表示“停止写入线程”的哨兵对象
+_STOP = object()
+
+REQUEST_LOG_QUEUE_DEPTH = gauge(
+    "boss_request_log_queue_depth", "请求日志队列中等待写入的日志条数"
+)
+
+
+class RequestLogWriter:
+    """
+    请求日志异步写入器
+
+    submit只把日志放入有界队列，由后台线程在积累到batch_size条或等待超过
+    flush_interval秒时多行批量写入，抓取请求不再等待数据库往返。
+    队列已满时按policy处理：drop直接丢弃并计数，block等待队列空出
+    """
+
+    def __init__(
+        self, storage, max_size, batch_size, flush_interval, policy="drop"
+    ):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"不支持的队列满处理策略: {policy}")
+        self._storage = storage
+        self._queue = queue.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._policy = policy
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+        REQUEST_LOG_QUEUE_DEPTH.set_function(self._queue.qsize)
+        self._thread = threading.Thread(
+            target=self._run, name="request-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def submit(
+        self, url, params, status_code, response_time, total_results, has_more, cookies
+    ):
+        """
+        提交一条请求日志，不等待写入数据库
+
+        Returns:
+            bool: 是否已放入队列（队列已满且策略为drop或写入器已关闭时为False）
+        """
+        if self._closed:
+            self._count("dropped")
+            return False
+
+        row = build_request_log_row(
+            url, params, status_code, response_time, total_results, has_more, cookies
+        )
+        try:
+            self._queue.put(row, block=self._policy == "block")
+        except queue.Full:
+            self._count("dropped")
+            logger.warning("请求日志队列已满，丢弃一条日志")
+            return False
+        self._count("submitted")
+        return True
+
+    def _flush(self, batch):
+        """写入一批日志并更新统计"""
+        if not batch:
+            return
+        try:
+            written = self._storage.insert_request_logs_batch(batch)
+        except Exception as e:
+            logger.error(f"批量写入请求日志时出错: {e}")
+            written = 0
+        self._count("batches")
+        self._count("written", written)
+        if written < len(batch):
+            self._count("failed", len(batch) - written)
+
+    def _run(self):
+        """后台写入线程：按数量或时间阈值批量写入，收到哨兵后写完剩余日志并退出"""
+        batch = []
+        deadline = None
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self._flush_interval
+                batch.append(item)
+
+            if len(batch) >= self._batch_size or (
+                batch and time.monotonic() >= deadline
+            ):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def close(self, timeout=None):
+        """
+        停止接收新日志，写完队列中剩余的日志后结束后台线程
+
+        Args:
+            timeout: 等待写入线程结束的最长秒数，None表示一直等待
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # 哨兵总是阻塞放入，保证排在所有已提交日志之后
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        REQUEST_LOG_QUEUE_DEPTH.set_function(None)
+        if self._thread.is_alive():
+            logger.warning("请求日志写入线程未在超时时间内结束，部分日志可能未写入")
+
+    def get_stats(self):
+        """
+        获取写入器统计信息
+
+        Returns:
+            dict: 包含submitted、written、dropped、failed、batches和当前队列长度pending
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_request_log_writer():
+    """
+    获取进程级共享的请求日志写入器，首次调用时创建并启动后台线程
+
+    Returns:
+        RequestLogWriter: 请求日志写入器
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = RequestLogWriter(
+                    get_storage(),
+                    max_size=REQUEST_LOG_QUEUE_SIZE,
+                    batch_size=REQUEST_LOG_BATCH_SIZE,
+                    flush_interval=REQUEST_LOG_FLUSH_INTERVAL,
+                    policy=REQUEST_LOG_FULL_POLICY,
+                )
+                # 晚于连接池注册（建表时已创建连接池），退出时先于连接池关闭执行
+                atexit.register(close_request_log_writer)
+    return _writer
+
+
+def close_request_log_writer():
+    """写完剩余的请求日志，关闭共享写入器并输出统计信息"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            return
+        _writer.close()
+        stats = _writer.get_stats()
+        _writer = None
+    if stats["submitted"] + stats["dropped"] == 0:
+        return
+    logger.info(
+        f"请求日志: 提交 {stats['submitted']} 条, 写入 {stats['written']} 条 "
+        f"({stats['batches']} 批), 丢弃 {stats['dropped']} 条, "
+        f"写入失败 {stats['failed']} 条"
+    )
@@ -3,39 +3,99 @@ Web scraper module for fetching and processing JSON data from target URLs.
 """
 
 import requests
-import json
 import time
 import traceback
-import random
 from datetime import datetime
+from functools import partial
 from loguru import logger
 from config.settings import (
     TARGET_URLS,
     DEFAULT_HEADERS,
     DEFAULT_PARAMS,
     RETRY_TIMES,
-    RETRY_DELAY,
+    ANTI_CRAWL_CODES,
 )
-from src.database import insert_job_data, insert_request_log
-from src.utils import load_cookies, update_cookies_from_response, cookies_dict_to_str
+from src.archive import get_archive
+from src.checkpoint import get_checkpoint
+from src.http_session import get_http_session
+from src.identity_pool import get_identity_pool
+from src.incremental import create_stop_rule
+from src.json_codec import JSONDecodeError, loads
+from src.metrics import counter, histogram
+from src.rate_limiter import (
+    THROTTLE_STATUS_CODES,
+    get_rate_limiter,
+    parse_retry_after,
+)
+from src.storage import get_storage
+from src.request_log_writer import get_request_log_writer
+from src.write_pipeline import create_write_pipeline
+from src.cookie_jar import get_cookie_jar
+from src.utils import update_cookies_from_response, cookies_dict_to_str
+
+HTTP_REQUEST_SECONDS = histogram(
+    "boss_http_request_seconds", "HTTP请求耗时（秒），status为HTTP状态码或error", ("status",)
+)
+JSON_PARSE_SECONDS = histogram(
+    "boss_json_parse_seconds", "JSON解析耗时（秒）", ("source",)
+)
+API_RESPONSES = counter("boss_api_responses_total", "按API返回码统计的响应数", ("code",))
+FETCH_RETRIES = counter("boss_fetch_retries_total", "获取分页失败后的重试次数")
+
+
+def _archive_response(url, params, status_code, body, code=None):
+    """启用了--backup时归档原始响应体，归档出错不影响抓取"""
+    archive = get_archive()
+    if archive is None:
+        return
+    try:
+        archive.append(url, params, status_code, body, code)
+    except Exception as e:
+        logger.error(f"归档响应时出错: {e}")
+
+
+def _record_outcome(
+    identity, ok, latency=None, retry_after=None, reason=None, anti_crawl=False
+):
+    """把请求结果反馈给身份（及其限速器），未指定身份时反馈给共享限速器"""
+    if identity is not None:
+        identity.record(ok, latency, retry_after, reason, anti_crawl)
+    else:
+        get_rate_limiter().record(ok, latency, retry_after, reason)
 
 
-def fetch_data(url, headers=None, params=None, cookies=None):
+def fetch_data(
+    url, headers=None, params=None, cookies=None, cookie_jar=None, identity=None
+):
     """
     从指定URL获取JSON数据
 
+    发出请求前由调用方向限速器取令牌，本函数把请求结果反馈给限速器
+
     Args:
         url: 目标URL
         headers: HTTP请求头(可选)
         params: URL参数(可选)
-        cookies: Cookie字典(可选)
+        cookies: Cookie字典(可选)，默认使用Cookie容器中当前有效的Cookie
+        cookie_jar: Cookie容器(可选)，默认使用COOKIE_FILE对应的共享容器
+        identity: 抓取身份(可选)，指定时使用该身份的请求头、Cookie容器和限速器，
+                  并按结果调整其健康度和冷却
 
     Returns:
         tuple: (data, response), 解析后的JSON数据和原始响应对象，出错时data为None
     """
+    if identity is not None:
+        headers = headers or identity.request_headers()
+        cookie_jar = cookie_jar or identity.cookie_jar
     if headers is None:
         headers = DEFAULT_HEADERS.copy()
 
+    jar = cookie_jar or get_cookie_jar()
+    from_jar = cookies is None
+    if from_jar:
+        # 即将过期的Cookie在此告警，已过期的Cookie不再发送
+        cookies = jar.cookies_for_request()
+
     if cookies:
         # 将cookie字典转为字符串
         cookie_str = cookies_dict_to_str(cookies)
@@ -45,31 +105,61 @@ def fetch_data(url, headers=None, params=None, cookies=None):
 
     try:
         logger.info(f"正在从 {url} 获取数据")
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        # 共享会话复用连接，并负责解码br、zstd等压缩格式
+        response = get_http_session().get(url, headers=headers, params=params)
 
         # 计算响应时间
         response_time = time.time() - start_time
+        HTTP_REQUEST_SECONDS.observe(response_time, status=response.status_code)
 
         # 更新Cookie
-        updated_cookies = update_cookies_from_response(response, cookies)
+        updated_cookies = update_cookies_from_response(
+            response, None if from_jar else cookies, jar
+        )
 
-        # 检查HTTP状态码
+        # 检查HTTP状态码，被限流时按Retry-After退避
+        if response.status_code in THROTTLE_STATUS_CODES:
+            _record_outcome(
+                identity,
+                False,
+                response_time,
+                parse_retry_after(response.headers.get("Retry-After")),
+                f"HTTP {response.status_code}",
+                anti_crawl=True,
+            )
         response.raise_for_status()
 
-        # 解析JSON
-        data = response.json()
-        logger.info(
-            f"成功获取数据 ({len(str(data))} 字节), 耗时: {response_time:.3f}秒"
+        # 直接从响应体的bytes解析JSON，大小取响应体长度，不再重新序列化
+        body = response.content
+        with JSON_PARSE_SECONDS.time(source="fetch"):
+            data = loads(body)
+        _archive_response(
+            url,
+            params,
+            response.status_code,
+            body,
+            data.get("code") if isinstance(data, dict) else None,
         )
+        logger.info(f"成功获取数据 ({len(body)} 字节), 耗时: {response_time:.3f}秒")
 
         # 记录请求
         try:
             # 检查是否有错误代码
             code = data.get("code", -1)
+            API_RESPONSES.inc(code=code)
             message = data.get("message", "")
 
             if code != 0:
                 logger.error(f"API返回错误代码: {code}, 消息: {message}")
+                _record_outcome(
+                    identity,
+                    False,
+                    response_time,
+                    reason=f"API code {code}",
+                    anti_crawl=code in ANTI_CRAWL_CODES,
+                )
+            else:
+                _record_outcome(identity, True, response_time)
 
             total_results = (
                 data.get("zpData", {}).get("resCount", 0) if code == 0 else 0
@@ -77,7 +167,8 @@ def fetch_data(url, headers=None, params=None, cookies=None):
             has_more = (
                 data.get("zpData", {}).get("hasMore", False) if code == 0 else False
             )
-            insert_request_log(
+            # 只放入队列，由后台线程批量写入，不占用请求的耗时
+            get_request_log_writer().submit(
                 url=url,
                 params=params,
                 status_code=response.status_code,
@@ -92,13 +183,30 @@ def fetch_data(url, headers=None, params=None, cookies=None):
         return data, response, updated_cookies
     except requests.exceptions.RequestException as e:
         logger.error(f"请求失败: {e}")
+        response = getattr(e, "response", None)
+        if response is None:
+            HTTP_REQUEST_SECONDS.observe(time.time() - start_time, status="error")
+        if response is not None:
+            _archive_response(url, params, response.status_code, response.content)
+        # 403/429在上面已经反馈过
+        if response is None or response.status_code not in THROTTLE_STATUS_CODES:
+            _record_outcome(identity, False, reason=type(e).__name__)
         return None, None, cookies
-    except json.JSONDecodeError as e:
+    except JSONDecodeError as e:
         logger.error(f"JSON解析失败: {e}")
+        _archive_response(url, params, response.status_code, body)
+        _record_outcome(identity, False, reason="JSON解析失败")
         return None, None, cookies
 
 
-def process_boss_zhipin_data(json_data, search_term=None, page_number=None):
+def process_boss_zhipin_data(
+    json_data,
+    search_term=None,
+    page_number=None,
+    pipeline=None,
+    on_written=None,
+    refresh=False,
+):
     """
     处理BOSS直聘的JSON数据并存储到数据库
 
@@ -106,9 +214,12 @@ def process_boss_zhipin_data(json_data, search_term=None, page_number=None):
         json_data: 从API获取的原始JSON数据
         search_term: 搜索关键词
         page_number: 页码
+        pipeline: 写入流水线(可选)，指定时只把数据放入写入队列，由写入线程写库
+        on_written: 该页写入成功（或本身没有岗位）后调用的回调(可选)
+        refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化），重放归档时使用
 
     Returns:
-        tuple: (成功计数, 总数)
+        tuple: (成功计数, 总数)，使用写入流水线时成功计数为已放入队列的岗位数
     """
     if not json_data:
         logger.error("无数据返回")
@@ -126,25 +237,37 @@ def process_boss_zhipin_data(json_data, search_term=None, page_number=None):
 
     if not job_list:
         logger.warning("返回的职位列表为空")
+        if on_written is not None:
+            on_written()
         return 0, 0
 
     success_count = 0
     total_count = len(job_list)
 
-    for job in job_list:
-        try:
-            if insert_job_data(job, search_term, page_number):
-                success_count += 1
-            time.sleep(0.1)  # 添加短暂延迟，避免数据库压力过大
-        except Exception as e:
-            logger.error(f"处理职位数据时出错: {e}")
-            logger.error(traceback.format_exc())
+    if pipeline is not None:
+        # 队列已满时在此阻塞，数据库变慢时抓取随之放慢
+        pipeline.submit(job_list, search_term, page_number, on_written, refresh)
+        logger.info(f"已将 {total_count} 条职位数据放入写入队列")
+        return total_count, total_count
 
+    try:
+        # 整页岗位在一个事务中批量写入
+        success_count = get_storage().insert_jobs_batch(
+            job_list, search_term, page_number, refresh
+        )
+    except Exception as e:
+        logger.error(f"处理职位数据时出错: {e}")
+        logger.error(traceback.format_exc())
+
+    if success_count and on_written is not None:
+        on_written()
     logger.info(f"成功处理 {success_count}/{total_count} 条职位数据")
     return success_count, total_count
 
 
-def fetch_all_pages(url, params=None, max_pages=None):
+def fetch_all_pages(
+    url, params=None, max_pages=None, pipeline=None, checkpoint=None, incremental=False
+):
     """
     爬取所有分页数据
 
@@ -152,6 +275,10 @@ def fetch_all_pages(url, params=None, max_pages=None):
         url: 目标URL
         params: 基础请求参数，会被修改用于分页
         max_pages: 最大爬取页数(可选)，默认无限制直到没有更多数据
+        pipeline: 写入流水线(可选)，默认在抓取线程中同步写入
+        checkpoint: 抓取进度记录(可选)，指定时从上次写完的页继续，
+                    并在每页写入后记录进度
+        incremental: 是否启用增量模式，连续多页基本都是已存储的岗位时停止翻页
 
     Returns:
         bool: 操作是否成功
@@ -167,104 +294,202 @@ def fetch_all_pages(url, params=None, max_pages=None):
     # 记录搜索关键词
     search_term = params.get("query")
 
-    cookies = load_cookies()
     current_page = 1
+    key = None
+    if checkpoint is not None:
+        key, start_page = checkpoint.start(url, params)
+        if start_page is None:
+            logger.info(
+                f"{search_term}@{params.get('city')} 已在之前的运行中完成，跳过"
+            )
+            return True
+        if start_page > 1:
+            logger.info(f"从断点继续：上次已完成 {start_page - 1} 页")
+            if max_pages and start_page > max_pages:
+                checkpoint.finish(key, start_page - 1)
+                return True
+        current_page = start_page
+
+    stop_rule = create_stop_rule(incremental)
     total_success = 0
     total_jobs = 0
 
-    while True:
-        logger.info(f"获取第 {current_page} 页数据")
-        params["page"] = current_page
+    # 整个工作项由同一个身份抓取，身份冷却或Cookie过期时才换
+    pool = get_identity_pool()
+    identity = pool.assign()
+    if len(pool) > 1:
+        logger.info(f"{search_term}@{params.get('city')} 分配给身份 {identity.name}")
+    try:
+        while True:
+            logger.info(f"获取第 {current_page} 页数据")
+            params["page"] = current_page
 
-        # 添加时间戳，避免缓存
-        params["_"] = int(time.time() * 1000)
+            # 添加时间戳，避免缓存
+            params["_"] = int(time.time() * 1000)
 
-        success = False
-        retry_count = 0
+            success = False
+            retry_count = 0
 
-        # 重试机制
-        while retry_count < RETRY_TIMES and not success:
-            data, response, cookies = fetch_data(url, params=params, cookies=cookies)
+            # 重试机制，重试间隔由限速器的退避决定
+            while retry_count < RETRY_TIMES and not success:
+                identity.limiter.acquire()
+                data, response, _ = fetch_data(url, params=params, identity=identity)
 
-            if data and data.get("code") == 0 and "zpData" in data:
-                success = True
+                if data and data.get("code") == 0 and "zpData" in data:
+                    success = True
+                    has_more = data.get("zpData", {}).get("hasMore", False)
 
-                # 处理数据
-                page_success, page_total = process_boss_zhipin_data(
-                    data, search_term, current_page
-                )
-                total_success += page_success
-                total_jobs += page_total
-
-                # 检查是否还有更多页
-                has_more = data.get("zpData", {}).get("hasMore", False)
-                if not has_more:
-                    logger.info(f"没有更多数据，爬取完成，共 {current_page} 页")
-                    return True
-            else:
-                retry_count += 1
-                if data:
-                    logger.warning(
-                        f"第 {retry_count} 次重试获取第 {current_page} 页数据，响应码: {data.get('code')}, 消息: {data.get('message', '无错误信息')}"
+                    # 增量模式下在写入之前判断本页岗位是否已经存储
+                    known_page = stop_rule is not None and stop_rule.observe(
+                        data["zpData"].get("jobList") or []
                     )
-                else:
-                    logger.warning(
-                        f"第 {retry_count} 次重试获取第 {current_page} 页数据"
-                    )
-                time.sleep(RETRY_DELAY)
-
-        if not success:
-            logger.error(f"获取第 {current_page} 页失败，达到最大重试次数")
-            return False
-
-        # 检查是否达到最大页数限制
-        if max_pages and current_page >= max_pages:
-            logger.info(f"已达到最大页数限制 {max_pages}，爬取停止")
-            return True
 
-        # 下一页
-        current_page += 1
+                    # 该页写入存储后才记为完成
+                    on_written = None
+                    if key is not None:
+                        on_written = partial(
+                            checkpoint.page_done,
+                            key,
+                            current_page,
+                            has_more,
+                            data["zpData"].get("resCount"),
+                        )
+
+                    # 处理数据
+                    page_success, page_total = process_boss_zhipin_data(
+                        data, search_term, current_page, pipeline, on_written
+                    )
+                    total_success += page_success
+                    total_jobs += page_total
+
+                    # 检查是否还有更多页
+                    if not has_more or known_page:
+                        if has_more:
+                            logger.info(
+                                f"增量模式: 后续分页基本都是已存储的岗位，"
+                                f"在第 {current_page} 页停止翻页"
+                            )
+                        else:
+                            logger.info(
+                                f"没有更多数据，爬取完成，共 {current_page} 页"
+                            )
+                        if key is not None:
+                            checkpoint.finish(key, current_page)
+                        return True
+                else:
+                    retry_count += 1
+                    FETCH_RETRIES.inc()
+                    if data:
+                        logger.warning(
+                            f"第 {retry_count} 次重试获取第 {current_page} 页数据，响应码: {data.get('code')}, 消息: {data.get('message', '无错误信息')}"
+                        )
+                    else:
+                        logger.warning(
+                            f"第 {retry_count} 次重试获取第 {current_page} 页数据"
+                        )
+
+                    # 身份进入冷却或Cookie已过期时换到其他空闲身份继续
+                    expired = identity.cookie_jar.expired_names()
+                    if expired or identity.cooldown_remaining():
+                        other = pool.reassign(identity)
+                        if other is not None:
+                            identity = other
+                            continue
+                    # Cookie已过期时会话基本已经失效，继续重试只会浪费请求
+                    if expired:
+                        logger.error(
+                            f"身份 {identity.name} 的Cookie已过期"
+                            f"（{', '.join(expired)}），停止重试，"
+                            f"请更新 {identity.cookie_jar.path}"
+                        )
+                        break
+
+            if not success:
+                logger.error(f"获取第 {current_page} 页失败，达到最大重试次数")
+                if key is not None:
+                    checkpoint.fail(key)
+                return False
+
+            # 检查是否达到最大页数限制
+            if max_pages and current_page >= max_pages:
+                logger.info(f"已达到最大页数限制 {max_pages}，爬取停止")
+                if key is not None:
+                    checkpoint.finish(key, current_page)
+                return True
+
+            # 下一页，请求间隔由限速器控制
+            current_page += 1
+    finally:
+        pool.release(identity)
+
+
+def scrape_all_targets(max_pages=None, params=None, incremental=False):
+    """
+    爬取所有目标URL并存储数据
 
-        # 添加随机间隔，避免请求频率过高
-        random_sleep_time = random.uniform(5, 10)  # 生成5-10之间的随机数
-        logger.info(f"等待 {random_sleep_time:.2f} 秒后获取下一页数据")
-        time.sleep(random_sleep_time)
+    Args:
+        max_pages: 每个URL最大爬取页数
+        params: 请求参数(可选)，默认使用DEFAULT_PARAMS
+        incremental: 是否启用增量模式
 
-    return True
+    Returns:
+        bool: 操作是否成功
+    """
+    if params is None:
+        params = DEFAULT_PARAMS
+    return scrape_work([(params, max_pages)], incremental)
 
 
-def scrape_all_targets(max_pages=None):
+def scrape_work(work, incremental=False):
     """
-    爬取所有目标URL并存储数据
+    按顺序爬取一组工作，所有工作共享同一个HTTP会话、连接池和写入流水线
+
+    每个工作项的进度记录在抓取进度文件中，已完成的工作项直接跳过，
+    未完成的从上次写完的页继续；全部完成后删除进度文件
 
     Args:
-        max_pages: 每个URL最大爬取页数
+        work: (请求参数, 最大爬取页数)元组列表，每项对每个目标URL各爬取一次
+        incremental: 是否启用增量模式
 
     Returns:
-        bool: 操作是否成功
+        bool: 是否全部成功
     """
     if not TARGET_URLS:
         logger.warning("没有目标URL配置")
         return False
 
+    streams = [
+        (url, params, max_pages) for params, max_pages in work for url in TARGET_URLS
+    ]
     success = True
+    checkpoint = get_checkpoint()
+    pipeline = create_write_pipeline()
 
-    for url in TARGET_URLS:
-        try:
-            # 获取数据
-            fetch_success = fetch_all_pages(url, DEFAULT_PARAMS, max_pages)
-            if not fetch_success:
-                logger.warning(f"从 {url} 获取数据失败")
-                success = False
-                continue
-
-            # 如果有多个URL，适当休眠以避免请求过于频繁
-            if len(TARGET_URLS) > 1:
-                time.sleep(5)  # 休眠5秒
+    try:
+        for index, (url, params, max_pages) in enumerate(streams, 1):
+            if len(streams) > 1:
+                logger.info(
+                    f"[{index}/{len(streams)}] 开始爬取 "
+                    f"{params.get('query')}@{params.get('city')}"
+                )
+            try:
+                # 获取数据
+                fetch_success = fetch_all_pages(
+                    url, params, max_pages, pipeline, checkpoint, incremental
+                )
+                if not fetch_success:
+                    logger.warning(f"从 {url} 获取数据失败")
+                    success = False
 
-        except Exception as e:
-            logger.error(f"处理URL {url} 时发生未预期的错误: {e}")
-            logger.error(traceback.format_exc())
+            except Exception as e:
+                logger.error(f"处理URL {url} 时发生未预期的错误: {e}")
+                logger.error(traceback.format_exc())
+                success = False
+    finally:
+        # 写完队列中剩余的页面并输出吞吐统计
+        if pipeline is not None and pipeline.close()["failed_pages"]:
             success = False
+        # 队列写完后再判断是否全部完成
+        checkpoint.finish_run()
 
     return success
@@ -0,0 +1,701 @@
+"""
+Embedded SQLite storage backend for local crawls, CI benchmarks and analyst laptops.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from loguru import logger
+from config.db_config import TABLE_PREFIX, REQUEST_LOG_RETENTION_DAYS
+from src.database import (
+    DB_WRITE_SECONDS,
+    build_boss_values,
+    build_company_values,
+    build_job_values,
+    build_request_log_row,
+    collect_candidate_jobs,
+    compute_job_fingerprint,
+    parse_salary,
+    record_job_outcomes,
+    record_rows_written,
+)
+from src.dictionary import value_hash
+from src.storage import StorageBackend
+
+# 多对多子表定义：(表名, 值字段, 岗位数据中的字段, 附加条件字段及值)
+SQLITE_CHILD_TABLES = [
+    ("job_labels", "label", "jobLabels", None),
+    ("job_skills", "skill", "skills", None),
+    ("job_icon_flags", "icon_flag", "iconFlagList", None),
+    ("company_welfare", "welfare", "welfareList", None),
+    ("name_icons", "icon_url", "beforeNameIcons", ("position", "before")),
+    ("name_icons", "icon_url", "afterNameIcons", ("position", "after")),
+]
+
+# 分析查询索引：(表名, 索引名, 索引字段)
+SQLITE_ANALYTICS_INDEXES = [
+    ("jobs", "idx_search_city", "search_term, city_code"),
+    ("jobs", "idx_created_at", "created_at"),
+    ("jobs", "idx_salary", "salary_min, salary_max"),
+    ("job_company_recruiter", "idx_brand_created", "brand_id, created_at"),
+]
+
+# 每条查询中IN列表的最大参数数
+SQLITE_CHUNK_SIZE = 500
+
+SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL UNIQUE,
+    job_name TEXT NOT NULL,
+    salary_desc TEXT,
+    job_experience TEXT,
+    job_degree TEXT,
+    city_name TEXT,
+    city_code TEXT,
+    area_district TEXT,
+    business_district TEXT,
+    lid TEXT,
+    item_id INTEGER,
+    security_id TEXT,
+    job_type INTEGER DEFAULT 0,
+    proxy_job INTEGER DEFAULT 0,
+    anonymous INTEGER DEFAULT 0,
+    outland INTEGER DEFAULT 0,
+    longitude REAL,
+    latitude REAL,
+    is_shield INTEGER DEFAULT 0,
+    show_top_position INTEGER DEFAULT 0,
+    ats_direct_post INTEGER DEFAULT 0,
+    days_per_week_desc TEXT,
+    least_month_desc TEXT,
+    optimal INTEGER DEFAULT 0,
+    search_term TEXT,
+    page_number INTEGER,
+    content_hash TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}recruiters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    boss_id TEXT NOT NULL UNIQUE,
+    boss_name TEXT,
+    boss_title TEXT,
+    boss_avatar TEXT,
+    boss_cert INTEGER DEFAULT 0,
+    gold_hunter INTEGER DEFAULT 0,
+    boss_online INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}companies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    brand_id TEXT UNIQUE,
+    brand_name TEXT NOT NULL,
+    brand_logo TEXT,
+    brand_stage_name TEXT,
+    brand_industry TEXT,
+    industry_code INTEGER,
+    brand_scale_name TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_company_recruiter (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL UNIQUE,
+    brand_id TEXT,
+    boss_id TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_labels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (job_id, label)
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_skills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (job_id, skill)
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}job_icon_flags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    icon_flag INTEGER NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (job_id, icon_flag)
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}company_welfare (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    welfare TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (job_id, welfare)
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}name_icons (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    icon_url TEXT NOT NULL,
+    position TEXT NOT NULL CHECK (position IN ('before', 'after')),
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (job_id, position, icon_url)
+);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}request_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    query TEXT,
+    city TEXT,
+    page INTEGER,
+    status_code INTEGER,
+    response_time REAL,
+    total_results INTEGER,
+    has_more INTEGER,
+    cookie_set_id INTEGER,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_{TABLE_PREFIX}request_logs_created_response
+ON {TABLE_PREFIX}request_logs (created_at, response_time);
+
+CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}dict_cookie_sets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cookies TEXT NOT NULL,
+    value_hash TEXT NOT NULL UNIQUE,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    嵌入式SQLite存储后端
+
+    表结构与MySQL后端的逻辑结构一致，去重与刷新语义与insert_jobs_batch相同。
+    标签、技能、福利与图标子表直接存储字符串，不使用MySQL后端的字典编码
+    （Cookie集合仍按字典存储）。使用WAL日志和单连接批量事务，
+    所有写入通过executemany完成
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self):
+        """获取（首次调用时打开）数据库连接"""
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # isolation_level=None表示由代码显式控制事务
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn = conn
+            logger.info(f"已打开SQLite数据库: {self.path}")
+        return self._conn
+
+    def create_tables(self):
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                try:
+                    current = conn.execute(
+                        f"SELECT MAX(version) FROM {TABLE_PREFIX}schema_version"
+                    ).fetchone()[0] or 0
+                except sqlite3.OperationalError:
+                    # 版本表不存在
+                    current = 0
+                if current >= SQLITE_MIGRATIONS[-1][0]:
+                    return True
+
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {TABLE_PREFIX}schema_version ("
+                    f"version INTEGER PRIMARY KEY, description TEXT, "
+                    f"applied_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+                )
+                for version, description, migrate in SQLITE_MIGRATIONS:
+                    if version <= current:
+                        continue
+                    logger.info(f"正在应用数据库迁移 {version}: {description}")
+                    migrate(self, conn)
+                    conn.execute(
+                        f"INSERT INTO {TABLE_PREFIX}schema_version "
+                        f"(version, description) VALUES (?, ?)",
+                        (version, description),
+                    )
+            logger.info("数据表创建成功或已存在")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"创建表时出错: {e}")
+            return False
+
+    def _create_base_schema(self, conn):
+        """迁移1：创建基础表结构，并迁移旧版本的请求记录表"""
+        legacy_request_logs = self._rename_legacy_request_logs(conn)
+        conn.executescript(SQLITE_SCHEMA)
+        if legacy_request_logs:
+            self._migrate_request_logs(conn)
+
+    def _add_analytics_indexes(self, conn):
+        """迁移2：添加薪资字段与分析查询索引，并回填已有岗位的薪资范围"""
+        columns = [
+            row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_PREFIX}jobs)")
+        ]
+        for column in ("salary_min", "salary_max"):
+            if column not in columns:
+                conn.execute(
+                    f"ALTER TABLE {TABLE_PREFIX}jobs ADD COLUMN {column} INTEGER"
+                )
+        for table, index_name, index_columns in SQLITE_ANALYTICS_INDEXES:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {TABLE_PREFIX}{index_name} "
+                f"ON {TABLE_PREFIX}{table} ({index_columns})"
+            )
+
+        updates = []
+        for job_id, salary_desc in conn.execute(
+            f"SELECT job_id, salary_desc FROM {TABLE_PREFIX}jobs "
+            f"WHERE salary_desc IS NOT NULL AND salary_min IS NULL"
+        ).fetchall():
+            salary_min, salary_max = parse_salary(salary_desc)
+            if salary_min is not None:
+                updates.append((salary_min, salary_max, job_id))
+        if updates:
+            conn.execute("BEGIN")
+            conn.executemany(
+                f"UPDATE {TABLE_PREFIX}jobs SET salary_min = ?, salary_max = ? "
+                f"WHERE job_id = ?",
+                updates,
+            )
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _rename_legacy_request_logs(conn):
+        """旧版本的请求记录表（params、cookies整段JSON存储）重命名为request_logs_legacy"""
+        columns = [
+            row[1]
+            for row in conn.execute(f"PRAGMA table_info({TABLE_PREFIX}request_logs)")
+        ]
+        if "params" not in columns:
+            return False
+        conn.execute(
+            f"ALTER TABLE {TABLE_PREFIX}request_logs "
+            f"RENAME TO {TABLE_PREFIX}request_logs_legacy"
+        )
+        return True
+
+    @staticmethod
+    def _migrate_request_logs(conn):
+        """将旧请求记录表的数据迁移到新表，Cookie写入字典表，参数拆分为独立字段"""
+        legacy = f"{TABLE_PREFIX}request_logs_legacy"
+        logger.info(f"正在将表 {legacy} 迁移为紧凑的请求日志存储...")
+        # 注册与字典模块一致的MD5函数，迁移语句与MySQL后端保持一致
+        conn.create_function("md5", 1, value_hash, deterministic=True)
+        conn.execute("BEGIN")
+        conn.execute(
+            f"""
+            INSERT INTO {TABLE_PREFIX}dict_cookie_sets (cookies, value_hash)
+            SELECT MIN(cookies), md5(cookies) FROM {legacy}
+            WHERE cookies IS NOT NULL
+            GROUP BY md5(cookies)
+            ON CONFLICT DO NOTHING
+            """
+        )
+        cursor = conn.execute(
+            f"""
+            INSERT INTO {TABLE_PREFIX}request_logs
+            (url, query, city, page, status_code, response_time, total_results,
+             has_more, cookie_set_id, created_at)
+            SELECT t.url,
+                   json_extract(t.params, '$.query'),
+                   json_extract(t.params, '$.city'),
+                   json_extract(t.params, '$.page'),
+                   t.status_code, t.response_time, t.total_results, t.has_more,
+                   d.id, COALESCE(t.created_at, CURRENT_TIMESTAMP)
+            FROM {legacy} t
+            LEFT JOIN {TABLE_PREFIX}dict_cookie_sets d
+            ON d.value_hash = md5(t.cookies)
+            """
+        )
+        conn.execute("COMMIT")
+        logger.info(f"已迁移 {cursor.rowcount} 条请求日志")
+
+    @staticmethod
+    def _resolve_cookie_sets(cursor, cookie_values):
+        """批量将Cookie JSON解析为字典ID，不存在的插入字典表"""
+        hashes = {value_hash(value): value for value in cookie_values}
+        if not hashes:
+            return {}
+        cursor.executemany(
+            f"INSERT INTO {TABLE_PREFIX}dict_cookie_sets (cookies, value_hash) "
+            f"VALUES (?, ?) ON CONFLICT DO NOTHING",
+            [(value, h) for h, value in hashes.items()],
+        )
+        hash_list = list(hashes)
+        ids = {}
+        for i in range(0, len(hash_list), SQLITE_CHUNK_SIZE):
+            chunk = hash_list[i : i + SQLITE_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT value_hash, id FROM {TABLE_PREFIX}dict_cookie_sets "
+                f"WHERE value_hash IN ({', '.join(['?'] * len(chunk))})",
+                chunk,
+            )
+            for h, dict_id in cursor.fetchall():
+                ids[hashes[h]] = dict_id
+        return ids
+
+    @staticmethod
+    def _upsert_rows(cursor, table, rows, key_column, written, keep_columns=()):
+        """
+        按字段集合分组，使用INSERT ... ON CONFLICT DO UPDATE批量写入，
+        写入行数累加到written，提交后再计入指标
+        """
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+        written[table] = written.get(table, 0) + len(rows)
+        with DB_WRITE_SECONDS.time(table=table):
+            for columns, values in groups.items():
+                updates = [
+                    f"{c}=excluded.{c}"
+                    for c in columns
+                    if c != key_column and c not in keep_columns
+                ]
+                if table != "job_company_recruiter":
+                    updates.append("updated_at=CURRENT_TIMESTAMP")
+                cursor.executemany(
+                    f"INSERT INTO {TABLE_PREFIX}{table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['?'] * len(columns))}) "
+                    f"ON CONFLICT({key_column}) DO UPDATE SET {', '.join(updates)}",
+                    values,
+                )
+
+    @staticmethod
+    def _fetch_stored_hashes(cursor, job_ids):
+        """分块查询已存在岗位的内容指纹"""
+        stored = {}
+        for i in range(0, len(job_ids), SQLITE_CHUNK_SIZE):
+            chunk = job_ids[i : i + SQLITE_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT job_id, content_hash FROM {TABLE_PREFIX}jobs "
+                f"WHERE job_id IN ({', '.join(['?'] * len(chunk))})",
+                chunk,
+            )
+            stored.update(cursor.fetchall())
+        return stored
+
+    @staticmethod
+    def _sync_child_tables(cursor, jobs, written):
+        """
+        按差异同步多对多子表，只插入新增的值、只删除已移除的值，
+        新数据中缺少或为空的列表会删除该岗位已存储的行，写入行数累加到written
+        """
+        for table, value_column, source_key, extra in SQLITE_CHILD_TABLES:
+            extra_condition = f" AND {extra[0]} = ?" if extra else ""
+            extra_params = (extra[1],) if extra else ()
+
+            desired = {
+                job["encryptJobId"]: list(dict.fromkeys(job.get(source_key) or ()))
+                for job in jobs
+            }
+            if not desired:
+                continue
+
+            job_ids = list(desired.keys())
+            stored = {}
+            for i in range(0, len(job_ids), SQLITE_CHUNK_SIZE):
+                chunk = job_ids[i : i + SQLITE_CHUNK_SIZE]
+                cursor.execute(
+                    f"SELECT job_id, {value_column} FROM {TABLE_PREFIX}{table} "
+                    f"WHERE job_id IN ({', '.join(['?'] * len(chunk))})"
+                    f"{extra_condition}",
+                    tuple(chunk) + extra_params,
+                )
+                for job_id, value in cursor.fetchall():
+                    stored.setdefault(job_id, set()).add(value)
+
+            to_delete = []
+            to_insert = []
+            for job_id, values in desired.items():
+                current = stored.get(job_id, set())
+                to_delete.extend(
+                    (job_id, value) + extra_params for value in current - set(values)
+                )
+                to_insert.extend(
+                    (job_id, value) + extra_params
+                    for value in values
+                    if value not in current
+                )
+
+            if not to_delete and not to_insert:
+                continue
+            written[table] = (
+                written.get(table, 0) + len(to_delete) + len(to_insert)
+            )
+            with DB_WRITE_SECONDS.time(table=table):
+                if to_delete:
+                    cursor.executemany(
+                        f"DELETE FROM {TABLE_PREFIX}{table} "
+                        f"WHERE job_id = ? AND {value_column} = ?{extra_condition}",
+                        to_delete,
+                    )
+                if to_insert:
+                    columns = ["job_id", value_column] + (
+                        [extra[0]] if extra else []
+                    )
+                    cursor.executemany(
+                        f"INSERT INTO {TABLE_PREFIX}{table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(['?'] * len(columns))}) "
+                        f"ON CONFLICT DO NOTHING",
+                        to_insert,
+                    )
+
+    def _write_candidates(self, cursor, candidates, refresh=False):
+        """
+        写入去重后的候选岗位，已存在且内容指纹未变化的岗位跳过
+
+        Args:
+            cursor: 数据库游标（处于事务中）
+            candidates: job_id -> (岗位数据, 搜索关键词, 页码)
+            refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
+
+        Returns:
+            dict: 包含inserted、refreshed、unchanged的统计，以及各表写入行数written
+        """
+        stored_hashes = self._fetch_stored_hashes(cursor, list(candidates.keys()))
+        written = {}
+        stats = {"inserted": 0, "refreshed": 0, "unchanged": 0, "written": written}
+        to_write = []
+        for job_id, candidate in candidates.items():
+            if job_id not in stored_hashes:
+                stats["inserted"] += 1
+            elif refresh or stored_hashes[job_id] != compute_job_fingerprint(
+                candidate[0]
+            ):
+                stats["refreshed"] += 1
+            else:
+                stats["unchanged"] += 1
+                continue
+            to_write.append(candidate)
+
+        if not to_write:
+            return stats
+
+        bosses = {}
+        companies = {}
+        for job, _, _ in to_write:
+            boss_values = build_boss_values(job)
+            if boss_values:
+                bosses[boss_values["boss_id"]] = boss_values
+            company_values = build_company_values(job)
+            if company_values:
+                companies[company_values["brand_id"]] = company_values
+
+        if bosses:
+            self._upsert_rows(
+                cursor, "recruiters", list(bosses.values()), "boss_id", written
+            )
+        if companies:
+            self._upsert_rows(
+                cursor, "companies", list(companies.values()), "brand_id", written
+            )
+        self._upsert_rows(
+            cursor,
+            "jobs",
+            [build_job_values(job, term, page) for job, term, page in to_write],
+            "job_id",
+            written,
+            keep_columns=("search_term", "page_number"),
+        )
+        self._upsert_rows(
+            cursor,
+            "job_company_recruiter",
+            [
+                {
+                    "job_id": job["encryptJobId"],
+                    "brand_id": job.get("encryptBrandId"),
+                    "boss_id": job.get("encryptBossId"),
+                }
+                for job, _, _ in to_write
+            ],
+            "job_id",
+            written,
+        )
+        self._sync_child_tables(cursor, [job for job, _, _ in to_write], written)
+        return stats
+
+    def _write_in_transaction(self, candidates, refresh=False):
+        """在一个事务中写入候选岗位，失败时回滚并返回None"""
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN")
+                stats = self._write_candidates(cursor, candidates, refresh)
+                cursor.execute("COMMIT")
+                record_rows_written(stats.pop("written"))
+                record_job_outcomes(
+                    stats["inserted"], stats["refreshed"], stats["unchanged"]
+                )
+                return stats
+            except sqlite3.Error as e:
+                logger.error(f"写入SQLite时出错: {e}")
+                if conn.in_transaction:
+                    conn.rollback()
+                return None
+            finally:
+                cursor.close()
+
+    def insert_jobs_batch(
+        self, job_list, search_term=None, page_number=None, refresh=False
+    ):
+        return self.insert_pages_batch([(job_list, search_term, page_number)], refresh)
+
+    def insert_pages_batch(self, pages, refresh=False):
+        candidates = collect_candidate_jobs(pages)
+        if not candidates:
+            return 0
+
+        stats = self._write_in_transaction(candidates, refresh)
+        if stats is None:
+            return 0
+        if stats["unchanged"]:
+            logger.info(f"{stats['unchanged']} 个岗位已存在且内容未变化，跳过处理")
+        logger.info(
+            f"成功批量写入 {stats['inserted'] + stats['refreshed']} 条岗位数据"
+        )
+        return len(candidates)
+
+    def bulk_load_pages(self, pages):
+        candidates = collect_candidate_jobs(pages)
+        start = time.perf_counter()
+        if candidates:
+            stats = self._write_in_transaction(candidates)
+        else:
+            stats = {"inserted": 0, "refreshed": 0, "unchanged": 0}
+        if stats is None:
+            return None
+
+        elapsed = time.perf_counter() - start
+        written = stats["inserted"] + stats["refreshed"]
+        rate = written / elapsed if elapsed > 0 else float(written)
+        logger.info(
+            f"SQLite批量写入 {written} 个岗位, 耗时 {elapsed:.2f} 秒, {rate:.0f} 个/秒"
+        )
+        stats["candidates"] = len(candidates)
+        stats["tables"] = {
+            "jobs": {
+                "rows": written,
+                "load_seconds": 0.0,
+                "merge_seconds": elapsed,
+                "rows_per_second": rate,
+            }
+        }
+        return stats
+
+    def get_known_job_ids(self, job_ids):
+        job_ids = list(dict.fromkeys(job_id for job_id in job_ids if job_id))
+        if not job_ids:
+            return set()
+        try:
+            with self._lock:
+                cursor = self._get_conn().cursor()
+                try:
+                    return set(self._fetch_stored_hashes(cursor, job_ids))
+                finally:
+                    cursor.close()
+        except sqlite3.Error as e:
+            logger.error(f"查询已存储岗位时出错: {e}")
+            return None
+
+    def insert_request_log(
+        self, url, params, status_code, response_time, total_results, has_more, cookies
+    ):
+        row = build_request_log_row(
+            url, params, status_code, response_time, total_results, has_more, cookies
+        )
+        return self.insert_request_logs_batch([row]) == 1
+
+    def insert_request_logs_batch(self, rows):
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN")
+                cookie_ids = self._resolve_cookie_sets(
+                    cursor, [row[-1] for row in rows if row[-1] is not None]
+                )
+                with DB_WRITE_SECONDS.time(table="request_logs"):
+                    cursor.executemany(
+                        f"""
+                        INSERT INTO {TABLE_PREFIX}request_logs
+                        (url, query, city, page, status_code, response_time,
+                         total_results, has_more, cookie_set_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [
+                            row[:-1]
+                            + (cookie_ids.get(row[-1]) if row[-1] else None,)
+                            for row in rows
+                        ],
+                    )
+                cursor.execute("COMMIT")
+                record_rows_written({"request_logs": len(rows)})
+                return len(rows)
+            except sqlite3.Error as e:
+                logger.error(f"记录API请求日志时出错: {e}")
+                if conn.in_transaction:
+                    conn.rollback()
+                return 0
+            finally:
+                cursor.close()
+
+    def prune_request_logs(self, retention_days=None):
+        if retention_days is None:
+            retention_days = REQUEST_LOG_RETENTION_DAYS
+        try:
+            with self._lock:
+                cursor = self._get_conn().execute(
+                    f"DELETE FROM {TABLE_PREFIX}request_logs "
+                    f"WHERE created_at < date('now', ?)",
+                    (f"-{retention_days} days",),
+                )
+            logger.info(f"已删除 {cursor.rowcount} 条超过 {retention_days} 天的请求日志")
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"清理请求日志时出错: {e}")
+            return None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 有序的迁移列表：(版本号, 说明, 迁移方法)，与MySQL后端的src/migrations.py对应
+SQLITE_MIGRATIONS = [
+    (1, "基础表结构", SQLiteStorage._create_base_schema),
+    (2, "薪资字段与分析查询索引", SQLiteStorage._add_analytics_indexes),
+]
@@ -0,0 +1,209 @@
+"""
+Storage backend module: a common interface over the MySQL and embedded SQLite storage.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from loguru import logger
+from config.db_config import STORAGE_BACKEND, SQLITE_PATH
+from src import database
+from src.bulk_load import bulk_load_pages
+from src.db_pool import close_pool
+
+
+class StorageBackend(ABC):
+    """
+    存储后端接口
+
+    爬虫、JSON导入和主程序只通过该接口读写数据，具体实现由配置STORAGE_BACKEND选择。
+    除close外的方法都是抽象方法，缺少实现的后端在创建时即报错
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_tables(self):
+        """
+        创建数据表（如果不存在）
+
+        Returns:
+            bool: 操作是否成功
+        """
+
+    @abstractmethod
+    def insert_jobs_batch(
+        self, job_list, search_term=None, page_number=None, refresh=False
+    ):
+        """
+        在一个事务中批量写入一整页岗位数据
+
+        Args:
+            job_list: 岗位数据字典列表（API返回的jobList）
+            search_term: 搜索关键词
+            page_number: 页码
+            refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
+
+        Returns:
+            int: 成功处理的岗位数（包括内容未变化而跳过的岗位）
+        """
+
+    @abstractmethod
+    def insert_pages_batch(self, pages, refresh=False):
+        """
+        在一个事务中批量写入多页岗位数据，去重与刷新语义与逐页调用insert_jobs_batch一致
+
+        Args:
+            pages: 可迭代的(job_list, search_term, page_number)元组
+            refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
+
+        Returns:
+            int: 成功处理的岗位数（包括内容未变化而跳过的岗位）
+        """
+
+    @abstractmethod
+    def bulk_load_pages(self, pages):
+        """
+        一次性批量导入大量页面的岗位数据
+
+        Args:
+            pages: 可迭代的(job_list, search_term, page_number)元组
+
+        Returns:
+            dict: 导入统计，包含candidates、inserted、refreshed、unchanged和tables，
+                  失败时返回None
+        """
+
+    @abstractmethod
+    def get_known_job_ids(self, job_ids):
+        """
+        一次查询判断哪些岗位ID已经存储
+
+        Args:
+            job_ids: 岗位ID（encryptJobId）列表
+
+        Returns:
+            set: 已存储的岗位ID集合，失败时返回None
+        """
+
+    @abstractmethod
+    def insert_request_log(
+        self, url, params, status_code, response_time, total_results, has_more, cookies
+    ):
+        """
+        记录API请求日志
+
+        Returns:
+            bool: 操作是否成功
+        """
+
+    @abstractmethod
+    def insert_request_logs_batch(self, rows):
+        """
+        在一个事务中批量写入API请求日志
+
+        Args:
+            rows: database.build_request_log_row生成的行列表
+
+        Returns:
+            int: 写入的日志条数，失败时返回0
+        """
+
+    @abstractmethod
+    def prune_request_logs(self, retention_days=None):
+        """
+        删除超过保留天数的请求日志
+
+        Args:
+            retention_days: 保留天数，默认使用配置REQUEST_LOG_RETENTION_DAYS
+
+        Returns:
+            int: 删除的分区数（MySQL）或行数（SQLite），失败时返回None
+        """
+
+    def close(self):
+        """释放后端占用的连接等资源"""
+
+
+class MySQLStorage(StorageBackend):
+    """MySQL存储后端，直接复用src.database和src.bulk_load中的实现"""
+
+    name = "mysql"
+
+    def create_tables(self):
+        return database.create_tables()
+
+    def insert_jobs_batch(
+        self, job_list, search_term=None, page_number=None, refresh=False
+    ):
+        return database.insert_jobs_batch(
+            job_list, search_term, page_number, refresh
+        )
+
+    def insert_pages_batch(self, pages, refresh=False):
+        return database.insert_pages_batch(pages, refresh)
+
+    def bulk_load_pages(self, pages):
+        return bulk_load_pages(pages)
+
+    def get_known_job_ids(self, job_ids):
+        return database.get_known_job_ids(job_ids)
+
+    def insert_request_log(
+        self, url, params, status_code, response_time, total_results, has_more, cookies
+    ):
+        return database.insert_request_log(
+            url, params, status_code, response_time, total_results, has_more, cookies
+        )
+
+    def insert_request_logs_batch(self, rows):
+        return database.insert_request_logs_batch(rows)
+
+    def prune_request_logs(self, retention_days=None):
+        return database.prune_request_logs(retention_days)
+
+    def close(self):
+        close_pool()
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend=None):
+    """
+    按名称创建存储后端
+
+    Args:
+        backend: 后端名称（mysql或sqlite），默认使用配置STORAGE_BACKEND
+
+    Returns:
+        StorageBackend: 存储后端对象
+
+    Raises:
+        ValueError: 后端名称无效
+    """
+    backend = (backend or STORAGE_BACKEND).lower()
+    if backend == "mysql":
+        return MySQLStorage()
+    if backend == "sqlite":
+        # SQLite后端继承自本模块的StorageBackend，在此处导入以避免循环引用
+        from src.sqlite_storage import SQLiteStorage
+
+        return SQLiteStorage(SQLITE_PATH)
+    raise ValueError(f"不支持的存储后端: {backend}")
+
+
+def get_storage():
+    """
+    获取进程级共享的存储后端，首次调用时按配置创建
+
+    Returns:
+        StorageBackend: 存储后端对象
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+                logger.info(f"使用存储后端: {_storage.name}")
+    return _storage
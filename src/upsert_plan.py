@@ -0,0 +1,207 @@
+"""
+Upsert plan module: compiled INSERT ... ON DUPLICATE KEY UPDATE statements run through prepared cursors.
+"""
+
+import atexit
+import threading
+import weakref
+from loguru import logger
+from config.db_config import TABLE_PREFIX
+from src.metrics import counter
+
+# 单条语句最多写入的行数，语句形状（行数）因此有上限
+PLAN_MAX_ROWS = 50
+
+PLAN_LOOKUPS = counter(
+    "boss_upsert_plan_lookups_total",
+    "upsert计划的查找次数，result为hit（复用已编译的计划）或miss（首次编译）",
+    ("table", "result"),
+)
+PLAN_PREPARES = counter(
+    "boss_upsert_plan_prepares_total",
+    "upsert语句在服务端解析（创建预处理语句）的次数",
+    ("table",),
+)
+PLAN_EXECUTIONS = counter(
+    "boss_upsert_plan_executions_total", "upsert语句的执行次数", ("table",)
+)
+
+
+def update_assignments(
+    columns, key_column, keep_columns=(), preserve_existing=False, target=None
+):
+    """
+    生成ON DUPLICATE KEY UPDATE子句中的赋值表达式
+
+    Args:
+        columns: 写入的字段名列表
+        key_column: 唯一键字段，不参与UPDATE
+        keep_columns: 记录已存在时保留原值、不参与UPDATE的字段
+        preserve_existing: 值为None的字段是否保留已有数据（COALESCE）
+        target: 限定字段所属的表名(可选)，INSERT ... SELECT中需要以免字段名歧义
+
+    Returns:
+        list: 赋值表达式列表
+    """
+    assignments = []
+    for c in columns:
+        if c == key_column or c in keep_columns:
+            continue
+        column = f"{target}.{c}" if target else c
+        if preserve_existing:
+            assignments.append(f"{column}=COALESCE(VALUES({c}), {column})")
+        else:
+            assignments.append(f"{column}=VALUES({c})")
+    return assignments
+
+
+class UpsertPlan:
+    """
+    编译好的批量upsert语句
+
+    同一(表, 字段集合)只编译一次字段列表、占位符和UPDATE子句，不同行数的语句文本
+    也只生成一次。语句通过预处理游标执行，每条连接上每种语句只在服务端解析一次
+
+    preserve_existing为True时，UPDATE子句使用COALESCE(VALUES(c), c)，
+    值为None的字段不会覆盖已有数据，调用方因此可以固定字段集合
+    """
+
+    def __init__(self, table, columns, key_column, keep_columns, preserve_existing):
+        self.table = table
+        self.columns = columns
+        self._row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        self._prefix = (
+            f"INSERT INTO {TABLE_PREFIX}{table} ({', '.join(columns)}) VALUES "
+        )
+        self._suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(
+            update_assignments(columns, key_column, keep_columns, preserve_existing)
+        )
+        self._statements = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "prepares": 0, "executions": 0}
+
+    def statement(self, row_count):
+        """
+        获取写入row_count行的语句文本，同一行数总是返回同一个字符串对象
+
+        预处理游标按对象身份判断语句是否需要重新解析，因此不能每次重新拼接
+        """
+        sql = self._statements.get(row_count)
+        if sql is None:
+            with self._lock:
+                sql = self._statements.setdefault(
+                    row_count,
+                    self._prefix
+                    + ", ".join([self._row_placeholder] * row_count)
+                    + self._suffix,
+                )
+        return sql
+
+    def execute(self, conn, rows):
+        """
+        按计划批量写入
+
+        Args:
+            conn: 数据库连接（与调用方的其他写入处于同一事务）
+            rows: 与计划字段顺序一致的值元组列表
+        """
+        for i in range(0, len(rows), PLAN_MAX_ROWS):
+            chunk = rows[i : i + PLAN_MAX_ROWS]
+            sql = self.statement(len(chunk))
+            cursor, prepared = _get_prepared_cursor(conn, sql)
+            cursor.execute(sql, tuple(v for row in chunk for v in row))
+            with self._lock:
+                self.stats["executions"] += 1
+                if prepared:
+                    self.stats["prepares"] += 1
+            PLAN_EXECUTIONS.inc(table=self.table)
+            if prepared:
+                PLAN_PREPARES.inc(table=self.table)
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+# 每条底层连接上的预处理游标：连接 -> (连接ID, {语句文本: 游标})
+_prepared_cursors = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+def _get_prepared_cursor(conn, sql):
+    """
+    获取连接上执行sql的预处理游标，没有则创建
+
+    连接自动重连后服务端的预处理语句已失效，按连接ID判断并丢弃旧游标
+
+    Returns:
+        tuple: (游标, 是否为新建游标，即本次需要在服务端解析语句)
+    """
+    raw = getattr(conn, "raw_connection", conn)
+    connection_id = raw.connection_id
+    with _prepared_lock:
+        entry = _prepared_cursors.get(raw)
+        if entry is None or entry[0] != connection_id:
+            entry = (connection_id, {})
+            _prepared_cursors[raw] = entry
+        cursor = entry[1].get(sql)
+        if cursor is not None:
+            return cursor, False
+
+    cursor = raw.cursor(prepared=True)
+    with _prepared_lock:
+        entry[1][sql] = cursor
+    return cursor, True
+
+
+def get_plan(table, columns, key_column, keep_columns=(), preserve_existing=False):
+    """
+    获取(表, 字段集合)对应的upsert计划，首次使用时编译
+
+    Args:
+        table: 不带前缀的表名
+        columns: 字段名元组（决定值元组的顺序）
+        key_column: 唯一键字段，不参与UPDATE
+        keep_columns: 记录已存在时保留原值、不参与UPDATE的字段
+        preserve_existing: 值为None的字段是否保留已有数据
+
+    Returns:
+        UpsertPlan: upsert计划
+    """
+    key = (table, tuple(columns), key_column, tuple(keep_columns), preserve_existing)
+    with _plans_lock:
+        plan = _plans.get(key)
+        hit = plan is not None
+        if not hit:
+            plan = UpsertPlan(*key)
+            _plans[key] = plan
+        plan.stats["hits" if hit else "misses"] += 1
+    PLAN_LOOKUPS.inc(table=table, result="hit" if hit else "miss")
+    return plan
+
+
+def get_plan_stats():
+    """
+    获取所有upsert计划的统计信息
+
+    Returns:
+        list: 每个计划一项，包含table、columns以及计划命中/未命中、
+              服务端解析次数和执行次数
+    """
+    with _plans_lock:
+        plans = list(_plans.values())
+    return [
+        {"table": plan.table, "columns": plan.columns, **plan.stats} for plan in plans
+    ]
+
+
+def log_plan_stats():
+    """将upsert计划的命中统计输出到日志"""
+    for stats in get_plan_stats():
+        logger.info(
+            f"upsert计划 {stats['table']}（{len(stats['columns'])} 个字段）: "
+            f"命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+            f"服务端解析 {stats['prepares']} 次, 执行 {stats['executions']} 次"
+        )
+
+
+atexit.register(log_plan_stats)
@@ -2,12 +2,11 @@
 Utility functions for the web scraper project.
 """
 
-import json
 import os
-import time
 from datetime import datetime
 from loguru import logger
-from config.settings import COOKIE_FILE, COOKIE_EXPIRY_MARGIN
+from src.cookie_jar import get_cookie_jar
+from src.json_codec import dumps, load_file
 
 
 # 配置loguru
@@ -56,8 +55,8 @@ def save_to_json(data, filename):
         # 确保目录存在
         os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        with open(filename, "wb") as f:
+            f.write(dumps(data, indent=True))
 
         logger.info(f"数据已保存至 {filename}")
         return True
@@ -77,8 +76,7 @@ def load_from_json(filename):
         data: 加载的数据，错误时返回None
     """
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_file(filename)
 
         logger.info(f"从 {filename} 加载了数据")
         return data
@@ -97,41 +95,19 @@ def get_timestamp():
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
-def handle_rate_limit(retry_after=None):
-    """
-    处理API速率限制，如果需要则休眠
-
-    Args:
-        retry_after: 头部中的重试时间(秒)，如果没有则使用默认值
-
-    Returns:
-        None
-    """
-    # 默认休眠60秒，除非指定了其他时间
-    sleep_time = retry_after if retry_after else 60
-    logger.warning(f"遇到速率限制，将休眠 {sleep_time} 秒")
-    time.sleep(sleep_time)
-
-
 def load_cookies():
     """
-    从文件加载Cookie
+    获取当前有效的Cookie（来自内存中的Cookie容器，首次使用时从文件加载）
 
     Returns:
-        dict: Cookie字典，如果文件不存在返回空字典
+        dict: Cookie字典，没有Cookie时返回空字典
     """
-    if os.path.exists(COOKIE_FILE):
-        cookies = load_from_json(COOKIE_FILE)
-        if cookies:
-            logger.info("已加载Cookie")
-            return cookies
-    logger.info("没有找到Cookie文件或文件为空")
-    return {}
+    return get_cookie_jar().get_cookies()
 
 
 def save_cookies(cookies):
     """
-    将Cookie保存到文件
+    用给定的Cookie替换当前Cookie并立即写回文件
 
     Args:
         cookies: Cookie字典
@@ -139,50 +115,28 @@ def save_cookies(cookies):
     Returns:
         bool: 操作是否成功
     """
-    return save_to_json(cookies, COOKIE_FILE)
+    return get_cookie_jar().replace(cookies)
 
 
-def update_cookies_from_response(response, current_cookies=None):
+def update_cookies_from_response(response, current_cookies=None, jar=None):
     """
     从响应中更新Cookie
 
+    Set-Cookie的Expires/Max-Age会被记录，Cookie有变化时由Cookie容器按写回间隔写回文件
+
     Args:
         response: 请求响应对象
-        current_cookies: 当前的Cookie字典，如果为None则从文件加载
+        current_cookies: 当前的Cookie字典，如果为None则使用Cookie容器中的Cookie
+        jar: Cookie容器(可选)，默认使用COOKIE_FILE对应的共享容器
 
     Returns:
         dict: 更新后的Cookie字典
     """
+    jar = jar or get_cookie_jar()
+    jar.update_from_response(response)
     if current_cookies is None:
-        current_cookies = load_cookies() or {}
-
-    if "set-cookie" in response.headers:
-        # requests库使用getlist或get_all获取所有同名header
-        try:
-            # 尝试使用getlist方法（requests库新版本）
-            raw_cookies = response.headers.getlist("set-cookie")
-        except AttributeError:
-            # 如果getlist不存在，尝试获取单个值
-            set_cookie = response.headers.get("set-cookie")
-            if set_cookie:
-                raw_cookies = [set_cookie]
-            else:
-                raw_cookies = []
-                logger.warning("无法从响应中获取set-cookie头")
-
-        for cookie_str in raw_cookies:
-            try:
-                # 简单解析set-cookie字符串
-                parts = cookie_str.split(";")[0].strip().split("=", 1)
-                if len(parts) == 2:
-                    name, value = parts
-                    current_cookies[name] = value
-                    logger.debug(f"已更新Cookie: {name}")
-            except Exception as e:
-                logger.error(f"解析Cookie时出错: {e}")
-
-    save_cookies(current_cookies)
-    return current_cookies
+        return jar.get_cookies()
+    return {**current_cookies, **jar.get_cookies()}
 
 
 def cookies_dict_to_str(cookies_dict):
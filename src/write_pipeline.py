@@ -0,0 +1,231 @@
+"""
+Write-behind pipeline: fetchers enqueue parsed pages and writer workers store them in batches.
+"""
+
+import queue
+import threading
+import time
+from loguru import logger
+from config.settings import WRITE_WORKERS, WRITE_QUEUE_SIZE, WRITE_BATCH_PAGES
+from src.metrics import gauge
+from src.storage import get_storage
+
+# 队列中表示“写入线程退出”的哨兵对象
+_STOP = object()
+
+WRITE_QUEUE_DEPTH = gauge("boss_write_queue_depth", "写入流水线队列中等待写入的页面数")
+
+
+def _notify(callback):
+    """调用页面写入完成的回调，回调出错不影响写入线程"""
+    try:
+        callback()
+    except Exception as e:
+        logger.error(f"执行页面写入回调时出错: {e}")
+
+
+class WritePipeline:
+    """
+    抓取与写库解耦的写入流水线
+
+    抓取线程调用submit()把一页岗位放入有界队列后立即返回，队列已满时阻塞等待，
+    由此形成背压：数据库变慢时抓取自动放慢，而不是无限堆积内存。
+    workers个写入线程每次最多取出batch_pages页，合并后在一个事务中写入
+    （一次指纹查询、每张表一组upsert、一次提交），跨页重复的岗位只写一次。
+    close()会写完队列中剩余的页面并输出吞吐统计
+    """
+
+    def __init__(self, storage, workers, queue_size, batch_pages):
+        self._storage = storage
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._batch_pages = max(1, batch_pages)
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "pages": 0,
+            "jobs": 0,
+            "written": 0,
+            "failed_pages": 0,
+            "batches": 0,
+            "blocked": 0,
+            "blocked_seconds": 0.0,
+            "write_seconds": 0.0,
+            "peak_queue": 0,
+        }
+        self._started_at = time.monotonic()
+        WRITE_QUEUE_DEPTH.set_function(self._queue.qsize)
+        self._threads = [
+            threading.Thread(
+                target=self._run, name=f"write-worker-{i + 1}", daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        job_list,
+        search_term=None,
+        page_number=None,
+        on_written=None,
+        refresh=False,
+    ):
+        """
+        提交一页岗位数据，队列已满时阻塞直到有写入线程取走页面
+
+        Args:
+            job_list: 岗位数据字典列表
+            search_term: 搜索关键词
+            page_number: 页码
+            on_written: 该页写入成功后在写入线程中调用的回调(可选)
+            refresh: 是否强制刷新已存在的岗位（即使内容指纹未变化）
+        """
+        if self._closed:
+            raise RuntimeError("写入流水线已关闭")
+
+        item = (job_list, search_term, page_number, on_written, refresh)
+        try:
+            self._queue.put_nowait(item)
+            blocked = 0.0
+        except queue.Full:
+            logger.debug("写入队列已满，等待写入线程处理")
+            start = time.monotonic()
+            self._queue.put(item)
+            blocked = time.monotonic() - start
+
+        with self._stats_lock:
+            self._stats["pages"] += 1
+            self._stats["jobs"] += len(job_list)
+            self._stats["peak_queue"] = max(
+                self._stats["peak_queue"], self._queue.qsize()
+            )
+            if blocked:
+                self._stats["blocked"] += 1
+                self._stats["blocked_seconds"] += blocked
+
+    def _write_pages(self, pages, refresh):
+        """
+        在一个事务中写入一批页面
+
+        Args:
+            pages: 队列中取出的页面列表
+            refresh: 是否强制刷新已存在的岗位
+
+        Returns:
+            int: 成功处理的岗位数，写入失败时返回None
+        """
+        page_jobs = [(job_list, term, page) for job_list, term, page, _, _ in pages]
+        try:
+            written = self._storage.insert_pages_batch(page_jobs, refresh)
+        except Exception as e:
+            logger.error(f"写入 {len(pages)} 页数据时出错: {e}")
+            return None
+        # 存储后端出错时返回0；一批页面中本来就没有可写入的岗位时0不算失败
+        if not written and any(
+            job.get("encryptJobId") for job_list, _, _ in page_jobs for job in job_list
+        ):
+            return None
+        return written
+
+    def _run(self):
+        """写入线程：每次取出一批页面写入，收到哨兵后退出"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_pages and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            pages = batch[:-1] if stop else batch
+            if pages:
+                start = time.monotonic()
+                written = 0
+                failed = 0
+                # 强制刷新与普通写入的页面分开写入，通常一批中只有一种
+                groups = {}
+                for page in pages:
+                    groups.setdefault(page[4], []).append(page)
+                for refresh, group in groups.items():
+                    count = self._write_pages(group, refresh)
+                    if count is None:
+                        failed += len(group)
+                        continue
+                    written += count
+                    for page in group:
+                        if page[3] is not None:
+                            _notify(page[3])
+                with self._stats_lock:
+                    self._stats["batches"] += 1
+                    self._stats["written"] += written
+                    self._stats["failed_pages"] += failed
+                    self._stats["write_seconds"] += time.monotonic() - start
+            if stop:
+                return
+
+    def close(self):
+        """
+        停止接收新页面，等待写入线程写完队列中剩余的页面
+
+        Returns:
+            dict: 吞吐统计，见get_stats()
+        """
+        if not self._closed:
+            self._closed = True
+            # 每个写入线程一个哨兵，排在所有已提交页面之后
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+            WRITE_QUEUE_DEPTH.set_function(None)
+
+        stats = self.get_stats()
+        logger.info(
+            f"写入流水线: {stats['pages']} 页, "
+            f"{stats['written']}/{stats['jobs']} 个岗位写入成功, "
+            f"失败 {stats['failed_pages']} 页, "
+            f"耗时 {stats['elapsed_seconds']:.2f} 秒, "
+            f"{stats['jobs_per_second']:.1f} 个/秒, "
+            f"写库 {stats['write_seconds']:.2f} 秒, "
+            f"抓取因队列已满等待 {stats['blocked']} 次"
+            f"共 {stats['blocked_seconds']:.2f} 秒, "
+            f"队列峰值 {stats['peak_queue']}"
+        )
+        return stats
+
+    def get_stats(self):
+        """
+        获取流水线统计信息
+
+        Returns:
+            dict: 包含提交的页面数和岗位数、写入成功的岗位数、失败页面数、
+                  背压等待次数和耗时、写库耗时、队列峰值以及吞吐量
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        elapsed = time.monotonic() - self._started_at
+        stats["elapsed_seconds"] = elapsed
+        stats["jobs_per_second"] = stats["written"] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+
+def create_write_pipeline():
+    """
+    按配置创建写入流水线
+
+    Returns:
+        WritePipeline: 写入流水线，WRITE_WORKERS为0时返回None（在抓取线程中同步写入）
+    """
+    if WRITE_WORKERS <= 0:
+        return None
+    logger.info(
+        f"启动写入流水线: {WRITE_WORKERS} 个写入线程, 队列容量 {WRITE_QUEUE_SIZE} 页"
+    )
+    return WritePipeline(
+        get_storage(),
+        workers=WRITE_WORKERS,
+        queue_size=WRITE_QUEUE_SIZE,
+        batch_pages=WRITE_BATCH_PAGES,
+    )
@@ -0,0 +1,6 @@
+from loguru import logger
+
+
+def pytest_unconfigure(config):
+    # 模块在退出时输出统计日志，此时pytest已关闭捕获的输出流
+    logger.remove()
@@ -0,0 +1,56 @@
+"""
+Tests for the rotating response archive and its index.
+"""
+
+import gzip
+import os
+
+from src.archive import INDEX_FILE, ResponseArchive, iter_index, read_record
+from src.json_codec import dumps, loads
+from src.replay import iter_archived_responses
+
+
+def _body(page):
+    # 响应体中的换行要在归档时去掉，保证一条记录占一行
+    return dumps({"code": 0, "zpData": {"page": page}}, indent=True)
+
+
+def test_append_rotates_segments_and_index_round_trips(tmp_path):
+    directory = str(tmp_path)
+    archive = ResponseArchive(directory, 1)
+    for page in (1, 2, 3):
+        params = {"query": "Python", "city": "101010100", "page": page}
+        archive.append("http://example.test/api", params, 200, _body(page), 0)
+    archive.append("http://example.test/api", {"page": 4}, 403, b"<html>", None)
+    archive.close()
+
+    # 每个分段只容纳一条记录
+    assert archive.get_stats()["segments"] == 4
+    entries = list(iter_index(directory))
+    assert [e["page"] for e in entries] == [1, 2, 3, 4]
+    assert len({e["segment"] for e in entries}) == 4
+
+    record = read_record(directory, entries[1])
+    assert record["params"]["page"] == 2
+    assert record["response"] == {"code": 0, "zpData": {"page": 2}}
+    assert read_record(directory, entries[3])["response"] == "<html>"
+
+    # 分段是普通的gzip文件，可以整体解压为JSONL
+    with gzip.open(os.path.join(directory, entries[0]["segment"]), "rb") as f:
+        assert loads(f.read().splitlines()[0])["page"] == 1
+
+    # 重放只读取API返回成功的响应，并可按关键词过滤
+    replayed = list(iter_archived_responses(directory))
+    assert [r["response"]["zpData"]["page"] for r in replayed] == [1, 2, 3]
+    assert list(iter_archived_responses(directory, queries={"Go"})) == []
+
+
+def test_index_skips_truncated_last_line(tmp_path):
+    directory = str(tmp_path)
+    archive = ResponseArchive(directory, 1 << 20)
+    archive.append("http://example.test/api", {"page": 1}, 200, _body(1), 0)
+    archive.close()
+    with open(os.path.join(directory, INDEX_FILE), "ab") as f:
+        f.write(b'{"query": "Py')
+
+    assert [e["page"] for e in iter_index(directory)] == [1]
@@ -0,0 +1,60 @@
+"""
+Tests for the asyncio crawl engine.
+"""
+
+import asyncio
+import threading
+import time
+
+import src.async_crawler as async_crawler
+from config.settings import CRAWL_CONCURRENCY
+from src.identity_pool import create_identity_pool
+
+
+class _NoWaitLimiter:
+    rate = 1.0
+
+    async def acquire_async(self):
+        pass
+
+    def record(self, ok, latency=None, retry_after=None, reason=None):
+        pass
+
+
+def test_default_identity_runs_streams_concurrently(tmp_path, monkeypatch):
+    # 没有身份配置文件时只有默认身份，抓取流仍应按CRAWL_CONCURRENCY并发执行
+    pool = create_identity_pool(str(tmp_path / "missing.json"))
+    assert len(pool) == 1
+    pool.identities[0].limiter = _NoWaitLimiter()
+
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def fake_fetch(url, params=None, identity=None):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.2)
+        with lock:
+            running["now"] -= 1
+        return {"code": 0, "zpData": {"hasMore": False, "jobList": []}}, None, None
+
+    monkeypatch.setattr(async_crawler, "get_identity_pool", lambda: pool)
+    monkeypatch.setattr(async_crawler, "fetch_data", fake_fetch)
+    monkeypatch.setattr(
+        async_crawler, "process_boss_zhipin_data", lambda *args, **kwargs: True
+    )
+
+    async def run():
+        limits = async_crawler.CrawlLimits(CRAWL_CONCURRENCY, CRAWL_CONCURRENCY)
+        return await asyncio.gather(
+            *(
+                async_crawler.crawl_stream(
+                    limits, "http://example.test/api", {"query": f"q{i}", "city": "1"}
+                )
+                for i in range(CRAWL_CONCURRENCY)
+            )
+        )
+
+    assert all(asyncio.run(run()))
+    assert running["peak"] == CRAWL_CONCURRENCY
@@ -0,0 +1,35 @@
+"""
+Tests for the LOAD DATA bulk import merge statements.
+"""
+
+from config.db_config import TABLE_PREFIX
+from src.bulk_load import _merge_table
+from src.database import JOB_COLUMNS
+
+
+class _RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+
+def test_job_merge_preserves_existing_values_and_first_search_term():
+    cursor = _RecordingCursor()
+    _merge_table(cursor, "jobs", JOB_COLUMNS, "job_id")
+
+    (sql,) = cursor.statements
+    target = f"{TABLE_PREFIX}jobs"
+    update_clause = sql.split("ON DUPLICATE KEY UPDATE ", 1)[1]
+    assert f"{target}.job_name=COALESCE(VALUES(job_name), {target}.job_name)" in sql
+    assert "search_term" not in update_clause
+    assert "page_number" not in update_clause
+
+
+def test_child_merge_clears_values_of_every_refreshed_job():
+    cursor = _RecordingCursor()
+    _merge_table(cursor, "company_welfare_links", ["job_id", "welfare_id"], None)
+
+    keys = next(s for s in cursor.statements if s.startswith("CREATE TEMPORARY"))
+    assert keys.endswith(f"FROM {TABLE_PREFIX}stage_jobs")
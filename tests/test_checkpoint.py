@@ -0,0 +1,68 @@
+"""
+Tests for the crawl checkpoint.
+"""
+
+import os
+
+import pytest
+
+import src.checkpoint as checkpoint
+from src.checkpoint import CrawlCheckpoint
+
+URL = "http://example.test/api"
+
+
+def _params(page=1):
+    return {"query": "Python", "city": "101010100", "page": page, "_": 123}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoint.json")
+
+
+def test_resumes_after_last_contiguous_written_page(path):
+    progress = CrawlCheckpoint(path)
+    key, start = progress.start(URL, _params())
+    assert start == 1
+
+    # 第3页先写完，第2页没写完就中断
+    progress.page_done(key, 1, True, 300)
+    progress.page_done(key, 3, True, 300)
+    progress.fail(key)
+
+    resumed = CrawlCheckpoint(path)
+    assert resumed.start(URL, _params(page=4)) == (key, 2)
+    assert resumed.finish_run() == 1
+
+
+def test_skips_completed_items_and_removes_file_when_all_done(path):
+    progress = CrawlCheckpoint(path)
+    key, _ = progress.start(URL, _params())
+    progress.finish(key, 2)
+    progress.page_done(key, 2, False, 30)
+    progress.page_done(key, 1, True, 30)
+    assert progress.incomplete_items() == []
+
+    assert CrawlCheckpoint(path).start(URL, _params()) == (key, None)
+    assert progress.finish_run() == 0
+    assert not os.path.exists(path)
+
+
+def test_failed_save_keeps_previous_file(path, monkeypatch):
+    progress = CrawlCheckpoint(path)
+    key, _ = progress.start(URL, _params())
+    progress.page_done(key, 1, True, 300)
+    with open(path, "rb") as f:
+        saved = f.read()
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(checkpoint.os, "replace", fail)
+    progress.page_done(key, 2, True, 300)
+
+    with open(path, "rb") as f:
+        assert f.read() == saved
+    assert os.listdir(os.path.dirname(path)) == ["checkpoint.json"]
+    assert CrawlCheckpoint(path).start(URL, _params())[1] == 2
@@ -0,0 +1,68 @@
+"""
+Tests for the in-memory cookie jar.
+"""
+
+import time
+
+from src.cookie_jar import CookieJar
+from src.json_codec import dumps, load_file
+
+
+class _Response:
+    def __init__(self, set_cookie=None):
+        self.headers = {"set-cookie": set_cookie} if set_cookie else {}
+
+
+def test_expired_cookies_are_flagged_until_refreshed(tmp_path):
+    path = tmp_path / "cookies.json"
+    now = time.time()
+    path.write_bytes(
+        dumps(
+            {
+                "__zp_stoken__": {"value": "old", "expires": now - 10},
+                "wt2": {"value": "w", "expires": now + 86400},
+                "lastCity": "101010100",
+            }
+        )
+    )
+    jar = CookieJar(str(path), expiry_margin=60, flush_interval=0)
+
+    assert jar.cookies_for_request() == {"wt2": "w", "lastCity": "101010100"}
+    assert jar.expired_names() == ["__zp_stoken__"]
+
+    assert jar.update_from_response(_Response("__zp_stoken__=new; Max-Age=3600"))
+    assert jar.expired_names() == []
+    assert jar.get_cookies()["__zp_stoken__"] == "new"
+
+    # Max-Age=0表示删除该Cookie
+    assert jar.update_from_response(_Response("wt2=; Max-Age=0"))
+    assert "wt2" not in jar.get_cookies()
+
+
+def test_flushes_only_when_cookies_change(tmp_path):
+    path = tmp_path / "cookies.json"
+    jar = CookieJar(str(path), flush_interval=0)
+
+    assert jar.update_from_response(_Response("a=1; Path=/"))
+    assert load_file(str(path)) == {"a": {"value": "1", "expires": None}}
+    assert jar.get_stats()["flushes"] == 1
+
+    assert not jar.update_from_response(_Response("a=1; Path=/"))
+    assert not jar.update_from_response(_Response())
+    assert jar.get_stats()["flushes"] == 1
+
+    assert jar.update_from_response(_Response("a=2"))
+    assert load_file(str(path))["a"]["value"] == "2"
+    assert jar.get_stats()["flushes"] == 2
+
+
+def test_flush_interval_defers_write_until_forced(tmp_path):
+    path = tmp_path / "cookies.json"
+    jar = CookieJar(str(path), flush_interval=3600)
+
+    assert jar.update_from_response(_Response("a=1"))
+    assert jar.update_from_response(_Response("a=2"))
+    assert load_file(str(path))["a"]["value"] == "1"
+
+    assert jar.flush(force=True)
+    assert load_file(str(path))["a"]["value"] == "2"
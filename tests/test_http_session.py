@@ -0,0 +1,47 @@
+"""
+Tests for the shared HTTP session.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.http_session import HttpSession
+
+
+class _CookieHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = (self.headers.get("Cookie") or "").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Set-Cookie", "__zp_stoken__=from-server; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CookieHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_response_cookies_do_not_leak_to_other_identities(server_url):
+    session = HttpSession(2, 5, 5)
+    try:
+        first = session.get(server_url, headers={"Cookie": "identity=a"})
+        assert first.content == b"identity=a"
+        assert first.cookies.get("__zp_stoken__") == "from-server"
+
+        # 没有Cookie的身份不应收到其他身份的响应设置的Cookie
+        second = session.get(server_url)
+        assert second.content == b""
+    finally:
+        session.close()
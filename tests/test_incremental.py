@@ -0,0 +1,43 @@
+"""
+Tests for the incremental crawl stop rule.
+"""
+
+from src.incremental import IncrementalStopRule
+
+
+class _KnownStorage:
+    def __init__(self, known):
+        self.known = set(known)
+        self.fail = False
+
+    def get_known_job_ids(self, job_ids):
+        if self.fail:
+            return None
+        return self.known & set(job_ids)
+
+
+def _page(*job_ids):
+    return [{"encryptJobId": job_id} for job_id in job_ids]
+
+
+def test_stops_after_consecutive_mostly_known_pages():
+    rule = IncrementalStopRule(_KnownStorage({"a", "b", "c", "d", "e"}), 0.8, 2)
+
+    assert not rule.observe(_page("a", "b", "c", "d", "x"))
+    # 占比不足时连续计数重新开始
+    assert not rule.observe(_page("a", "x", "y"))
+    assert not rule.observe(_page("a", "b", "c", "d", "y"))
+    assert rule.observe(_page("b", "c", "d", "e"))
+
+
+def test_query_failure_and_empty_pages_do_not_stop():
+    storage = _KnownStorage({"a", "b"})
+    rule = IncrementalStopRule(storage, 0.5, 2)
+
+    assert not rule.observe(_page("a", "b"))
+    storage.fail = True
+    assert not rule.observe(_page("a", "b"))
+    storage.fail = False
+    assert not rule.observe([{"jobName": "缺少ID"}])
+    assert not rule.observe(_page("a", "b"))
+    assert rule.observe(_page("a", "b"))
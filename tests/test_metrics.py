@@ -0,0 +1,50 @@
+"""
+Tests for the metrics registry and its Prometheus text output.
+"""
+
+import pytest
+
+from src.metrics import MetricsRegistry
+
+
+def test_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("boss_requests_total", "请求数", ("status",))
+    requests.inc(status="200")
+    requests.inc(2, status="200")
+    requests.inc(status='a"b\n')
+    registry.gauge("boss_queue_depth", "队列长度").set_function(lambda: 7)
+    latency = registry.histogram(
+        "boss_parse_seconds", "解析耗时", ("source",), buckets=(0.1, 1)
+    )
+    latency.observe(0.05, source="fetch")
+    latency.observe(0.5, source="fetch")
+    latency.observe(3, source="fetch")
+
+    assert registry.render().splitlines() == [
+        "# HELP boss_requests_total 请求数",
+        "# TYPE boss_requests_total counter",
+        'boss_requests_total{status="200"} 3',
+        'boss_requests_total{status="a\\"b\\n"} 1',
+        "# HELP boss_queue_depth 队列长度",
+        "# TYPE boss_queue_depth gauge",
+        "boss_queue_depth 7",
+        "# HELP boss_parse_seconds 解析耗时",
+        "# TYPE boss_parse_seconds histogram",
+        'boss_parse_seconds_bucket{source="fetch",le="0.1"} 1',
+        'boss_parse_seconds_bucket{source="fetch",le="1"} 2',
+        'boss_parse_seconds_bucket{source="fetch",le="+Inf"} 3',
+        'boss_parse_seconds_sum{source="fetch"} 3.55',
+        'boss_parse_seconds_count{source="fetch"} 3',
+    ]
+
+
+def test_same_name_returns_same_metric_and_checks_labels():
+    registry = MetricsRegistry()
+    parse = registry.histogram("boss_json_parse_seconds", "解析耗时", ("source",))
+    assert registry.histogram("boss_json_parse_seconds", "", ("source",)) is parse
+
+    with pytest.raises(ValueError):
+        registry.counter("boss_json_parse_seconds", "")
+    with pytest.raises(ValueError):
+        parse.observe(0.1, table="jobs")
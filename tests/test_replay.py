@@ -0,0 +1,87 @@
+"""
+Tests for replaying archived responses into storage.
+"""
+
+import pytest
+
+import src.sqlite_storage as sqlite_storage
+from config.db_config import TABLE_PREFIX
+from src.archive import ResponseArchive
+from src.json_codec import dumps
+from src.replay import replay_archive
+from src.scraper import JSON_PARSE_SECONDS
+from src.sqlite_storage import SQLiteStorage
+
+JOB = {
+    "encryptJobId": "j1",
+    "jobName": "Python开发",
+    "salaryDesc": "15-25K",
+    "encryptBrandId": "b1",
+    "brandName": "公司",
+    "skills": ["Python"],
+}
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = SQLiteStorage(str(tmp_path / "jobs.sqlite3"))
+    assert storage.create_tables()
+    # 重放通过get_storage()写入
+    monkeypatch.setattr("src.storage._storage", storage)
+    yield storage
+    storage.close()
+
+
+def _archive_page(directory, job_list):
+    archive = ResponseArchive(str(directory), 1 << 20)
+    body = dumps({"code": 0, "zpData": {"hasMore": False, "jobList": job_list}})
+    params = {"query": "Python", "page": 1}
+    archive.append("http://example.test/api", params, 200, body, 0)
+    archive.close()
+
+
+def _job_name(storage):
+    cursor = storage._get_conn().execute(
+        f"SELECT job_name FROM {TABLE_PREFIX}jobs WHERE job_id = 'j1'"
+    )
+    return cursor.fetchone()[0]
+
+
+def _parse_count(source):
+    for key, (_, _, count) in JSON_PARSE_SECONDS.collect():
+        if key == (source,):
+            return count
+    return 0
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_replay_applies_current_mapping_to_stored_jobs(
+    storage, tmp_path, monkeypatch, workers
+):
+    monkeypatch.setattr("src.write_pipeline.WRITE_WORKERS", workers)
+
+    # 按旧的字段映射写入，内容指纹与之后重放的响应相同
+    build_job_values = sqlite_storage.build_job_values
+
+    def old_mapping(job, search_term=None, page_number=None):
+        values = build_job_values(job, search_term, page_number)
+        values["job_name"] = "旧映射"
+        return values
+
+    with monkeypatch.context() as m:
+        m.setattr(sqlite_storage, "build_job_values", old_mapping)
+        assert storage.insert_jobs_batch([JOB], "Python", 1)
+    assert _job_name(storage) == "旧映射"
+
+    # 在线抓取时指纹未变化的岗位照常跳过
+    assert storage.insert_jobs_batch([JOB], "Python", 1)
+    assert _job_name(storage) == "旧映射"
+
+    _archive_page(tmp_path / "archive", [JOB])
+    parsed = _parse_count("replay")
+    stats = replay_archive(str(tmp_path / "archive"))
+
+    assert stats["pages"] == 1
+    assert stats["processed"] == 1
+    assert _job_name(storage) == "Python开发"
+    assert _parse_count("replay") == parsed + 1
@@ -0,0 +1,82 @@
+"""
+Tests for the embedded SQLite storage backend.
+"""
+
+import sqlite3
+
+import pytest
+
+from config.db_config import TABLE_PREFIX
+from src.database import DB_ROWS_WRITTEN
+from src.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "jobs.sqlite3"))
+    assert storage.create_tables()
+    yield storage
+    storage.close()
+
+
+def _job(**fields):
+    job = {
+        "encryptJobId": "j1",
+        "jobName": "Python开发",
+        "salaryDesc": "10-20K",
+        "encryptBrandId": "b1",
+        "brandName": "公司",
+        "welfareList": ["w1", "w2"],
+        "jobLabels": ["1-3年"],
+    }
+    job.update(fields)
+    return job
+
+
+def _values(storage, table, column):
+    cursor = storage._get_conn().execute(
+        f"SELECT {column} FROM {TABLE_PREFIX}{table} WHERE job_id = 'j1'"
+    )
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+@pytest.mark.parametrize(
+    "refreshed",
+    [_job(welfareList=[], jobLabels=None), _job(welfareList=None, jobLabels=[])],
+)
+def test_refresh_clears_child_rows_when_list_becomes_empty(storage, refreshed):
+    assert storage.insert_jobs_batch([_job()], "Python", 1)
+    assert _values(storage, "company_welfare", "welfare") == ["w1", "w2"]
+
+    assert storage.insert_jobs_batch([refreshed], "Python", 1)
+    assert _values(storage, "company_welfare", "welfare") == []
+    assert _values(storage, "job_labels", "label") == []
+
+
+def test_refresh_with_missing_list_clears_child_rows(storage):
+    assert storage.insert_jobs_batch([_job()], "Python", 1)
+
+    refreshed = _job(jobName="Go开发")
+    del refreshed["welfareList"]
+    assert storage.insert_jobs_batch([refreshed], "Python", 1)
+    assert _values(storage, "company_welfare", "welfare") == []
+    assert _values(storage, "job_labels", "label") == ["1-3年"]
+
+
+def _rows_written(table):
+    return dict(DB_ROWS_WRITTEN.collect()).get((table,), 0)
+
+
+def test_rows_written_counted_only_after_commit(storage, monkeypatch):
+    before = _rows_written("jobs")
+
+    def fail(cursor, jobs, written):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    with monkeypatch.context() as m:
+        m.setattr(SQLiteStorage, "_sync_child_tables", staticmethod(fail))
+        assert storage.insert_jobs_batch([_job()], "Python", 1) == 0
+    assert _rows_written("jobs") == before
+
+    assert storage.insert_jobs_batch([_job()], "Python", 1)
+    assert _rows_written("jobs") == before + 1
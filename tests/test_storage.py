@@ -0,0 +1,23 @@
+"""
+Tests for the storage backend interface.
+"""
+
+import pytest
+
+from src.storage import StorageBackend, create_storage
+
+
+def test_incomplete_backend_fails_on_creation():
+    class PartialStorage(StorageBackend):
+        def create_tables(self):
+            return True
+
+    with pytest.raises(TypeError):
+        PartialStorage()
+
+
+def test_create_storage_builds_sqlite_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.storage.SQLITE_PATH", str(tmp_path / "jobs.sqlite3"))
+    storage = create_storage("sqlite")
+    assert storage.name == "sqlite"
+    storage.close()
@@ -0,0 +1,67 @@
+"""
+Tests for the write-behind pipeline.
+"""
+
+import threading
+
+from src.write_pipeline import WritePipeline
+
+
+class _RecordingStorage:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def insert_pages_batch(self, pages, refresh=False):
+        # 第一批写入等待放行，让其余页面在队列中积累成一批
+        self.entered.set()
+        self.release.wait(5)
+        self.calls.append((list(pages), refresh))
+        if self.fail:
+            raise RuntimeError("写入失败")
+        return len(
+            {job.get("encryptJobId") for jobs, _, _ in pages for job in jobs} - {None}
+        )
+
+
+def _page(*job_ids):
+    return [{"encryptJobId": job_id} for job_id in job_ids]
+
+
+def test_drained_pages_are_written_in_one_call():
+    storage = _RecordingStorage()
+    pipeline = WritePipeline(storage, workers=1, queue_size=10, batch_pages=5)
+    written = []
+    pipeline.submit(_page("j0"), "Python", 1, lambda: written.append(1))
+    assert storage.entered.wait(5)
+    for page in range(2, 5):
+        pipeline.submit(
+            _page(f"j{page}", "j0"), "Python", page, lambda p=page: written.append(p)
+        )
+    storage.release.set()
+    stats = pipeline.close()
+
+    # 第一页单独写入，其余三页合并为一次调用
+    assert [len(pages) for pages, _ in storage.calls] == [1, 3]
+    assert sorted(written) == [1, 2, 3, 4]
+    assert stats["failed_pages"] == 0
+    assert stats["batches"] == 2
+
+
+def test_empty_page_is_not_a_failure_but_exceptions_are():
+    storage = _RecordingStorage()
+    storage.release.set()
+    pipeline = WritePipeline(storage, workers=1, queue_size=10, batch_pages=5)
+    done = []
+    pipeline.submit([{"jobName": "缺少ID"}], "Python", 1, lambda: done.append(1))
+    assert pipeline.close()["failed_pages"] == 0
+    assert done == [1]
+
+    failing = _RecordingStorage(fail=True)
+    failing.release.set()
+    pipeline = WritePipeline(failing, workers=1, queue_size=10, batch_pages=5)
+    pipeline.submit(_page("j1"), "Python", 1, lambda: done.append(2))
+    assert pipeline.close()["failed_pages"] == 1
+    assert done == [1]